@@ -1,4 +1,6 @@
-from app.agents.loop import AgentLoop
+from typing import AsyncIterator
+
+from app.agents.loop import AgentEvent, AgentLoop
 from app.core.config.settings import Settings
 from app.llm.client import LLMClient
 from app.llm.schemas import StructuredOutput
@@ -12,3 +14,9 @@ class AgentController:
 
     async def run(self, request: ChatRequest) -> StructuredOutput:
         return await self.loop.run(request)
+
+    def system_prompt(self) -> str:
+        return self.loop.system_prompt()
+
+    def stream(self, request: ChatRequest) -> AsyncIterator[AgentEvent]:
+        return self.loop.events(request, stream=True)
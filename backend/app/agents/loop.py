@@ -1,17 +1,22 @@
+import asyncio
 import json
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import AsyncIterator
 
 from app.core.config.settings import Settings
 from app.core.errors import AppError
-from app.llm.client import LLMClient
-from app.llm.schemas import AgentDecision, StructuredOutput
+from app.llm.client import LLMClient, LLMResult
+from app.llm.schemas import AgentDecision, StructuredOutput, ToolCall
+from app.llm.streaming import DecisionStreamParser
 from app.models.chat import ChatRequest
 from app.tools.context import ToolContext
 from app.tools.registry import ToolRegistry
 
 logger = logging.getLogger(__name__)
 
+TOOL_MODES = ("json", "native")
+
 
 @dataclass(frozen=True)
 class AgentStep:
@@ -22,13 +27,35 @@ class AgentStep:
     reasoning: list[str]
 
 
+@dataclass(frozen=True)
+class AgentEvent:
+    type: str
+    data: dict = field(default_factory=dict)
+
+
 class AgentLoop:
     def __init__(self, tools: ToolRegistry, llm: LLMClient, settings: Settings) -> None:
         self.tools = tools
         self.llm = llm
         self.settings = settings
+        if settings.agent_tool_mode not in TOOL_MODES:
+            logger.warning("agent_unknown_tool_mode mode=%s", settings.agent_tool_mode)
+        # "native" passes tool schemas to the provider and reads its tool_calls;
+        # "json" asks for an AgentDecision object in the message content.
+        self.native_tools = settings.agent_tool_mode == "native"
 
     async def run(self, request: ChatRequest) -> StructuredOutput:
+        async for event in self.events(request):
+            if event.type == "final":
+                return StructuredOutput.model_validate(event.data)
+        raise AppError("agent_no_final_output", status_code=500)
+
+    async def events(self, request: ChatRequest, stream: bool = False) -> AsyncIterator[AgentEvent]:
+        """Run the loop, yielding decisions, tool calls and the final output as they happen.
+
+        With ``stream=True`` each decision is streamed from the LLM and the reply
+        of a final decision is emitted as ``token`` events before ``final``.
+        """
         messages = self._build_messages(request)
         steps: list[AgentStep] = []
         context = ToolContext(
@@ -37,70 +64,179 @@ class AgentLoop:
             permissions=set(request.permissions),
         )
 
+        tool_calls_used = 0
+
         for index in range(self.settings.agent_max_iterations):
             # Each iteration: LLM decision -> optional tool -> observation.
-            decision = await self._decide(messages, request)
+            if stream:
+                decision = None
+                async for item in self._decide_stream(messages, request):
+                    if isinstance(item, AgentDecision):
+                        decision = item
+                    else:
+                        yield AgentEvent("token", {"text": item})
+            else:
+                decision = await self._decide(messages, request)
+
+            calls = decision.calls()
+            yield AgentEvent(
+                "decision",
+                {
+                    "index": index,
+                    "action": decision.action,
+                    "tool_name": calls[0].name if calls else None,
+                    "tool_calls": [call.name for call in calls],
+                    "reasoning": decision.reasoning,
+                },
+            )
 
             if decision.action == "final":
-                return StructuredOutput(
+                output = StructuredOutput(
                     reply=decision.reply,
                     data={"steps": [step.__dict__ for step in steps]},
                     reasoning=decision.reasoning,
                 )
+                yield AgentEvent("final", output.model_dump())
+                return
 
             if decision.action != "tool":
                 raise AppError("invalid_agent_action", status_code=500)
 
-            if not decision.tool_name:
+            if not calls:
                 raise AppError("tool_call_missing_name", status_code=400)
 
-            observation = await self._execute_tool(decision.tool_name, decision.tool_args or {}, context)
-            steps.append(
-                AgentStep(
-                    index=index,
-                    action=decision.action,
-                    tool_name=decision.tool_name,
-                    observation=observation if isinstance(observation, dict) else {"result": observation},
-                    reasoning=decision.reasoning,
+            allowed = max(0, self.settings.llm_max_tool_calls - tool_calls_used)
+            tool_calls_used += min(len(calls), allowed)
+            for call_index, call in enumerate(calls):
+                yield AgentEvent(
+                    "tool_start",
+                    {"index": index, "call_index": call_index, "tool_name": call.name, "tool_args": call.args},
                 )
-            )
 
-            messages.append({"role": "assistant", "content": self._serialize_decision(decision)})
-            messages.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": f"tool-{index}",
-                    "content": self._serialize_tool_result(observation),
-                }
-            )
+            messages.append(self._assistant_message(decision, calls))
+            # Independent calls run concurrently; observations are reported in request order.
+            async for call_index, observation in self._observe(calls, allowed, context):
+                call = calls[call_index]
+                recorded = observation if isinstance(observation, dict) else {"result": observation}
+                yield AgentEvent(
+                    "tool_end",
+                    {"index": index, "call_index": call_index, "tool_name": call.name, "observation": recorded},
+                )
+                steps.append(
+                    AgentStep(
+                        index=index,
+                        action=decision.action,
+                        tool_name=call.name,
+                        observation=recorded,
+                        reasoning=decision.reasoning,
+                    )
+                )
+                messages.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": call.id or f"tool-{index}-{call_index}",
+                        "content": self._serialize_tool_result(observation),
+                    }
+                )
 
         logger.warning("agent_loop_max_iterations_reached")
         # Safe exit: return a final response when iteration limit is hit.
-        return StructuredOutput(
+        output = StructuredOutput(
             reply="Unable to complete within the iteration limit.",
             data={"error": "max_iterations", "steps": [step.__dict__ for step in steps]},
             reasoning=[],
         )
+        yield AgentEvent("final", output.model_dump())
 
     async def _decide(self, messages: list[dict[str, object]], request: ChatRequest) -> AgentDecision:
         result = await self.llm.chat(
             messages=messages,
-            tools=None,
+            tools=self.tools.openai_tools() if self.native_tools else None,
             model=request.model,
             temperature=request.temperature,
+            # Keep the parse fallback out of the response cache so a retry asks the model again.
+            accept=None if self.native_tools else self._is_decision,
         )
-        logger.info(f"LLM response content: {result.content[:500]}")  # Log first 500 chars
+        if self.native_tools:
+            return self._native_decision(result)
+        return self._parse_decision(result.content)
+
+    @staticmethod
+    def _is_decision(result: LLMResult) -> bool:
         try:
-            payload = json.loads(result.content)
+            AgentDecision.model_validate(json.loads(result.content))
+        except ValueError:
+            return False
+        return True
+
+    async def _decide_stream(
+        self, messages: list[dict[str, object]], request: ChatRequest
+    ) -> AsyncIterator[str | AgentDecision]:
+        if self.native_tools:
+            # Content may be a preamble to tool calls, which only show up later in the stream,
+            # so deltas are held back until the turn turns out to be a final answer.
+            deltas: list[str] = []
+            async for item in self.llm.stream_result(
+                messages=messages,
+                tools=self.tools.openai_tools(),
+                model=request.model,
+                temperature=request.temperature,
+            ):
+                if not isinstance(item, LLMResult):
+                    deltas.append(item)
+                    continue
+                if not item.tool_calls:
+                    for delta in deltas:
+                        yield delta
+                yield self._native_decision(item)
+            return
+
+        parser = DecisionStreamParser()
+        async for delta in self.llm.stream_chat(
+            messages=messages,
+            tools=None,
+            model=request.model,
+            temperature=request.temperature,
+        ):
+            for text in parser.feed(delta):
+                yield text
+        yield self._parse_decision(parser.content)
+
+    @staticmethod
+    def _native_decision(result: LLMResult) -> AgentDecision:
+        if not result.tool_calls:
+            return AgentDecision(action="final", reply=result.content)
+        calls = []
+        for position, raw in enumerate(result.tool_calls):
+            function = raw.get("function") or {}
+            try:
+                args = json.loads(function.get("arguments") or "{}")
+            except json.JSONDecodeError:
+                # Leave validation to the registry, which reports the error back to the model.
+                logger.warning("invalid_tool_arguments name=%s", function.get("name"))
+                args = {}
+            calls.append(
+                ToolCall(
+                    id=raw.get("id") or f"call-{position}",
+                    name=function.get("name") or "",
+                    args=args if isinstance(args, dict) else {},
+                )
+            )
+        return AgentDecision(action="tool", reply=result.content, tool_calls=calls)
+
+    def _parse_decision(self, content: str) -> AgentDecision:
+        logger.info(f"LLM response content: {content[:500]}")  # Log first 500 chars
+        try:
+            payload = json.loads(content)
             logger.info(f"Parsed JSON payload: {payload}")
             return AgentDecision.model_validate(payload)
         except (json.JSONDecodeError, ValueError) as exc:
-            logger.error(f"Failed to parse LLM response. Content: {result.content}")
+            logger.error(f"Failed to parse LLM response. Content: {content}")
             logger.warning("invalid_agent_decision_json: %s", exc)
             # Return a fallback response instead of failing
             return AgentDecision(
                 action="final",
-                reply=result.content if result.content else "I apologize, but I encountered an error processing your request.",
+                reply=content if content else "I apologize, but I encountered an error processing your request.",
                 tool_name=None,
                 tool_args=None,
                 reasoning=["Fallback due to JSON parsing error"]
@@ -110,7 +246,7 @@ class AgentLoop:
         messages: list[dict[str, object]] = [
             {
                 "role": "system",
-                "content": self._system_prompt(),
+                "content": self.system_prompt(),
             }
         ]
 
@@ -127,17 +263,77 @@ class AgentLoop:
         messages.append({"role": "user", "content": request.message})
         return messages
 
-    async def _execute_tool(self, name: str, args: dict, context: ToolContext) -> object:
-        # Tool execution is validated and wrapped in the registry.
-        return await self.tools.call(name, args, context)
+    async def _observe(
+        self, calls: list[ToolCall], allowed: int, context: ToolContext
+    ) -> AsyncIterator[tuple[int, object]]:
+        async for item in self._execute_tools(calls[:allowed], context):
+            yield item
+        # Calls beyond the per-request llm_max_tool_calls budget are reported, not run.
+        for position in range(allowed, len(calls)):
+            yield position, {"error": "tool_call_limit_reached", "limit": self.settings.llm_max_tool_calls}
+
+    async def _execute_tools(
+        self, calls: list[ToolCall], context: ToolContext
+    ) -> AsyncIterator[tuple[int, object]]:
+        """Run ``calls`` concurrently and yield ``(position, observation)`` in call order.
+
+        At most ``agent_tool_concurrency`` calls run at once, and all of them
+        share one ``agent_tool_timeout_seconds`` deadline.
+        """
+        if not calls:
+            return
+        slots = asyncio.Semaphore(max(1, self.settings.agent_tool_concurrency))
+        deadline = asyncio.get_running_loop().time() + self.settings.agent_tool_timeout_seconds
+
+        async def run(call: ToolCall) -> object:
+            async with slots:
+                remaining = deadline - asyncio.get_running_loop().time()
+                try:
+                    # Tool execution is validated and wrapped in the registry.
+                    return await asyncio.wait_for(self.tools.call(call.name, call.args, context), max(0.0, remaining))
+                except asyncio.TimeoutError:
+                    logger.warning("tool_call_timeout name=%s", call.name)
+                    return {"error": "tool_timeout"}
+
+        tasks = [asyncio.create_task(run(call)) for call in calls]
+        try:
+            for position, task in enumerate(tasks):
+                yield position, await task
+        finally:
+            for task in tasks:
+                task.cancel()
 
-    def _system_prompt(self) -> str:
+    def _assistant_message(self, decision: AgentDecision, calls: list[ToolCall]) -> dict[str, object]:
+        if not self.native_tools:
+            return {"role": "assistant", "content": self._serialize_decision(decision)}
+        return {
+            "role": "assistant",
+            "content": decision.reply or None,
+            "tool_calls": [
+                {
+                    "id": call.id,
+                    "type": "function",
+                    "function": {"name": call.name, "arguments": json.dumps(call.args, ensure_ascii=True)},
+                }
+                for call in calls
+            ],
+        }
+
+    def system_prompt(self) -> str:
+        if self.native_tools:
+            return (
+                f"{self.settings.system_prompt}\n"
+                "Use the provided tools when they help; call several independent tools at once when possible. "
+                "Answer directly once you have what you need."
+            )
         return (
             f"{self.settings.system_prompt}\n"
             "You must respond with valid JSON only, following this exact schema:\n"
             '{"action": "tool" or "final", "reply": "your response text", "tool_name": null or "tool_name", '
             '"tool_args": null or {...}, "reasoning": ["step1", "step2", ...]}.\n'
             'When action="tool", you MUST provide both tool_name and tool_args.\n'
+            "To run several independent tools at once, omit tool_name and tool_args and instead provide "
+            '"tool_calls": [{"name": "tool_name", "args": {...}}, ...]; results come back in the same order.\n'
             'When action="final", set tool_name and tool_args to null and provide your final answer in reply.'
         )
 
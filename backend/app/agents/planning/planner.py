@@ -1,7 +1,10 @@
+import asyncio
 import json
 import logging
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, TypeVar
 
+from app.agents.loop import AgentEvent
+from app.agents.planning.runs import PlanRunStore
 from app.core.config.settings import Settings
 from app.core.errors import AppError
 from app.llm.client import LLMClient
@@ -9,32 +12,184 @@ from app.models.planning import PlanRequest, PlanStep, PlanResponse, StepResult
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class PlanningAgent:
-    def __init__(self, llm: LLMClient, settings: Settings) -> None:
+    """Plans a goal into steps and runs them as a dependency graph.
+
+    A step starts as soon as every step in its ``depends_on`` has completed
+    (at most ``planning_max_concurrency`` at a time) and receives their
+    outputs. When a step fails, the steps that depend on it, directly or
+    not, are skipped; independent branches keep running.
+
+    With a ``PlanRunStore``, every run is recorded under a ``run_id`` and
+    each step result is checkpointed as it finishes, so ``resume`` can retry
+    a failed or interrupted run without paying for completed steps again.
+    """
+
+    def __init__(self, llm: LLMClient, settings: Settings, runs: PlanRunStore | None = None) -> None:
         self.llm = llm
         self.settings = settings
+        self.runs = runs
 
     async def run(self, request: PlanRequest) -> PlanResponse:
         steps = await self._create_plan(request)
-        results: list[StepResult] = []
-        success = True
+        run_id = await self._record_run(request, steps)
+        return await self._complete(request, steps, {}, run_id)
+
+    async def resume(self, run_id: str) -> PlanResponse:
+        """Continue a stored run: completed steps are reused, failed, skipped and missing ones run again."""
+        if self.runs is None:
+            raise AppError("plan_runs_disabled", status_code=503)
+        run = await self.runs.get(run_id)
+        completed = {result.id: result for result in run.results if result.status == "completed"}
+        await self._checkpoint(self.runs.mark_running(run_id))
+        logger.info("plan_run_resumed run_id=%s reused=%s", run_id, len(completed))
+        # Bypass the response cache so retried steps really call the model again.
+        return await self._complete(run.request, run.steps, completed, run_id, cache=False)
+
+    async def stream(self, request: PlanRequest) -> AsyncIterator[AgentEvent]:
+        """Like ``run``, emitting progress as it happens.
+
+        Events: ``plan`` (the steps and ``run_id``, once planned), ``step``
+        (each ``StepResult`` as it finishes), ``summary_delta`` (summary
+        tokens as they stream) and ``final`` (the complete ``PlanResponse``).
+        """
+        steps = await self._create_plan(request)
+        run_id = await self._record_run(request, steps)
+        yield AgentEvent(
+            "plan", {"goal": request.goal, "run_id": run_id, "steps": [step.model_dump() for step in steps]}
+        )
 
-        for step in steps:
-            # Execute steps sequentially and stop on failure.
-            result = await self._execute_step(request, step)
+        results: list[StepResult] = []
+        async for result in self._run_steps(request, steps, {}, run_id):
             results.append(result)
-            if result.status == "failed":
-                success = False
-                break
+            yield AgentEvent("step", result.model_dump())
+        results.sort(key=lambda item: item.id)
+        success = all(result.status == "completed" for result in results)
+
+        parts: list[str] = []
+        async for delta in self.llm.stream_chat(messages=self._summary_messages(request.goal, results), tools=None):
+            parts.append(delta)
+            yield AgentEvent("summary_delta", {"delta": delta})
+        summary = "".join(parts).strip() or "Execution summary unavailable."
+        if run_id is not None:
+            await self._checkpoint(self.runs.finish(run_id, summary, success))
+        response = PlanResponse(goal=request.goal, steps=results, summary=summary, success=success, run_id=run_id)
+        yield AgentEvent("final", response.model_dump())
+
+    async def _complete(
+        self,
+        request: PlanRequest,
+        steps: list[PlanStep],
+        completed: dict[int, StepResult],
+        run_id: str | None,
+        cache: bool | None = None,
+    ) -> PlanResponse:
+        results = list(completed.values())
+        results.extend([result async for result in self._run_steps(request, steps, completed, run_id, cache)])
+        results.sort(key=lambda item: item.id)
+        success = all(result.status == "completed" for result in results)
 
         summary = await self._summarize(request.goal, results)
-        return PlanResponse(goal=request.goal, steps=results, summary=summary, success=success)
+        if run_id is not None:
+            await self._checkpoint(self.runs.finish(run_id, summary, success))
+        return PlanResponse(goal=request.goal, steps=results, summary=summary, success=success, run_id=run_id)
+
+    async def _run_steps(
+        self,
+        request: PlanRequest,
+        steps: list[PlanStep],
+        completed: dict[int, StepResult],
+        run_id: str | None,
+        cache: bool | None = None,
+    ) -> AsyncIterator[StepResult]:
+        """Yield each new step result as soon as it is known, in completion order.
+
+        Steps in ``completed`` are not run again; their outputs feed their
+        dependents as usual. Each new result is checkpointed under ``run_id``
+        in the background, so dependents start without waiting for the write;
+        all checkpoints have finished when the generator is exhausted.
+        """
+        limit = max(1, self.settings.planning_max_concurrency)
+        results: dict[int, StepResult] = dict(completed)
+        waiting = [step for step in steps if step.id not in completed]
+        running: dict[asyncio.Task, PlanStep] = {}
+        writes: set[asyncio.Task] = set()
+        try:
+            while waiting or running:
+                settled: list[StepResult] = []
+                # Dependencies always point to earlier steps, so one pass in order settles skip chains.
+                for step in list(waiting):
+                    blocked = [dep for dep in step.depends_on if dep in results and results[dep].status != "completed"]
+                    if blocked:
+                        waiting.remove(step)
+                        results[step.id] = StepResult(
+                            id=step.id,
+                            title=step.title,
+                            status="skipped",
+                            error=f"dependency_failed:{blocked[0]}",
+                            depends_on=step.depends_on,
+                        )
+                        settled.append(results[step.id])
+                    elif len(running) < limit and all(dep in results for dep in step.depends_on):
+                        waiting.remove(step)
+                        inputs = [results[dep] for dep in step.depends_on]
+                        running[asyncio.create_task(self._execute_step(request, step, inputs, cache))] = step
+
+                if running:
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        step = running.pop(task)
+                        try:
+                            results[step.id] = task.result()
+                        except Exception as exc:
+                            logger.warning("plan_step_failed step=%s error=%s", step.id, exc)
+                            results[step.id] = StepResult(
+                                id=step.id,
+                                title=step.title,
+                                status="failed",
+                                error=str(exc),
+                                depends_on=step.depends_on,
+                            )
+                        settled.append(results[step.id])
+
+                for result in settled:
+                    if run_id is not None:
+                        write = asyncio.create_task(self._checkpoint(self.runs.checkpoint(run_id, result)))
+                        writes.add(write)
+                        write.add_done_callback(writes.discard)
+                    yield result
+
+            if writes:
+                await asyncio.gather(*writes)
+        finally:
+            for task in running:
+                task.cancel()
+            for write in writes:
+                write.cancel()
+
+    async def _record_run(self, request: PlanRequest, steps: list[PlanStep]) -> str | None:
+        if self.runs is None:
+            return None
+        return await self._checkpoint(self.runs.create(request, steps))
+
+    async def _checkpoint(self, write: Awaitable[T]) -> T | None:
+        """Run a store write; persistence is best effort and never fails the plan itself."""
+        try:
+            return await asyncio.wait_for(write, self.settings.planning_checkpoint_timeout_seconds)
+        except Exception as exc:
+            logger.warning("plan_checkpoint_failed error=%s", exc)
+            return None
 
     async def _create_plan(self, request: PlanRequest) -> list[PlanStep]:
         prompt = (
             "You are a planner. Break the goal into ordered, minimal steps. "
-            "Return JSON only: {\"steps\": [{\"title\": \"...\", \"description\": \"...\"}]}."
+            "Steps are numbered from 1 in order; list in depends_on the earlier steps whose output a step "
+            "needs, and leave it empty for steps that can run independently. "
+            "Return JSON only: {\"steps\": [{\"title\": \"...\", \"description\": \"...\", "
+            "\"depends_on\": [1]}]}."
         )
         messages = [
             {"role": "system", "content": prompt},
@@ -46,6 +201,7 @@ class PlanningAgent:
             tools=None,
             model=request.model,
             temperature=request.temperature or self.settings.planning_temperature,
+            accept=lambda item: isinstance(_json_field(item.content, "steps"), list),
         )
 
         try:
@@ -60,24 +216,29 @@ class PlanningAgent:
         for index, item in enumerate(raw_steps[:max_steps], start=1):
             title = str(item.get("title", f"Step {index}"))
             description = str(item.get("description", ""))
-            steps.append(PlanStep(id=index, title=title, description=description))
+            steps.append(
+                PlanStep(id=index, title=title, description=description, depends_on=_depends_on(item, index))
+            )
 
         if not steps:
             raise AppError("empty_plan", status_code=500)
         return steps
 
-    async def _execute_step(self, request: PlanRequest, step: PlanStep) -> StepResult:
+    async def _execute_step(
+        self, request: PlanRequest, step: PlanStep, inputs: list[StepResult], cache: bool | None = None
+    ) -> StepResult:
         prompt = (
             "You are executing a plan step. Return JSON only: "
             '{"status": "completed|failed", "output": "...", "error": "...|null"}. '
             "Keep output concise."
         )
+        content = f"Goal: {request.goal}\nStep: {step.title}\nDetails: {step.description}"
+        if inputs:
+            lines = [f"Step {item.id} {item.title}: {item.output or ''}" for item in inputs]
+            content += "\nResults of previous steps:\n" + "\n".join(lines)
         messages = [
             {"role": "system", "content": prompt},
-            {
-                "role": "user",
-                "content": f"Goal: {request.goal}\nStep: {step.title}\nDetails: {step.description}",
-            },
+            {"role": "user", "content": content},
         ]
 
         result = await self.llm.chat(
@@ -85,16 +246,24 @@ class PlanningAgent:
             tools=None,
             model=request.model,
             temperature=request.temperature or self.settings.planning_temperature,
+            cache=cache,
+            # Only successful steps are worth replaying; failures must be retried for real.
+            accept=lambda item: _json_field(item.content, "status") == "completed",
         )
+        return self._parse_step(step, result.content)
 
+    @staticmethod
+    def _parse_step(step: PlanStep, content: str) -> StepResult:
         try:
-            payload = json.loads(result.content)
+            payload = json.loads(content)
             status = payload.get("status", "failed")
             output = payload.get("output")
             error = payload.get("error")
         except (json.JSONDecodeError, ValueError) as exc:
             logger.warning("invalid_step_json: %s", exc)
-            return StepResult(id=step.id, title=step.title, status="failed", error="invalid_step_json")
+            return StepResult(
+                id=step.id, title=step.title, status="failed", error="invalid_step_json", depends_on=step.depends_on
+            )
 
         if status not in {"completed", "failed"}:
             status = "failed"
@@ -105,9 +274,15 @@ class PlanningAgent:
             status=status,
             output=str(output) if output is not None else None,
             error=str(error) if error else None,
+            depends_on=step.depends_on,
         )
 
     async def _summarize(self, goal: str, results: list[StepResult]) -> str:
+        result = await self.llm.chat(messages=self._summary_messages(goal, results), tools=None)
+        return result.content.strip() or "Execution summary unavailable."
+
+    @staticmethod
+    def _summary_messages(goal: str, results: list[StepResult]) -> list[dict[str, Any]]:
         # Summarize results even if partial.
         summary_prompt = (
             "Summarize the plan execution in 2-4 sentences. "
@@ -119,10 +294,35 @@ class PlanningAgent:
             if item.error:
                 lines.append(f"Error: {item.error}")
 
-        messages = [
+        return [
             {"role": "system", "content": summary_prompt},
             {"role": "user", "content": "\n".join(lines)},
         ]
 
-        result = await self.llm.chat(messages=messages, tools=None)
-        return result.content.strip() or "Execution summary unavailable."
+
+def _depends_on(item: dict[str, Any], index: int) -> list[int]:
+    """Earlier step ids a step depends on; without the key, the previous step (sequential plans)."""
+    raw = item.get("depends_on")
+    if raw is None:
+        return [index - 1] if index > 1 else []
+    if not isinstance(raw, list):
+        raw = [raw]
+    deps: set[int] = set()
+    for value in raw:
+        try:
+            dep = int(value)
+        except (TypeError, ValueError):
+            continue
+        # Only earlier steps, which also rules out cycles.
+        if 0 < dep < index:
+            deps.add(dep)
+    return sorted(deps)
+
+
+def _json_field(content: str, key: str) -> Any:
+    """``key`` of a JSON object reply, or None when the reply is not one."""
+    try:
+        payload = json.loads(content)
+    except ValueError:
+        return None
+    return payload.get(key) if isinstance(payload, dict) else None
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config.settings import Settings
+from app.core.errors import AppError
+from app.db.mongo.client import get_mongo_client
+from app.models.planning import PlanRequest, PlanRun, PlanStep, StepResult
+
+
+class PlanRunStore:
+    """Plan runs with per-step checkpoints in the ``plan_runs`` collection.
+
+    One document per run, keyed by ``run_id``. Step results are stored in a
+    ``results`` map keyed by step id and each one is written by its own
+    ``$set``, so steps finishing concurrently never overwrite each other.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self._settings = settings
+        self._client: AsyncIOMotorClient = get_mongo_client()
+        self._collection = self._client[settings.mongo_db]["plan_runs"]
+
+    async def ensure_indexes(self) -> None:
+        await self._collection.create_index("updated_at")
+
+    async def create(self, request: PlanRequest, steps: list[PlanStep]) -> str:
+        run_id = uuid4().hex
+        now = datetime.now(timezone.utc)
+        await self._collection.insert_one(
+            {
+                "_id": run_id,
+                "goal": request.goal,
+                "request": request.model_dump(),
+                "status": "running",
+                "steps": [step.model_dump() for step in steps],
+                "results": {},
+                "summary": None,
+                "success": None,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        return run_id
+
+    async def get(self, run_id: str) -> PlanRun:
+        doc = await self._collection.find_one({"_id": run_id})
+        if doc is None:
+            raise AppError("plan_run_not_found", status_code=404)
+        results = sorted(doc.get("results", {}).values(), key=lambda item: item["id"])
+        return PlanRun(
+            run_id=doc["_id"],
+            goal=doc["goal"],
+            request=doc["request"],
+            status=doc["status"],
+            steps=doc["steps"],
+            results=results,
+            summary=doc.get("summary"),
+            success=doc.get("success"),
+            created_at=doc["created_at"],
+            updated_at=doc["updated_at"],
+        )
+
+    async def checkpoint(self, run_id: str, result: StepResult) -> None:
+        await self._collection.update_one(
+            {"_id": run_id},
+            {"$set": {f"results.{result.id}": result.model_dump(), "updated_at": datetime.now(timezone.utc)}},
+        )
+
+    async def mark_running(self, run_id: str) -> None:
+        await self._set(run_id, status="running")
+
+    async def finish(self, run_id: str, summary: str, success: bool) -> None:
+        await self._set(run_id, status="completed" if success else "failed", summary=summary, success=success)
+
+    async def _set(self, run_id: str, **fields: object) -> None:
+        fields["updated_at"] = datetime.now(timezone.utc)
+        await self._collection.update_one({"_id": run_id}, {"$set": fields})
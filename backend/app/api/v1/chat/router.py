@@ -1,13 +1,22 @@
+import logging
+from typing import AsyncIterator
+
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 
+from app.core.errors import AppError
 from app.models.chat import ChatRequest, ChatResponse
 from app.services.chat_service import ChatService
+from app.services.container import ServiceContainer, get_services
+from app.utils.sse import format_sse
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-def get_chat_service() -> ChatService:
-    return ChatService()
+def get_chat_service(services: ServiceContainer = Depends(get_services)) -> ChatService:
+    return services.chat
 
 
 @router.post("")
@@ -16,6 +25,44 @@ async def chat(
     http_request: Request,
     service: ChatService = Depends(get_chat_service),
 ) -> ChatResponse:
+    _apply_client_headers(request, http_request)
+    output, session_id = await service.handle_chat(request)
+    return ChatResponse(
+        reply=output.reply,
+        session_id=session_id,
+        structured=output.data,
+        reasoning=output.reasoning,
+    )
+
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    http_request: Request,
+    service: ChatService = Depends(get_chat_service),
+) -> StreamingResponse:
+    _apply_client_headers(request, http_request)
+    return StreamingResponse(
+        _sse_events(service, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse_events(service: ChatService, request: ChatRequest) -> AsyncIterator[str]:
+    # Headers are already sent, so failures are reported as an in-band event.
+    try:
+        async for event in service.stream_chat(request):
+            yield format_sse(event.type, event.data)
+    except AppError as exc:
+        yield format_sse("error", {"error": exc.message})
+    except Exception:
+        logger.exception("chat_stream_failed")
+        yield format_sse("error", {"error": "internal_server_error"})
+    yield format_sse("done", {})
+
+
+def _apply_client_headers(request: ChatRequest, http_request: Request) -> None:
     header_role = http_request.headers.get("x-client-role")
     if header_role:
         request.role = header_role
@@ -29,11 +76,3 @@ async def chat(
     if permissions_header:
         permissions = [item.strip() for item in permissions_header.split(",") if item.strip()]
         request.permissions = sorted(set(request.permissions + permissions))
-
-    output, session_id = await service.handle_chat(request)
-    return ChatResponse(
-        reply=output.reply,
-        session_id=session_id,
-        structured=output.data,
-        reasoning=output.reasoning,
-    )
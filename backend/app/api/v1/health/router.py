@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.services.container import ServiceContainer, get_services
 
 router = APIRouter()
 
@@ -6,3 +8,8 @@ router = APIRouter()
 @router.get("")
 async def health_check() -> dict:
     return {"status": "ok"}
+
+
+@router.get("/metrics")
+async def metrics(services: ServiceContainer = Depends(get_services)) -> dict:
+    return {"rag_cache": services.rag.cache.stats(), "llm_cache": services.llm.cache.stats()}
@@ -1,15 +1,57 @@
+import logging
+from typing import AsyncIterator
+
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
-from app.models.planning import PlanRequest, PlanResponse
+from app.core.errors import AppError
+from app.models.planning import PlanRequest, PlanResponse, PlanRun
+from app.services.container import ServiceContainer, get_services
 from app.services.planning_service import PlanningService
+from app.utils.sse import KEEPALIVE, format_sse, with_heartbeat
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-def get_planning_service() -> PlanningService:
-    return PlanningService()
+def get_planning_service(services: ServiceContainer = Depends(get_services)) -> PlanningService:
+    return services.planning
 
 
 @router.post("")
 async def plan(request: PlanRequest, service: PlanningService = Depends(get_planning_service)) -> PlanResponse:
     return await service.run(request)
+
+
+@router.get("/runs/{run_id}")
+async def get_plan_run(run_id: str, service: PlanningService = Depends(get_planning_service)) -> PlanRun:
+    return await service.get_run(run_id)
+
+
+@router.post("/runs/{run_id}/resume")
+async def resume_plan_run(run_id: str, service: PlanningService = Depends(get_planning_service)) -> PlanResponse:
+    return await service.resume(run_id)
+
+
+@router.post("/stream")
+async def plan_stream(request: PlanRequest, service: PlanningService = Depends(get_planning_service)) -> StreamingResponse:
+    return StreamingResponse(
+        _sse_events(service, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse_events(service: PlanningService, request: PlanRequest) -> AsyncIterator[str]:
+    # Headers are already sent, so failures are reported as an in-band event.
+    try:
+        interval = service.settings.planning_stream_heartbeat_seconds
+        async for event in with_heartbeat(service.stream(request), interval):
+            yield KEEPALIVE if event is None else format_sse(event.type, event.data)
+    except AppError as exc:
+        yield format_sse("error", {"error": exc.message})
+    except Exception:
+        logger.exception("plan_stream_failed")
+        yield format_sse("error", {"error": "internal_server_error"})
+    yield format_sse("done", {})
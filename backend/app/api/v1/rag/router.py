@@ -1,25 +1,55 @@
 from fastapi import APIRouter, Depends, File, UploadFile
 
 from app.core.errors import AppError
-from app.rag.service import RAGService
+from app.models.rag import IngestJob, IngestJobList
+from app.rag.ingest import spool_upload
+from app.rag.jobs import SPOOL_SUFFIX, IngestJobQueue
+from app.services.container import ServiceContainer, get_services
 
 router = APIRouter()
 
 
-def get_rag_service() -> RAGService:
-    return RAGService()
+def get_ingest_jobs(services: ServiceContainer = Depends(get_services)) -> IngestJobQueue:
+    return services.ingest_jobs
 
 
-@router.post("/ingest")
-async def ingest_pdf(file: UploadFile = File(...), service: RAGService = Depends(get_rag_service)) -> dict:
+@router.post("/ingest", status_code=202)
+async def ingest_pdf(file: UploadFile = File(...), jobs: IngestJobQueue = Depends(get_ingest_jobs)) -> IngestJob:
+    _validate_pdf_upload(file)
+    return await _enqueue(file, jobs)
+
+
+@router.post("/ingest/bulk", status_code=202)
+async def ingest_pdf_bulk(
+    files: list[UploadFile] = File(...),
+    jobs: IngestJobQueue = Depends(get_ingest_jobs),
+) -> IngestJobList:
+    for file in files:
+        _validate_pdf_upload(file)
+    return IngestJobList(jobs=[await _enqueue(file, jobs) for file in files])
+
+
+@router.get("/jobs/{job_id}")
+async def get_ingest_job(job_id: str, jobs: IngestJobQueue = Depends(get_ingest_jobs)) -> IngestJob:
+    return jobs.get(job_id)
+
+
+def _validate_pdf_upload(file: UploadFile) -> None:
     if not file.filename:
         raise AppError("missing_filename", status_code=400)
     if not file.filename.lower().endswith(".pdf"):
         raise AppError("invalid_file_type", status_code=400)
 
-    data = await file.read()
-    count = await service.ingest_pdf_bytes(data, file.filename)
-    return {"chunks": count, "source": file.filename}
+
+async def _enqueue(file: UploadFile, jobs: IngestJobQueue) -> IngestJob:
+    path = await spool_upload(file, suffix=SPOOL_SUFFIX, directory=jobs.spool_dir())
+    try:
+        return await jobs.submit(path, file.filename)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    finally:
+        await file.close()
 
 
 @router.post("/upload-text")
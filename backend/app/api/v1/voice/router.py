@@ -2,18 +2,19 @@ from fastapi import APIRouter, Depends, UploadFile, File, Response
 from fastapi.responses import StreamingResponse
 
 from app.models.voice import TTSRequest, VoiceResponse
+from app.services.container import ServiceContainer, get_services
 from app.services.tts_service import TTSService
 from app.services.voice_service import VoiceService
 
 router = APIRouter()
 
 
-def get_voice_service() -> VoiceService:
-    return VoiceService()
+def get_voice_service(services: ServiceContainer = Depends(get_services)) -> VoiceService:
+    return services.voice
 
 
-def get_tts_service() -> TTSService:
-    return TTSService()
+def get_tts_service(services: ServiceContainer = Depends(get_services)) -> TTSService:
+    return services.tts
 
 
 @router.post("")
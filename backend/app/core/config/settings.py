@@ -1,6 +1,14 @@
+import logging
+import math
 from functools import lru_cache
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from app.llm.tokenizer import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
@@ -17,13 +25,58 @@ class Settings(BaseSettings):
     mongo_uri: str = "mongodb://localhost:27017"
     mongo_db: str = "ai_agent"
     memory_max_messages: int = 50
+    memory_storage: str = "messages"
+    memory_cache_sessions: int = 1000
+    memory_flush_interval_seconds: float = 0.5
+    memory_flush_batch_size: int = 500
+    memory_flush_max_retries: int = 3
+    memory_max_pending: int = 10000
+    memory_ttl_days: float = 0.0
 
     vector_db: str = "faiss"
     vector_store_path: str = "data/vectorstore"
     embedding_model: str = "all-MiniLM-L6-v2"
-    chunk_size: int = 800
-    chunk_overlap: int = 120
+    embedding_batch_size: int = 32
+    embedding_batch_wait_ms: float = 5.0
+    embedding_workers: int = 1
+    chunk_size_tokens: int = 200
+    chunk_overlap_tokens: int = 30
+    # Deprecated character sizes; converted to the token settings above when those are not set.
+    chunk_size: int | None = None
+    chunk_overlap: int | None = None
+    ingest_workers: int = 2
+    ingest_pages_per_task: int = 8
+    ingest_max_inflight_tasks: int = 4
+    ingest_batch_size: int = 64
+    ingest_queue_size: int = 2
+    ingest_jobs_path: str = "data/ingest_jobs"
+    ingest_job_workers: int = 2
+    ingest_job_retention_seconds: float = 86400.0
     rag_top_k: int = 4
+    rag_hybrid_enabled: bool = True
+    rag_lexical_top_k: int = 20
+    rag_rrf_k: int = 60
+    rag_bm25_k1: float = 1.2
+    rag_bm25_b: float = 0.75
+    rag_cache_enabled: bool = True
+    rag_cache_max_entries: int = 2048
+    rag_cache_ttl_seconds: float = 600.0
+    rag_cache_path: str = ""
+    rag_cache_disk_ttl_seconds: float = 86400.0
+    rag_cache_disk_max_entries: int = 100000
+    faiss_compaction_segments: int = 16
+    faiss_compaction_deleted_ratio: float = 0.2
+    faiss_search_overfetch: int = 4
+    faiss_index_type: str = "flat"
+    faiss_ann_min_vectors: int = 20000
+    faiss_train_size: int = 50000
+    faiss_ivf_nlist: int = 1024
+    faiss_pq_m: int = 16
+    faiss_pq_nbits: int = 8
+    faiss_hnsw_m: int = 32
+    faiss_hnsw_ef_construction: int = 200
+    faiss_nprobe: int = 16
+    faiss_hnsw_ef_search: int = 64
 
     system_prompt: str = "You are a helpful AI assistant."
     llm_api_base: str = "https://api.groq.com"
@@ -34,9 +87,36 @@ class Settings(BaseSettings):
     llm_max_retries: int = 3
     llm_max_tool_calls: int = 3
     llm_max_tokens: int = 2048
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1024
+    llm_cache_ttl_seconds: float = 300.0
+    llm_cache_semantic_enabled: bool = False
+    llm_cache_semantic_threshold: float = 0.95
+    llm_cache_semantic_bucket_size: int = 32
     agent_max_iterations: int = 5
+    agent_tool_mode: str = "json"
+    agent_tool_concurrency: int = 4
+    agent_tool_timeout_seconds: float = 30.0
+    tool_timeout_seconds: float = 30.0
+    tool_thread_workers: int = 8
+    tool_process_workers: int = 2
+    chat_prefetch_timeout_seconds: float = 2.0
+    context_max_tokens: int = 3000
+    context_recent_messages: int = 4
+    context_tokenizer: str = "cl100k_base"
     planning_max_steps: int = 6
     planning_temperature: float = 0.3
+    planning_max_concurrency: int = 3
+    planning_stream_heartbeat_seconds: float = 15.0
+    planning_persist_runs: bool = True
+    planning_checkpoint_timeout_seconds: float = 2.0
+
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http_timeout_seconds: float = 30.0
+    http_connect_timeout_seconds: float = 5.0
+    http_http2: bool = False
 
     whisper_model: str = "base"
     whisper_device: str = "cpu"
@@ -52,6 +132,21 @@ class Settings(BaseSettings):
     plugins_enabled: bool = True
     plugins_dir: str = "plugins"
     plugin_exec_timeout_seconds: float = 10.0
+    plugin_pool_size: int = 2
+    plugin_worker_max_calls: int = 200
+    plugin_worker_max_rss_mb: float = 512.0
+    plugin_worker_start_timeout_seconds: float = 30.0
+
+    @model_validator(mode="after")
+    def _convert_legacy_chunk_settings(self) -> "Settings":
+        for legacy, field in (("chunk_size", "chunk_size_tokens"), ("chunk_overlap", "chunk_overlap_tokens")):
+            chars = getattr(self, legacy)
+            if chars is None:
+                continue
+            logger.warning("deprecated_setting name=%s use=%s", legacy.upper(), field.upper())
+            if field not in self.model_fields_set:
+                setattr(self, field, math.ceil(chars / CHARS_PER_TOKEN))
+        return self
 
 
 @lru_cache
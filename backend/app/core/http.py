@@ -0,0 +1,51 @@
+import logging
+
+import httpx
+
+from app.core.config.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+_CLIENT: httpx.AsyncClient | None = None
+
+
+def get_http_client(settings: Settings | None = None) -> httpx.AsyncClient:
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = _build_client(settings or get_settings())
+    return _CLIENT
+
+
+async def close_http_client() -> None:
+    global _CLIENT
+    client, _CLIENT = _CLIENT, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("http_client_closed")
+
+
+def _build_client(settings: Settings) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    )
+    http2 = settings.http_http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("http2_unavailable: install httpx[http2]; falling back to HTTP/1.1")
+            http2 = False
+
+    logger.info(
+        "http_client_created max_connections=%s keepalive=%s http2=%s",
+        settings.http_max_connections,
+        settings.http_max_keepalive_connections,
+        http2,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        http2=http2,
+        timeout=httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds),
+    )
@@ -2,7 +2,19 @@ from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core.config.settings import get_settings
 
+_CLIENT: AsyncIOMotorClient | None = None
+
 
 def get_mongo_client() -> AsyncIOMotorClient:
-    settings = get_settings()
-    return AsyncIOMotorClient(settings.mongo_uri)
+    global _CLIENT
+    if _CLIENT is None:
+        settings = get_settings()
+        _CLIENT = AsyncIOMotorClient(settings.mongo_uri)
+    return _CLIENT
+
+
+def close_mongo_client() -> None:
+    global _CLIENT
+    client, _CLIENT = _CLIENT, None
+    if client is not None:
+        client.close()
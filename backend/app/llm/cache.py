@@ -0,0 +1,176 @@
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from app.core.config.settings import Settings
+from app.utils.cache import TTLCache
+
+if TYPE_CHECKING:
+    from app.llm.client import LLMResult
+    from app.rag.embeddings import EmbeddingClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CacheLookup:
+    """What ``ResponseCache.lookup`` computed for a request, reused by ``store``."""
+
+    key: str
+    result: "LLMResult | None" = None
+    # Semantic tier only: hash of everything but the last user message, and that message's vector.
+    bucket: str | None = None
+    vector: np.ndarray | None = None
+
+
+class ResponseCache:
+    """Cache of ``LLMClient.chat`` results.
+
+    The exact tier is keyed on a canonical hash of the request payload
+    (messages, model, temperature, max tokens, tools) and serves an
+    identical request within ``llm_cache_ttl_seconds``. Only
+    ``temperature == 0`` requests are cached unless the caller opts in, and
+    ``opt_in=False`` bypasses both tiers. The optional
+    semantic tier (``llm_cache_semantic_enabled``, needs an
+    ``EmbeddingClient``) only applies to ``temperature == 0`` requests: it
+    reuses a response when everything but the last user message is identical
+    and that message's embedding has cosine similarity of at least
+    ``llm_cache_semantic_threshold`` with a cached one.
+
+    Only plain-text answers are eligible for the semantic tier: requests
+    with ``tools`` or ``response_format`` skip it, and results with tool
+    calls or JSON content are never stored in it. A similar prompt must not
+    replay a tool call or a JSON decision made for different arguments.
+    """
+
+    def __init__(self, settings: Settings, embeddings: "EmbeddingClient | None" = None) -> None:
+        self.settings = settings
+        self.enabled = settings.llm_cache_enabled
+        self._exact = TTLCache(settings.llm_cache_max_entries, settings.llm_cache_ttl_seconds)
+        self._embeddings = embeddings if settings.llm_cache_semantic_enabled else None
+        # bucket -> [(expires_at, vector, result)], newest last
+        self._buckets = TTLCache(settings.llm_cache_max_entries, settings.llm_cache_ttl_seconds)
+        self._lock = Lock()
+        self._semantic_hits = 0
+        self._semantic_misses = 0
+
+    async def lookup(self, payload: dict[str, Any], opt_in: bool | None = None) -> CacheLookup:
+        if not self.enabled or opt_in is False:
+            return CacheLookup(key="")
+        if not opt_in and payload.get("temperature") != 0:
+            return CacheLookup(key="")
+        key = _hash(payload)
+        result = self._exact.get(key)
+        if result is not None:
+            return CacheLookup(key=key, result=result)
+
+        bucket, text = self._semantic_parts(payload)
+        if bucket is None:
+            return CacheLookup(key=key)
+        try:
+            vector = np.asarray(await self._embeddings.embed_query(text), dtype=np.float32)
+        except Exception as exc:
+            logger.warning("llm_cache_embedding_failed error=%s", exc)
+            return CacheLookup(key=key)
+        result = self._nearest(bucket, vector)
+        with self._lock:
+            if result is None:
+                self._semantic_misses += 1
+            else:
+                self._semantic_hits += 1
+        return CacheLookup(key=key, result=result, bucket=bucket, vector=vector)
+
+    def store(self, lookup: CacheLookup, result: "LLMResult") -> None:
+        if not self.enabled or not lookup.key:
+            return
+        if not result.content and not result.tool_calls:
+            return
+        self._exact.set(lookup.key, result)
+        if lookup.bucket is None or lookup.vector is None or not _is_plain_text(result):
+            return
+        expires_at = time.monotonic() + self.settings.llm_cache_ttl_seconds
+        with self._lock:
+            entries = self._live(self._buckets.get(lookup.bucket) or [])
+            entries.append((expires_at, lookup.vector, result))
+            limit = max(1, self.settings.llm_cache_semantic_bucket_size)
+            self._buckets.set(lookup.bucket, entries[-limit:])
+
+    def stats(self) -> dict[str, Any]:
+        exact = self._exact.stats()
+        semantic = self._semantic_hits + self._semantic_misses
+        # Every lookup goes through the exact tier; semantic lookups are the exact misses it covers.
+        hits = exact["hits"] + self._semantic_hits
+        lookups = exact["hits"] + exact["misses"]
+        return {
+            "enabled": self.enabled,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "exact": exact,
+            "semantic": {
+                "enabled": self._embeddings is not None,
+                "buckets": len(self._buckets),
+                "hits": self._semantic_hits,
+                "misses": self._semantic_misses,
+                "hit_rate": self._semantic_hits / semantic if semantic else 0.0,
+            },
+        }
+
+    def _semantic_parts(self, payload: dict[str, Any]) -> tuple[str | None, str]:
+        if self._embeddings is None or payload.get("temperature") != 0:
+            return None, ""
+        if payload.get("tools") or payload.get("response_format"):
+            return None, ""
+        messages = payload.get("messages") or []
+        if not messages or messages[-1].get("role") != "user":
+            return None, ""
+        text = messages[-1].get("content")
+        if not isinstance(text, str) or not text.strip():
+            return None, ""
+        return _hash({**payload, "messages": messages[:-1]}), text
+
+    def _nearest(self, bucket: str, vector: np.ndarray) -> "LLMResult | None":
+        with self._lock:
+            entries = self._live(self._buckets.get(bucket) or [])
+        if not entries:
+            return None
+        # Embeddings are normalized, so the dot product is the cosine similarity.
+        scores = np.stack([entry[1] for entry in entries]) @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.settings.llm_cache_semantic_threshold:
+            return None
+        return entries[best][2]
+
+    @staticmethod
+    def _live(entries: list[tuple]) -> list[tuple]:
+        now = time.monotonic()
+        return [entry for entry in entries if entry[0] > now]
+
+
+def _is_plain_text(result: "LLMResult") -> bool:
+    """True for a prose answer: no tool calls and not a JSON object or array (e.g. an agent decision)."""
+    if result.tool_calls:
+        return False
+    content = result.content.strip()
+    if not content.startswith(("{", "[")):
+        return True
+    try:
+        json.loads(content)
+    except ValueError:
+        return True
+    return False
+
+
+def _hash(payload: dict[str, Any]) -> str:
+    canonical = json.dumps(
+        {key: value for key, value in payload.items() if key != "stream"},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
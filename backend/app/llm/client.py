@@ -1,10 +1,14 @@
 import asyncio
+import json
 import logging
 from dataclasses import dataclass
+from typing import AsyncIterator, Callable
 
 import httpx
 
 from app.core.config.settings import Settings
+from app.core.http import get_http_client
+from app.llm.cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +20,9 @@ class LLMResult:
 
 
 class LLMClient:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(self, settings: Settings, cache: ResponseCache | None = None) -> None:
         self._settings = settings
+        self.cache = cache or ResponseCache(settings)
 
     async def chat(
         self,
@@ -25,7 +30,82 @@ class LLMClient:
         tools: list[dict[str, object]] | None = None,
         model: str | None = None,
         temperature: float | None = None,
+        cache: bool | None = None,
+        accept: Callable[["LLMResult"], bool] | None = None,
     ) -> LLMResult:
+        """One completion, served from ``self.cache`` when allowed.
+
+        ``cache=None`` caches only ``temperature == 0`` requests, ``True``
+        opts in at any temperature and ``False`` bypasses the cache (use it
+        on retries). A response is only stored when ``accept`` (if given)
+        returns true for it, so callers keep invalid or failed outputs out.
+        """
+        payload = self._payload(messages, tools, model, temperature)
+        lookup = await self.cache.lookup(payload, cache)
+        if lookup.result is not None:
+            return lookup.result
+
+        data = await self._post_json("/openai/v1/chat/completions", payload)
+        message = data["choices"][0]["message"]
+        result = LLMResult(
+            content=message.get("content") or "",
+            tool_calls=message.get("tool_calls") or [],
+        )
+        if accept is None or accept(result):
+            self.cache.store(lookup, result)
+        return result
+
+    async def stream_chat(
+        self,
+        messages: list[dict[str, object]],
+        tools: list[dict[str, object]] | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield content deltas as the provider streams them (``stream=True``)."""
+        async for item in self.stream_result(messages, tools, model, temperature):
+            if isinstance(item, str):
+                yield item
+
+    async def stream_result(
+        self,
+        messages: list[dict[str, object]],
+        tools: list[dict[str, object]] | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+    ) -> AsyncIterator[str | LLMResult]:
+        """Like ``stream_chat``, then yield the complete ``LLMResult`` with tool calls reassembled from deltas."""
+        payload = self._payload(messages, tools, model, temperature)
+        payload["stream"] = True
+        content: list[str] = []
+        tool_calls: dict[int, dict] = {}
+        async for chunk in self._post_stream("/openai/v1/chat/completions", payload):
+            choices = chunk.get("choices") or []
+            if not choices:
+                continue
+            delta = choices[0].get("delta") or {}
+            for part in delta.get("tool_calls") or []:
+                call = tool_calls.setdefault(
+                    part.get("index", len(tool_calls)),
+                    {"id": None, "type": "function", "function": {"name": "", "arguments": ""}},
+                )
+                call["id"] = part.get("id") or call["id"]
+                function = part.get("function") or {}
+                call["function"]["name"] += function.get("name") or ""
+                call["function"]["arguments"] += function.get("arguments") or ""
+            text = delta.get("content")
+            if text:
+                content.append(text)
+                yield text
+        yield LLMResult(content="".join(content), tool_calls=[tool_calls[index] for index in sorted(tool_calls)])
+
+    def _payload(
+        self,
+        messages: list[dict[str, object]],
+        tools: list[dict[str, object]] | None,
+        model: str | None,
+        temperature: float | None,
+    ) -> dict[str, object]:
         if not self._settings.llm_api_key:
             raise ValueError("LLM_API_KEY is required")
 
@@ -38,25 +118,61 @@ class LLMClient:
         if tools:
             payload["tools"] = tools
             payload["tool_choice"] = "auto"
+        return payload
 
-        data = await self._post_json("/openai/v1/chat/completions", payload)
-        message = data["choices"][0]["message"]
-        return LLMResult(
-            content=message.get("content") or "",
-            tool_calls=message.get("tool_calls") or [],
-        )
-
-    async def _post_json(self, path: str, payload: dict[str, object]) -> dict[str, object]:
+    def _request_parts(self, path: str) -> tuple[str, dict[str, str]]:
         url = f"{self._settings.llm_api_base.rstrip('/')}{path}"
         headers = {
             "Authorization": f"Bearer {self._settings.llm_api_key}",
             "Content-Type": "application/json",
         }
+        return url, headers
+
+    async def _post_stream(self, path: str, payload: dict[str, object]) -> AsyncIterator[dict[str, object]]:
+        url, headers = self._request_parts(path)
+
+        for attempt in range(1, self._settings.llm_max_retries + 1):
+            received = False
+            try:
+                client = get_http_client(self._settings)
+                async with client.stream(
+                    "POST",
+                    url,
+                    json=payload,
+                    headers=headers,
+                    timeout=self._settings.llm_timeout_seconds,
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:") :].strip()
+                        if data == "[DONE]":
+                            return
+                        received = True
+                        yield json.loads(data)
+                return
+            except (httpx.HTTPError, ValueError, KeyError) as exc:
+                # Once deltas have been handed out a retry would duplicate them.
+                if received or attempt >= self._settings.llm_max_retries:
+                    logger.exception("LLM stream failed")
+                    raise
+                backoff = 0.5 * (2 ** (attempt - 1))
+                logger.warning("LLM stream failed (attempt %s): %s", attempt, exc)
+                await asyncio.sleep(backoff)
+
+    async def _post_json(self, path: str, payload: dict[str, object]) -> dict[str, object]:
+        url, headers = self._request_parts(path)
 
         for attempt in range(1, self._settings.llm_max_retries + 1):
             try:
-                async with httpx.AsyncClient(timeout=self._settings.llm_timeout_seconds) as client:
-                    response = await client.post(url, json=payload, headers=headers)
+                client = get_http_client(self._settings)
+                response = await client.post(
+                    url,
+                    json=payload,
+                    headers=headers,
+                    timeout=self._settings.llm_timeout_seconds,
+                )
                 response.raise_for_status()
                 return response.json()
             except (httpx.HTTPError, ValueError, KeyError) as exc:
@@ -0,0 +1,135 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.config.settings import Settings
+from app.llm.tokenizer import TokenCounter
+from app.models.chat import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+# Shorter shared edges between two chunks are treated as coincidence, not overlap.
+_MIN_OVERLAP_CHARS = 16
+
+
+@dataclass(frozen=True)
+class AssembledContext:
+    history: list[ChatMessage]
+    usage: dict[str, int] = field(default_factory=dict)
+
+
+class ContextAssembler:
+    """Pack conversation history and retrieved chunks into a token budget.
+
+    The system prompt and the user message are always sent. The remaining
+    ``context_max_tokens`` are filled greedily: the most recent
+    ``context_recent_messages`` history messages first, then RAG chunks in
+    rank order, then older history from newest to oldest. Chunks that repeat
+    text already selected (the overlap between neighbouring chunks) are
+    trimmed before they are counted.
+    """
+
+    def __init__(self, settings: Settings, counter: TokenCounter | None = None) -> None:
+        self.settings = settings
+        self.counter = counter or TokenCounter(settings.context_tokenizer)
+
+    def assemble(
+        self,
+        system_prompt: str,
+        message: str,
+        history: list[ChatMessage],
+        hits: list[dict[str, Any]],
+    ) -> AssembledContext:
+        budget = self.settings.context_max_tokens
+        fixed = self.counter.count_message(system_prompt) + self.counter.count_message(message)
+        remaining = budget - fixed
+
+        history_costs = [self.counter.count_message(item.content) for item in history]
+        recent = max(0, self.settings.context_recent_messages)
+        kept: set[int] = set()
+
+        def take_history(indices: range) -> None:
+            nonlocal remaining
+            for index in indices:
+                if history_costs[index] > remaining:
+                    return
+                kept.add(index)
+                remaining -= history_costs[index]
+
+        take_history(range(len(history) - 1, max(-1, len(history) - 1 - recent), -1))
+
+        chunks: list[str] = []
+        rag_tokens = 0
+        # The "Context:" header and message wrapper are paid once, with the first chunk.
+        header_cost = self.counter.count_message("Context:")
+        for text in _dedupe(hits):
+            cost = self.counter.count(text) + (0 if chunks else header_cost)
+            if cost > remaining:
+                continue
+            chunks.append(text)
+            rag_tokens += cost
+            remaining -= cost
+
+        take_history(range(len(history) - 1 - recent, -1, -1))
+
+        selected = [history[index] for index in sorted(kept)]
+        if chunks:
+            context = "\n\n".join(chunks)
+            selected.insert(0, ChatMessage(role="system", name="rag_context", content=f"Context:\n{context}"))
+
+        history_tokens = sum(history_costs[index] for index in kept)
+        usage = {
+            "budget": budget,
+            "used": fixed + history_tokens + rag_tokens,
+            "fixed": fixed,
+            "history": history_tokens,
+            "history_messages": len(kept),
+            "history_dropped": len(history) - len(kept),
+            "rag": rag_tokens,
+            "rag_chunks": len(chunks),
+            "rag_dropped": len(hits) - len(chunks),
+        }
+        logger.info(
+            "context_assembled used=%s budget=%s history=%s/%s rag=%s/%s",
+            usage["used"],
+            budget,
+            len(kept),
+            len(history),
+            len(chunks),
+            len(hits),
+        )
+        return AssembledContext(history=selected, usage=usage)
+
+
+def _dedupe(hits: list[dict[str, Any]]) -> list[str]:
+    """Drop repeated chunks and trim text a higher-ranked chunk already covers."""
+    kept: list[str] = []
+    for hit in hits:
+        text = hit["text"].strip()
+        for other in kept:
+            if not text:
+                break
+            if text in other:
+                text = ""
+                break
+            text = text[_overlap(other, text) :]
+            tail = _overlap(text, other)
+            if tail:
+                text = text[:-tail]
+        text = text.strip()
+        if text:
+            kept.append(text)
+    return kept
+
+
+def _overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of ``left`` that is a prefix of ``right``."""
+    if len(left) < _MIN_OVERLAP_CHARS or len(right) < _MIN_OVERLAP_CHARS:
+        return 0
+    probe = right[:_MIN_OVERLAP_CHARS]
+    start = max(0, len(left) - len(right))
+    while (index := left.find(probe, start)) != -1:
+        if right.startswith(left[index:]):
+            return len(left) - index
+        start = index + 1
+    return 0
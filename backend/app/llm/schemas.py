@@ -3,13 +3,28 @@ from typing import Literal
 from pydantic import BaseModel, Field
 
 
+class ToolCall(BaseModel):
+    name: str
+    args: dict = Field(default_factory=dict)
+    id: str | None = None
+
+
 class AgentDecision(BaseModel):
     action: Literal["tool", "final"]
     reply: str
     tool_name: str | None = None
     tool_args: dict | None = None
+    tool_calls: list[ToolCall] = Field(default_factory=list)
     reasoning: list[str] = Field(default_factory=list)
 
+    def calls(self) -> list[ToolCall]:
+        """Requested tool calls: ``tool_calls``, or the single ``tool_name``/``tool_args`` form."""
+        if self.tool_calls:
+            return list(self.tool_calls)
+        if self.tool_name:
+            return [ToolCall(name=self.tool_name, args=self.tool_args or {})]
+        return []
+
 
 class StructuredOutput(BaseModel):
     reply: str
@@ -0,0 +1,111 @@
+import json
+import re
+
+_ACTION_RE = re.compile(r'"action"\s*:\s*"(tool|final)"')
+_REPLY_RE = re.compile(r'"reply"\s*:\s*"')
+
+
+class DecisionStreamParser:
+    """Incrementally extract the ``reply`` of an agent decision while it streams.
+
+    The agent answers with a JSON object (see ``AgentDecision``). Reply text is
+    only released once the decision is known to be ``final``; text that arrives
+    before the ``action`` key is held back until then. Content that does not
+    start with ``{`` is treated as a plain-text reply, matching the fallback in
+    ``AgentLoop``.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._mode: str | None = None
+        self._action: str | None = None
+        self._reply_cursor: int | None = None
+        self._reply_done = False
+        self._pending: list[str] = []
+
+    @property
+    def content(self) -> str:
+        return self._buffer
+
+    @property
+    def action(self) -> str | None:
+        return self._action
+
+    def feed(self, delta: str) -> list[str]:
+        self._buffer += delta
+
+        if self._mode is None:
+            stripped = self._buffer.lstrip()
+            if not stripped:
+                return []
+            self._mode = "json" if stripped.startswith("{") else "text"
+            if self._mode == "text":
+                return [self._buffer]
+            return self._scan()
+
+        if self._mode == "text":
+            return [delta]
+        return self._scan()
+
+    def _scan(self) -> list[str]:
+        if self._action is None:
+            match = _ACTION_RE.search(self._buffer)
+            if match:
+                self._action = match.group(1)
+
+        if self._reply_cursor is None:
+            match = _REPLY_RE.search(self._buffer)
+            if match:
+                self._reply_cursor = match.end()
+
+        if self._reply_cursor is not None and not self._reply_done:
+            text = self._read_reply()
+            if text:
+                self._pending.append(text)
+
+        if self._action != "final":
+            return []
+        released, self._pending = self._pending, []
+        return released
+
+    def _read_reply(self) -> str:
+        buffer = self._buffer
+        start = index = self._reply_cursor or 0
+        while index < len(buffer):
+            char = buffer[index]
+            if char == '"':
+                self._reply_done = True
+                break
+            if char != "\\":
+                index += 1
+                continue
+            # Never split an escape sequence across two releases.
+            if index + 1 >= len(buffer):
+                break
+            if buffer[index + 1] != "u":
+                index += 2
+                continue
+            if index + 6 > len(buffer):
+                break
+            if _is_high_surrogate(buffer[index + 2 : index + 6]):
+                if index + 12 > len(buffer):
+                    break
+                index += 12
+                continue
+            index += 6
+
+        raw = buffer[start:index]
+        self._reply_cursor = index + 1 if self._reply_done else index
+        if not raw:
+            return ""
+        try:
+            return json.loads(f'"{raw}"')
+        except ValueError:
+            return raw
+
+
+def _is_high_surrogate(code: str) -> bool:
+    try:
+        return 0xD800 <= int(code, 16) <= 0xDBFF
+    except ValueError:
+        return False
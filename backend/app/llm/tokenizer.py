@@ -0,0 +1,91 @@
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+# Every code point with str.isspace(); none lie above U+3000.
+_WHITESPACE = np.array([code for code in range(0x3001) if chr(code).isspace()], dtype=np.uint32)
+
+# Estimate: one token per punctuation mark and per this many characters of a word.
+CHARS_PER_TOKEN = 4
+
+# Chat formats wrap every message in a few role/separator tokens.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class TokenCounter:
+    """Count prompt tokens locally.
+
+    Uses ``tiktoken`` when it is installed and the encoding can be loaded;
+    otherwise falls back to ``estimate_tokens``, which tracks BPE tokenizers
+    closely enough for budgeting.
+    """
+
+    def __init__(self, encoding: str = "cl100k_base", cache_size: int = 4096) -> None:
+        self.encoding = encoding
+        self.exact = False
+        encode = _load_encoder(encoding)
+        if encode is not None:
+            self.exact = True
+            self._count = lru_cache(maxsize=cache_size)(lambda text: len(encode(text)))
+        else:
+            self._count = lru_cache(maxsize=cache_size)(estimate_tokens)
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return self._count(text)
+
+    def count_message(self, content: str) -> int:
+        return self.count(content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def estimate_tokens(text: str) -> int:
+    """One token per punctuation mark and per ``CHARS_PER_TOKEN`` characters of each word."""
+    return sum(math.ceil(len(token) / CHARS_PER_TOKEN) for token in _WORD_RE.findall(text))
+
+
+def whitespace_mask(codes: np.ndarray) -> np.ndarray:
+    """True where the UTF-32 code points in ``codes`` are whitespace."""
+    return np.isin(codes, _WHITESPACE)
+
+
+def estimate_token_costs(text: str) -> np.ndarray:
+    """``estimate_tokens`` spread over the code points of ``text``, as an int8 array.
+
+    Each punctuation mark costs 1, as does every ``CHARS_PER_TOKEN``-th
+    character of a word counted from its first; whitespace costs 0. The sum
+    over a slice starting at a punctuation mark or at a character that costs
+    1 equals ``estimate_tokens`` of that slice.
+    """
+    if not text:
+        return np.zeros(0, dtype=np.int8)
+    # Mark punctuation with NUL (itself punctuation) to classify code points without a Python loop.
+    marked = np.frombuffer(_PUNCT_RE.sub("\0", text).encode("utf-32-le"), dtype=np.uint32)
+    punct = marked == 0
+    word = ~punct & ~whitespace_mask(marked)
+    index = np.arange(len(word))
+    run_start = word & ~np.concatenate(([False], word[:-1]))
+    offset = index - np.maximum.accumulate(np.where(run_start, index, 0))
+    return (punct | (word & (offset % CHARS_PER_TOKEN == 0))).astype(np.int8)
+
+
+def _load_encoder(encoding: str) -> Callable[[str], list[int]] | None:
+    try:
+        import tiktoken
+    except ImportError:
+        logger.info("tiktoken_unavailable: estimating token counts")
+        return None
+    try:
+        codec = tiktoken.get_encoding(encoding)
+    except Exception as exc:
+        logger.warning("tiktoken_encoding_unavailable encoding=%s error=%s", encoding, exc)
+        return None
+    return lambda text: codec.encode(text, disallowed_special=())
@@ -1,21 +1,47 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
 from app.core.config.settings import get_settings
 from app.core.errors import add_error_handlers
+from app.core.http import get_http_client
 from app.middleware.logging import LoggingMiddleware
 from app.middleware.security import SecurityMiddleware
 from app.core.logging import setup_logging
-from app.memory.short_term.conversation import ConversationMemory
+from app.services.container import ServiceContainer
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
     setup_logging(settings.log_level)
 
-    app = FastAPI(title=settings.app_name, version=settings.app_version)
+    @asynccontextmanager
+    async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+        get_http_client(settings)
+        services = ServiceContainer(settings)
+        application.state.services = services
+        await services.start()
+        try:
+            # Set a short timeout for MongoDB connection
+            await asyncio.wait_for(
+                asyncio.gather(services.memory.ensure_indexes(), services.planning.ensure_indexes()), timeout=5.0
+            )
+            logging.getLogger(__name__).info("MongoDB indexes created")
+        except asyncio.TimeoutError:
+            logging.getLogger(__name__).warning("MongoDB connection timeout. Memory features will be disabled.")
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"MongoDB not available: {e}. Memory features will be disabled.")
+
+        yield
+
+        await services.aclose()
+
+    app = FastAPI(title=settings.app_name, version=settings.app_version, lifespan=lifespan)
     app.add_middleware(LoggingMiddleware)
     app.add_middleware(SecurityMiddleware)
     app.add_middleware(
@@ -29,19 +55,6 @@ def create_app() -> FastAPI:
     add_error_handlers(app)
     app.include_router(api_router, prefix="/api/v1")
 
-    @app.on_event("startup")
-    async def startup() -> None:
-        try:
-            import asyncio
-            memory = ConversationMemory(settings)
-            # Set a short timeout for MongoDB connection
-            await asyncio.wait_for(memory.ensure_indexes(), timeout=5.0)
-            logging.getLogger(__name__).info("MongoDB indexes created")
-        except asyncio.TimeoutError:
-            logging.getLogger(__name__).warning("MongoDB connection timeout. Memory features will be disabled.")
-        except Exception as e:
-            logging.getLogger(__name__).warning(f"MongoDB not available: {e}. Memory features will be disabled.")
-
     logging.getLogger(__name__).info("App initialized")
     return app
 
@@ -1,42 +1,244 @@
+import asyncio
+import logging
+from collections import OrderedDict, deque
 from datetime import datetime, timezone
 from typing import Iterable
 
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 
 from app.core.config.settings import Settings
 from app.db.mongo.client import get_mongo_client
 from app.models.chat import ChatMessage
 
+logger = logging.getLogger(__name__)
+
+_DUPLICATE_KEY = 11000
+STORAGE_MODES = ("messages", "session")
+
 
 class ConversationMemory:
+    """Recent chat history per session, cached in process and written behind to Mongo.
+
+    Hot sessions live in an LRU of ring buffers (``memory_max_messages`` each,
+    at most ``memory_cache_sessions`` sessions), so ``get_history`` on an
+    active session and ``append_messages`` never wait on Mongo. Appended
+    messages are queued and inserted by a background flusher in batches that
+    span sessions. Old messages are trimmed lazily (once a session has
+    received ``memory_max_messages`` new messages since its last trim) and,
+    optionally, expired by a TTL index.
+
+    ``memory_storage`` selects the Mongo layout: ``"messages"`` stores one
+    document per message in ``chat_messages``; ``"session"`` stores one
+    document per session in ``chat_sessions`` whose ``messages`` array is
+    appended and capped by a single ``$push``/``$slice`` update, so reads are
+    a ``find_one`` by ``_id`` and no trim query is ever needed. Use
+    ``python -m app.memory.short_term.migrate`` to move existing data.
+
+    The cache is per process: run a single worker per session (or sticky
+    sessions) when serving from several processes.
+    """
+
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
         self._client: AsyncIOMotorClient = get_mongo_client()
-        self._collection = self._client[settings.mongo_db]["chat_messages"]
+        if settings.memory_storage not in STORAGE_MODES:
+            logger.warning("memory_unknown_storage mode=%s", settings.memory_storage)
+        self._session_mode = settings.memory_storage == "session"
+        database = self._client[settings.mongo_db]
+        self._collection = database["chat_sessions" if self._session_mode else "chat_messages"]
+        self._sessions: OrderedDict[str, deque[ChatMessage]] = OrderedDict()
+        self._pending: deque[dict] = deque()
+        self._inflight: list[dict] = []
+        self._since_trim: dict[str, int] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._flusher: asyncio.Task | None = None
 
     async def ensure_indexes(self) -> None:
-        await self._collection.create_index("session_id")
-        await self._collection.create_index("created_at")
+        if not self._session_mode:
+            await self._collection.create_index([("session_id", 1), ("created_at", -1)])
+        # Sessions expire as a whole once idle; single messages expire by age.
+        field = "updated_at" if self._session_mode else "created_at"
+        ttl_days = self._settings.memory_ttl_days
+        try:
+            if ttl_days > 0:
+                await self._collection.create_index(field, expireAfterSeconds=int(ttl_days * 86400))
+            else:
+                await self._collection.create_index(field)
+        except OperationFailure as exc:
+            # An existing index on the field with other options; drop it to switch TTL on or off.
+            logger.warning("memory_ttl_index_conflict field=%s error=%s", field, exc)
 
     async def get_history(self, session_id: str) -> list[ChatMessage]:
-        cursor = (
-            self._collection.find({"session_id": session_id})
-            .sort("created_at", -1)
-            .limit(self._settings.memory_max_messages)
+        buffer = self._sessions.get(session_id)
+        if buffer is not None:
+            self._sessions.move_to_end(session_id)
+            return list(buffer)
+
+        docs = await self._load(session_id)
+        # Messages the flusher has not written yet are newer than anything in Mongo.
+        stored = {doc["_id"] for doc in docs}
+        docs.extend(
+            doc
+            for doc in (*self._inflight, *self._pending)
+            if doc["session_id"] == session_id and doc["_id"] not in stored
         )
-        items = [self._doc_to_message(doc) async for doc in cursor]
-        return list(reversed(items))
+        items = [self._doc_to_message(doc) for doc in docs]
+        self._cache(session_id, items)
+        return items[-self._settings.memory_max_messages :]
 
     async def append_messages(self, session_id: str, messages: Iterable[ChatMessage]) -> None:
-        docs = [self._message_to_doc(session_id, message) for message in messages]
-        if docs:
-            await self._collection.insert_many(docs)
-            await self._trim_excess(session_id)
+        messages = list(messages)
+        if not messages:
+            return
+        buffer = self._sessions.get(session_id)
+        if buffer is not None:
+            buffer.extend(messages)
+            self._sessions.move_to_end(session_id)
+
+        self._pending.extend(self._message_to_doc(session_id, message) for message in messages)
+        overflow = len(self._pending) - self._settings.memory_max_pending
+        if overflow > 0:
+            for _ in range(overflow):
+                self._pending.popleft()
+            logger.warning("memory_pending_overflow dropped=%s", overflow)
+        self._ensure_flusher()
+        if len(self._pending) >= self._settings.memory_flush_batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Write every queued message now."""
+        while self._pending:
+            await self._flush_batch()
+
+    async def aclose(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("memory_flush_on_close_failed pending=%s", len(self._pending))
+
+    async def _load(self, session_id: str) -> list[dict]:
+        """Stored messages of a session, oldest first."""
+        limit = self._settings.memory_max_messages
+        if self._session_mode:
+            doc = await self._collection.find_one({"_id": session_id}, {"messages": {"$slice": -limit}})
+            return [{**message, "session_id": session_id} for message in (doc or {}).get("messages", [])]
+
+        cursor = self._collection.find({"session_id": session_id}).sort([("created_at", -1), ("_id", -1)]).limit(limit)
+        docs = [doc async for doc in cursor]
+        docs.reverse()
+        return docs
+
+    def _cache(self, session_id: str, items: list[ChatMessage]) -> None:
+        self._sessions[session_id] = deque(items, maxlen=max(1, self._settings.memory_max_messages))
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > max(1, self._settings.memory_cache_sessions):
+            evicted, _ = self._sessions.popitem(last=False)
+            self._since_trim.pop(evicted, None)
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._wakeup = asyncio.Event()
+            self._flusher = asyncio.create_task(self._run_flusher(), name="memory-flusher")
+
+    async def _run_flusher(self) -> None:
+        interval = max(0.01, self._settings.memory_flush_interval_seconds)
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._pending:
+                try:
+                    await self._flush_batch()
+                except Exception:
+                    # Already retried; the batch is dropped so the queue stays bounded.
+                    logger.exception("memory_flush_failed")
+
+    async def _flush_batch(self) -> None:
+        size = max(1, self._settings.memory_flush_batch_size)
+        batch = [self._pending.popleft() for _ in range(min(size, len(self._pending)))]
+        self._inflight = batch
+        try:
+            await self._write_with_retry(batch)
+        except asyncio.CancelledError:
+            # Shutting down mid-write: requeue so aclose() writes the batch (ids make it idempotent).
+            self._pending.extendleft(reversed(batch))
+            raise
+        finally:
+            self._inflight = []
+        if self._session_mode:
+            return
+
+        for doc in batch:
+            session_id = doc["session_id"]
+            # Only hot sessions are counted, which keeps this map as bounded as the LRU.
+            if session_id in self._sessions:
+                self._since_trim[session_id] = self._since_trim.get(session_id, 0) + 1
+        for session_id in {doc["session_id"] for doc in batch}:
+            if self._since_trim.get(session_id, 0) >= self._settings.memory_max_messages:
+                del self._since_trim[session_id]
+                try:
+                    await self._trim_excess(session_id)
+                except Exception as exc:
+                    logger.warning("memory_trim_failed session_id=%s error=%s", session_id, exc)
+
+    async def _write(self, batch: list[dict]) -> None:
+        if not self._session_mode:
+            await self._collection.insert_many(batch, ordered=False)
+            return
+
+        grouped: dict[str, list[dict]] = {}
+        for doc in batch:
+            message = {key: value for key, value in doc.items() if key != "session_id"}
+            grouped.setdefault(doc["session_id"], []).append(message)
+        now = datetime.now(timezone.utc)
+        updates = [
+            UpdateOne(
+                # A retry after a partial write finds the first message already pushed; the upsert
+                # then collides on _id and is reported as a duplicate key instead of pushing twice.
+                {"_id": session_id, "messages._id": {"$ne": messages[0]["_id"]}},
+                {
+                    "$push": {"messages": {"$each": messages, "$slice": -self._settings.memory_max_messages}},
+                    "$set": {"updated_at": now},
+                },
+                upsert=True,
+            )
+            for session_id, messages in grouped.items()
+        ]
+        await self._collection.bulk_write(updates, ordered=False)
+
+    async def _write_with_retry(self, batch: list[dict]) -> None:
+        retries = max(0, self._settings.memory_flush_max_retries)
+        for attempt in range(retries + 1):
+            try:
+                await self._write(batch)
+                return
+            except BulkWriteError as exc:
+                # Ids are assigned up front, so a retry only collides with what an earlier attempt wrote.
+                errors = exc.details.get("writeErrors", [])
+                if errors and all(error.get("code") == _DUPLICATE_KEY for error in errors):
+                    return
+                failure: Exception = exc
+            except Exception as exc:
+                failure = exc
+            if attempt >= retries:
+                logger.error("memory_flush_dropped messages=%s error=%s", len(batch), failure)
+                raise failure
+            logger.warning("memory_flush_retry attempt=%s error=%s", attempt + 1, failure)
+            await asyncio.sleep(0.2 * 2**attempt)
 
     async def _trim_excess(self, session_id: str) -> None:
         cursor = (
             self._collection.find({"session_id": session_id})
-            .sort("created_at", -1)
+            .sort([("created_at", -1), ("_id", -1)])
             .skip(self._settings.memory_max_messages)
             .project({"_id": 1})
         )
@@ -47,6 +249,7 @@ class ConversationMemory:
     @staticmethod
     def _message_to_doc(session_id: str, message: ChatMessage) -> dict:
         return {
+            "_id": ObjectId(),
             "session_id": session_id,
             "role": message.role,
             "content": message.content,
@@ -0,0 +1,96 @@
+"""Copy per-message history from ``chat_messages`` into per-session ``chat_sessions`` documents.
+
+Runs as one server-side aggregation ending in ``$merge``, keeping the newest
+``memory_max_messages`` messages of each session. Messages already present in
+a session document (matched by ``_id``) are skipped, so the migration can be
+re-run, e.g. after switching ``MEMORY_STORAGE=session`` while old workers were
+still writing per-message documents.
+
+    cd backend && python -m app.memory.short_term.migrate [--drop-source]
+"""
+import argparse
+import logging
+
+from pymongo import MongoClient
+
+from app.core.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def migrate(client: MongoClient, database: str, limit: int) -> int:
+    db = client[database]
+    pipeline = [
+        {"$sort": {"session_id": 1, "created_at": 1, "_id": 1}},
+        {
+            "$group": {
+                "_id": "$session_id",
+                "messages": {
+                    "$push": {
+                        "_id": "$_id",
+                        "role": "$role",
+                        "content": "$content",
+                        "name": "$name",
+                        "tool_call_id": "$tool_call_id",
+                        "created_at": "$created_at",
+                    }
+                },
+                "updated_at": {"$max": "$created_at"},
+            }
+        },
+        {"$project": {"messages": {"$slice": ["$messages", -limit]}, "updated_at": 1}},
+        {
+            "$merge": {
+                "into": "chat_sessions",
+                "on": "_id",
+                "whenMatched": [
+                    {
+                        "$set": {
+                            "messages": {
+                                "$slice": [
+                                    {
+                                        "$concatArrays": [
+                                            {
+                                                "$filter": {
+                                                    "input": "$$new.messages",
+                                                    "cond": {"$not": [{"$in": ["$$this._id", "$messages._id"]}]},
+                                                }
+                                            },
+                                            "$messages",
+                                        ]
+                                    },
+                                    -limit,
+                                ]
+                            },
+                            "updated_at": {"$max": ["$updated_at", "$$new.updated_at"]},
+                        }
+                    }
+                ],
+                "whenNotMatched": "insert",
+            }
+        },
+    ]
+    db["chat_messages"].aggregate(pipeline, allowDiskUse=True)
+    return db["chat_sessions"].count_documents({})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drop-source", action="store_true", help="drop chat_messages after a successful copy")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    client = MongoClient(settings.mongo_uri)
+    try:
+        sessions = migrate(client, settings.mongo_db, settings.memory_max_messages)
+        logger.info("memory_migrated sessions=%s", sessions)
+        if args.drop_source:
+            client[settings.mongo_db].drop_collection("chat_messages")
+            logger.info("memory_source_dropped collection=chat_messages")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
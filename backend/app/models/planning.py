@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Literal
 
 from pydantic import BaseModel, Field
@@ -14,14 +15,16 @@ class PlanStep(BaseModel):
     id: int
     title: str
     description: str
+    depends_on: list[int] = Field(default_factory=list)
 
 
 class StepResult(BaseModel):
     id: int
     title: str
-    status: Literal["pending", "running", "completed", "failed"]
+    status: Literal["pending", "running", "completed", "failed", "skipped"]
     output: str | None = None
     error: str | None = None
+    depends_on: list[int] = Field(default_factory=list)
 
 
 class PlanResponse(BaseModel):
@@ -29,3 +32,17 @@ class PlanResponse(BaseModel):
     steps: list[StepResult] = Field(default_factory=list)
     summary: str
     success: bool
+    run_id: str | None = None
+
+
+class PlanRun(BaseModel):
+    run_id: str
+    goal: str
+    request: PlanRequest
+    status: Literal["running", "completed", "failed"]
+    steps: list[PlanStep] = Field(default_factory=list)
+    results: list[StepResult] = Field(default_factory=list)
+    summary: str | None = None
+    success: bool | None = None
+    created_at: datetime
+    updated_at: datetime
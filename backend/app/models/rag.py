@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class IngestJob(BaseModel):
+    job_id: str
+    source: str
+    status: Literal["queued", "running", "completed", "failed"] = "queued"
+    pages_total: int = 0
+    pages_done: int = 0
+    chunks_done: int = 0
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class IngestJobList(BaseModel):
+    jobs: list[IngestJob] = Field(default_factory=list)
@@ -1,51 +1,204 @@
+import asyncio
 import importlib.util
 import logging
 import multiprocessing
+from collections import deque
+from multiprocessing.connection import Connection
 from pathlib import Path
+from threading import Lock
 from typing import Any
 
+from app.core.config.settings import Settings
 from app.core.errors import AppError
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
 logger = logging.getLogger(__name__)
 
+_POOLS: dict[str, "PluginWorkerPool"] = {}
+_POOLS_LOCK = Lock()
+
+
+def get_plugin_pool(entry_path: Path, settings: Settings) -> "PluginWorkerPool":
+    key = str(entry_path.resolve())
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = PluginWorkerPool(entry_path, settings)
+    return pool
+
+
+def shutdown_plugin_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
+class _Worker:
+    def __init__(self, context: multiprocessing.context.SpawnContext, entry_path: str) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(entry_path, child), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.calls = 0
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+
+class PluginWorkerPool:
+    """Pre-warmed worker processes for one plugin entry module.
+
+    Each worker is a ``spawn`` process that imports the entry module once and
+    then serves ``invoke`` calls over a pipe, so a call costs a round-trip
+    instead of a process start and import. Calls are awaited without blocking
+    the event loop. A worker is replaced after ``plugin_worker_max_calls``
+    calls, when its peak RSS exceeds ``plugin_worker_max_rss_mb``, when it
+    crashes, or when a call times out (the worker is killed). Killing,
+    joining and spawning workers happen in a thread, never on the event loop.
+    """
+
+    def __init__(self, entry_path: Path, settings: Settings) -> None:
+        self.entry_path = str(entry_path)
+        self.settings = settings
+        self.size = max(1, settings.plugin_pool_size)
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: deque[_Worker] = deque()
+        self._slots = asyncio.Semaphore(self.size)
+        self._closed = False
+        self._retiring: set[asyncio.Task] = set()
+
+    def warm(self) -> None:
+        """Start workers up to the pool size so the first calls skip start-up."""
+        while len(self._idle) < self.size:
+            self._idle.append(self._spawn())
 
-def execute_tool(entry_path: Path, tool_name: str, args: dict[str, Any], timeout: float) -> Any:
-    ctx = multiprocessing.get_context("spawn")
-    queue: multiprocessing.Queue = ctx.Queue()
-    process = ctx.Process(target=_worker, args=(str(entry_path), tool_name, args, queue))
-    process.start()
-    process.join(timeout=timeout)
+    async def call(self, tool_name: str, args: dict[str, Any], timeout: float) -> Any:
+        if self._closed:
+            raise AppError("plugin_pool_closed", status_code=503)
+        async with self._slots:
+            worker = self._idle.popleft() if self._idle else await asyncio.to_thread(self._spawn)
+            try:
+                status, payload, rss_mb = await self._roundtrip(worker, tool_name, args, timeout)
+            except BaseException:
+                # Timed out, crashed or cancelled mid-call: the worker's state is unknown.
+                self._retire(worker)
+                raise
 
-    if process.is_alive():
-        process.terminate()
-        process.join()
-        raise AppError("plugin_timeout", status_code=504)
+            worker.calls += 1
+            if worker.calls >= self.settings.plugin_worker_max_calls or rss_mb > self.settings.plugin_worker_max_rss_mb:
+                logger.info("plugin_worker_recycled entry=%s calls=%s rss_mb=%.0f", self.entry_path, worker.calls, rss_mb)
+                self._retire(worker)
+            else:
+                self._idle.append(worker)
 
-    if queue.empty():
-        raise AppError("plugin_no_response", status_code=502)
+        if status == "ok":
+            return payload
+        raise AppError(str(payload), status_code=502)
 
-    status, payload = queue.get()
-    if status == "ok":
-        return payload
-    raise AppError(str(payload), status_code=502)
+    def close(self) -> None:
+        self._closed = True
+        while self._idle:
+            self._idle.popleft().kill()
 
+    async def _roundtrip(self, worker: _Worker, tool_name: str, args: dict[str, Any], timeout: float) -> tuple:
+        if not worker.ready:
+            status, payload, _ = await self._receive(worker, self.settings.plugin_worker_start_timeout_seconds)
+            if status != "ready":
+                raise AppError(str(payload), status_code=502)
+            worker.ready = True
+        try:
+            worker.conn.send((tool_name, args))
+        except (BrokenPipeError, OSError) as exc:
+            raise AppError("plugin_worker_crashed", status_code=502) from exc
+        return await self._receive(worker, timeout)
 
-def _worker(entry_path: str, tool_name: str, args: dict[str, Any], queue: multiprocessing.Queue) -> None:
+    async def _receive(self, worker: _Worker, timeout: float) -> tuple:
+        try:
+            message = await asyncio.to_thread(_poll_recv, worker.conn, timeout)
+        except (EOFError, OSError) as exc:
+            raise AppError("plugin_worker_crashed", status_code=502) from exc
+        if message is None:
+            logger.warning("plugin_timeout entry=%s timeout=%s", self.entry_path, timeout)
+            raise AppError("plugin_timeout", status_code=504)
+        return message
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, self.entry_path)
+
+    def _retire(self, worker: _Worker) -> None:
+        """Kill ``worker`` and start its replacement in the background."""
+        task = asyncio.get_running_loop().create_task(self._replace(worker))
+        # Keep a reference until done; a cancelled caller must not cancel the replacement.
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    async def _replace(self, worker: _Worker) -> None:
+        try:
+            await asyncio.to_thread(worker.kill)
+            if self._closed or len(self._idle) >= self.size:
+                return
+            replacement = await asyncio.to_thread(self._spawn)
+        except Exception as exc:
+            logger.warning("plugin_worker_replace_failed entry=%s error=%s", self.entry_path, exc)
+            return
+        if self._closed:
+            await asyncio.to_thread(replacement.kill)
+        else:
+            self._idle.append(replacement)
+
+
+def _poll_recv(conn: Connection, timeout: float) -> tuple | None:
+    if not conn.poll(timeout):
+        return None
+    return conn.recv()
+
+
+def _serve(entry_path: str, conn: Connection) -> None:
     try:
         spec = importlib.util.spec_from_file_location("plugin_entry", entry_path)
         if spec is None or spec.loader is None:
-            queue.put(("error", "plugin_entry_not_found"))
+            conn.send(("error", "plugin_entry_not_found", 0.0))
             return
         module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(module)
+        invoke = getattr(module, "invoke", None)
+        if invoke is None:
+            conn.send(("error", "plugin_missing_invoke", 0.0))
+            return
+    except Exception as exc:
+        logger.exception("plugin_import_failed")
+        conn.send(("error", f"plugin_import_failed:{exc}", 0.0))
+        return
+    conn.send(("ready", None, _rss_mb()))
 
-        if not hasattr(module, "invoke"):
-            queue.put(("error", "plugin_missing_invoke"))
+    while True:
+        try:
+            tool_name, args = conn.recv()
+        except EOFError:
             return
+        try:
+            reply = ("ok", invoke(tool_name, args), _rss_mb())
+        except Exception as exc:
+            logger.exception("plugin_exec_failed")
+            reply = ("error", f"plugin_exec_failed:{exc}", _rss_mb())
+        try:
+            conn.send(reply)
+        except Exception as exc:
+            # e.g. a result that cannot be pickled
+            conn.send(("error", f"plugin_exec_failed:{exc}", _rss_mb()))
 
-        invoke = getattr(module, "invoke")
-        result = invoke(tool_name, args)
-        queue.put(("ok", result))
-    except Exception as exc:
-        logger.exception("plugin_exec_failed")
-        queue.put(("error", f"plugin_exec_failed:{exc}"))
+
+def _rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    # Peak resident set size; Linux reports kilobytes.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
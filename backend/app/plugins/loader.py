@@ -4,7 +4,7 @@ from pathlib import Path
 from typing import Iterable
 
 from app.core.config.settings import Settings
-from app.plugins.executor import execute_tool
+from app.plugins.executor import PluginWorkerPool, get_plugin_pool
 from app.plugins.registry import PluginRegistry
 from app.plugins.schema import PluginManifest
 from app.tools.base import ToolDefinition
@@ -51,13 +51,15 @@ def _register_plugin_tools(
     plugin_dir: Path,
 ) -> None:
     entry_path = plugin_dir / manifest.entry
+    pool = get_plugin_pool(entry_path, settings)
+    registered = 0
     for tool in manifest.tools:
         if tool.permissions and not set(tool.permissions).issubset(set(manifest.permissions)):
             logger.warning("plugin_permission_mismatch plugin=%s tool=%s", manifest.name, tool.name)
             continue
 
         timeout = tool.timeout_seconds or settings.plugin_exec_timeout_seconds
-        handler = _make_handler(entry_path, tool.name, timeout)
+        handler = _make_handler(pool, tool.name, timeout)
         registry.register_tool(
             ToolDefinition(
                 name=f"{manifest.name}.{tool.name}",
@@ -68,13 +70,18 @@ def _register_plugin_tools(
                 allowed_roles=tool.allowed_roles,
                 requires_confirmation=tool.requires_confirmation,
                 permissions=tool.permissions,
+                # The pool enforces the per-call timeout; this only bounds the registry wait.
+                timeout_seconds=max(timeout, settings.tool_timeout_seconds),
             )
         )
+        registered += 1
+    if registered:
+        pool.warm()
 
 
-def _make_handler(entry_path: Path, tool_name: str, timeout: float):
-    def _handler(**kwargs):
-        return execute_tool(entry_path, tool_name, kwargs, timeout)
+def _make_handler(pool: PluginWorkerPool, tool_name: str, timeout: float):
+    async def _handler(**kwargs):
+        return await pool.call(tool_name, kwargs, timeout)
 
     return _handler
 
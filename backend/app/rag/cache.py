@@ -0,0 +1,195 @@
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from app.core.config.settings import Settings
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# The disk tier is pruned once per this many writes.
+_PRUNE_EVERY = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    vector TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hits (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    generation INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS embeddings_created_at ON embeddings (created_at);
+CREATE INDEX IF NOT EXISTS hits_created_at ON hits (created_at);
+"""
+
+
+def normalize_query(query: str) -> str:
+    return _WHITESPACE_RE.sub(" ", query).strip().casefold()
+
+
+class RetrievalCache:
+    """Two-level cache for query embeddings and top-k hit lists.
+
+    Level one is an in-process LRU/TTL cache; level two is an optional SQLite
+    file (``rag_cache_path``) that survives restarts. Keys are the normalized
+    query plus the embedding model. Hit-list keys also include the store
+    generation, so entries computed before an ingest are never served again.
+    The disk tier is pruned every few hundred writes: expired rows, hit lists
+    of other generations and rows beyond ``rag_cache_disk_max_entries`` per
+    table (oldest first) are deleted.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.enabled = settings.rag_cache_enabled
+        self._embeddings = TTLCache(settings.rag_cache_max_entries, settings.rag_cache_ttl_seconds)
+        self._hits = TTLCache(settings.rag_cache_max_entries, settings.rag_cache_ttl_seconds)
+        self._disk_hits = 0
+        self._disk_misses = 0
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = Lock()
+        self._disk_writes = 0
+        if self.enabled and settings.rag_cache_path:
+            self._open_disk(Path(settings.rag_cache_path))
+
+    def get_embedding(self, query: str) -> list[float] | None:
+        if not self.enabled:
+            return None
+        key = self._key("embedding", query)
+        vector = self._embeddings.get(key)
+        if vector is not None:
+            return vector
+
+        row = self._disk_get("SELECT vector FROM embeddings WHERE key = ? AND created_at > ?", key)
+        if row is None:
+            return None
+        vector = json.loads(row[0])
+        self._embeddings.set(key, vector)
+        return vector
+
+    def set_embedding(self, query: str, vector: list[float]) -> None:
+        if not self.enabled:
+            return
+        key = self._key("embedding", query)
+        self._embeddings.set(key, vector)
+        self._disk_put(
+            "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+            (key, json.dumps(vector), time.time()),
+        )
+
+    def get_hits(self, query: str, top_k: int, generation: int) -> list[dict[str, Any]] | None:
+        if not self.enabled:
+            return None
+        key = self._key(f"hits:{top_k}:{generation}", query)
+        hits = self._hits.get(key)
+        if hits is not None:
+            return hits
+
+        row = self._disk_get("SELECT payload FROM hits WHERE key = ? AND created_at > ?", key)
+        if row is None:
+            return None
+        hits = json.loads(row[0])
+        self._hits.set(key, hits)
+        return hits
+
+    def set_hits(self, query: str, top_k: int, generation: int, hits: list[dict[str, Any]]) -> None:
+        if not self.enabled:
+            return
+        key = self._key(f"hits:{top_k}:{generation}", query)
+        self._hits.set(key, hits)
+        self._disk_put(
+            "INSERT OR REPLACE INTO hits (key, payload, created_at, generation) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(hits, default=str), time.time(), generation),
+            generation,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "embeddings": self._embeddings.stats(),
+            "hits": self._hits.stats(),
+            "disk": {
+                "enabled": self._db is not None,
+                "hits": self._disk_hits,
+                "misses": self._disk_misses,
+            },
+        }
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _key(self, kind: str, query: str) -> str:
+        raw = f"{kind}\x1f{self.settings.embedding_model}\x1f{normalize_query(query)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _open_disk(self, path: Path) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            columns = {row[1] for row in db.execute("PRAGMA table_info(hits)")}
+            if columns and "generation" not in columns:
+                # Files written before hit lists recorded their generation.
+                db.execute("ALTER TABLE hits ADD COLUMN generation INTEGER NOT NULL DEFAULT 0")
+            db.executescript(_SCHEMA)
+            self._prune(db)
+            self._db = db
+        except sqlite3.Error as exc:
+            logger.warning("rag_cache_disk_unavailable path=%s error=%s", path, exc)
+
+    def _disk_get(self, query: str, key: str) -> tuple | None:
+        if self._db is None:
+            return None
+        cutoff = time.time() - self.settings.rag_cache_disk_ttl_seconds
+        with self._db_lock:
+            try:
+                row = self._db.execute(query, (key, cutoff)).fetchone()
+            except sqlite3.Error as exc:
+                logger.warning("rag_cache_disk_read_failed error=%s", exc)
+                row = None
+        if row is None:
+            self._disk_misses += 1
+        else:
+            self._disk_hits += 1
+        return row
+
+    def _disk_put(self, query: str, params: tuple, generation: int | None = None) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            try:
+                with self._db:
+                    self._db.execute(query, params)
+                self._disk_writes += 1
+                if self._disk_writes % _PRUNE_EVERY == 0:
+                    self._prune(self._db, generation)
+            except sqlite3.Error as exc:
+                logger.warning("rag_cache_disk_write_failed error=%s", exc)
+
+    def _prune(self, db: sqlite3.Connection, generation: int | None = None) -> None:
+        """Delete expired rows, hit lists of other generations and the oldest rows over the limit."""
+        cutoff = time.time() - self.settings.rag_cache_disk_ttl_seconds
+        limit = max(1, self.settings.rag_cache_disk_max_entries)
+        with db:
+            for table in ("embeddings", "hits"):
+                db.execute(f"DELETE FROM {table} WHERE created_at <= ?", (cutoff,))
+                db.execute(
+                    f"DELETE FROM {table} WHERE key IN "
+                    f"(SELECT key FROM {table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (limit,),
+                )
+            if generation is not None:
+                db.execute("DELETE FROM hits WHERE generation <> ?", (generation,))
@@ -1,14 +1,201 @@
-from typing import Iterable
+import math
+import re
+from typing import Iterator
 
+import numpy as np
 
-def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> Iterable[str]:
+from app.llm.tokenizer import estimate_token_costs, whitespace_mask
+
+_SENTENCE_END_RE = re.compile(r"[.!?][\"'”’)\]]*(?=\s|$)")
+_PARAGRAPH_RE = re.compile(r"\n[^\S\n]*\n")
+
+# A chunk only ends early at a sentence boundary if it is at least this full.
+_MIN_SENTENCE_FILL = 0.5
+
+
+class _Boundaries:
+    """Word offsets, cumulative token counts and sentence boundaries of a text, computed once.
+
+    Token counts are ``estimate_tokens`` (the estimate ``TokenCounter``
+    falls back to without tiktoken), so a chunk's count is that of its text.
+    A "word" costing more than ``max_tokens`` (CJK text, URLs, base64) is
+    split into pieces of at most ``max_tokens`` so no chunk can exceed the
+    size limit. ``breaks`` holds the word indices a chunk may end before
+    (sentence ends and paragraph breaks).
+    """
+
+    def __init__(self, text: str, max_tokens: int) -> None:
+        # Word spans from a whitespace mask over the code points, without a Python-level loop.
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        edges = np.diff(np.concatenate(([1], whitespace_mask(codes), [1])).astype(np.int8))
+        spent = np.concatenate(([0], np.cumsum(estimate_token_costs(text), dtype=np.int64)))
+        self.starts, self.ends = _split_long(
+            np.flatnonzero(edges == -1), np.flatnonzero(edges == 1), spent, max(1, max_tokens)
+        )
+        self.count = len(self.starts)
+        # Whitespace costs nothing, so the cost of the first i words is the cost up to the end of word i - 1.
+        self.cumulative = np.concatenate(([0], spent[self.ends]))
+
+        sentence_ends = np.array([match.end() for match in _SENTENCE_END_RE.finditer(text)], dtype=np.int64)
+        paragraphs = np.array([match.start() for match in _PARAGRAPH_RE.finditer(text)], dtype=np.int64)
+        breaks = np.concatenate(
+            (
+                np.searchsorted(self.ends, sentence_ends, side="left") + 1,
+                np.searchsorted(self.starts, paragraphs, side="left"),
+            )
+        )
+        self.breaks = np.unique(breaks[(breaks > 0) & (breaks <= self.count)])
+
+    def splice(self, keep: int, tail: "_Boundaries", offset: int) -> None:
+        """Keep the first ``keep`` words and append ``tail``, the boundaries of the text from ``offset`` on.
+
+        ``tail`` starts by rescanning word ``keep``. Its break, if any, is kept
+        from before: when that word is a piece of a split span, the rescan
+        misses the sentence end whose punctuation lies in an earlier piece.
+        """
+        kept = self.breaks[self.breaks <= keep + 1]
+        self.starts = np.concatenate((self.starts[:keep], tail.starts + offset))
+        self.ends = np.concatenate((self.ends[:keep], tail.ends + offset))
+        self.cumulative = np.concatenate((self.cumulative[:keep], tail.cumulative + self.cumulative[keep]))
+        self.breaks = np.union1d(kept, tail.breaks + keep)
+        self.count = len(self.starts)
+
+    def drop(self, words: int) -> None:
+        """Forget the first ``words`` words, as if the text started at the next one."""
+        offset = self.starts[words] if words < self.count else 0
+        self.starts = self.starts[words:] - offset
+        self.ends = self.ends[words:] - offset
+        self.cumulative = self.cumulative[words:] - self.cumulative[words]
+        self.breaks = self.breaks[self.breaks > words] - words
+        self.count = len(self.starts)
+
+
+def _split_long(
+    starts: np.ndarray, ends: np.ndarray, spent: np.ndarray, max_tokens: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Cut spans costing more than ``max_tokens`` into consecutive pieces of at most ``max_tokens``.
+
+    ``spent[i]`` is the token cost of the text before code point ``i``. Each
+    piece starts at a code point that costs a token, so rescanning from a
+    piece start (as ``ChunkStream`` does) yields the same costs and cuts.
+    """
+    pieces = np.maximum(1, -(-(spent[ends] - spent[starts]) // max_tokens))
+    if not len(pieces) or pieces.max() <= 1:
+        return starts, ends
+    owner = np.repeat(np.arange(len(starts)), pieces)
+    piece = np.arange(len(owner)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    # Piece k starts at the code point that takes the span past k * max_tokens.
+    threshold = spent[starts[owner]] + piece * max_tokens
+    piece_starts = np.where(piece == 0, starts[owner], np.searchsorted(spent, threshold + 1, side="left") - 1)
+    last = piece == pieces[owner] - 1
+    piece_ends = np.where(last, ends[owner], np.roll(piece_starts, -1))
+    return piece_starts, piece_ends
+
+
+def _windows(
+    bounds: _Boundaries, chunk_size: int, chunk_overlap: int, final: bool
+) -> Iterator[tuple[int, int, int]]:
+    """Yield ``(first_word, end_word, next_first_word)`` windows.
+
+    Unless ``final``, stops at the first window that more text could still change.
+    """
+    cumulative = bounds.cumulative
+    breaks = bounds.breaks
+    count = bounds.count
+    min_fill = math.ceil(chunk_size * _MIN_SENTENCE_FILL)
+    start = 0
+    while start < count:
+        limit = max(start + 1, int(np.searchsorted(cumulative, cumulative[start] + chunk_size, side="right")) - 1)
+        if limit >= count:
+            if not final:
+                return
+            yield start, count, count
+            return
+        if not final and limit >= count - 1:
+            # The last buffered word may still gain a sentence or paragraph break.
+            return
+
+        end = limit
+        candidate = int(np.searchsorted(breaks, limit, side="right")) - 1
+        if candidate >= 0 and breaks[candidate] > start and cumulative[breaks[candidate]] - cumulative[start] >= min_fill:
+            end = int(breaks[candidate])
+
+        following = end
+        if chunk_overlap > 0:
+            # Never before start + 1: that text may already be gone from a ChunkStream buffer.
+            following = max(start + 1, int(np.searchsorted(cumulative, cumulative[end] - chunk_overlap, side="left")))
+            sentence = int(np.searchsorted(breaks, following, side="left"))
+            if sentence < len(breaks) and breaks[sentence] < end:
+                # Start the overlap at a sentence boundary when one falls inside it.
+                following = int(breaks[sentence])
+            following = min(end, following)
+        yield start, end, following
+        start = following
+
+
+def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> Iterator[str]:
+    """Split ``text`` into chunks of at most ``chunk_size`` tokens, ending at sentence boundaries where possible.
+
+    Consecutive chunks share about ``chunk_overlap`` tokens. A chunk is only
+    cut mid-sentence (at a word boundary) when no sentence ends in the
+    second half of its window, and only cut mid-word when a single word is
+    longer than ``chunk_size``.
+    """
     if chunk_size <= 0:
-        return []
-
-    step = max(1, chunk_size - max(0, chunk_overlap))
-    chunks = []
-    for start in range(0, len(text), step):
-        chunk = text[start : start + chunk_size].strip()
-        if chunk:
-            chunks.append(chunk)
-    return chunks
+        return
+    bounds = _Boundaries(text, chunk_size)
+    for start, end, _ in _windows(bounds, chunk_size, chunk_overlap, final=True):
+        yield text[bounds.starts[start] : bounds.ends[end - 1]]
+
+
+class ChunkStream:
+    """Incremental ``chunk_text`` over text that arrives piece by piece (e.g. PDF pages).
+
+    Only windows that can no longer change are emitted; the rest of the text
+    is carried over to the next ``feed`` so chunks span page boundaries
+    exactly as if the pages had been joined with newlines first. Boundaries
+    are kept between feeds and only the new text (plus the last carried
+    word) is scanned. Because over-long words are split, the carried text
+    stays under about two chunks, whatever the input.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int) -> None:
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._buffer = ""
+        self._bounds: _Boundaries | None = None
+
+    def feed(self, text: str) -> list[str]:
+        if self.chunk_size <= 0:
+            return []
+        if self._bounds is None:
+            self._buffer = text
+            self._bounds = _Boundaries(text, self.chunk_size)
+        else:
+            # Rescan from the last carried word: a new break may follow it.
+            keep = max(0, self._bounds.count - 1)
+            offset = int(self._bounds.starts[keep]) if self._bounds.count else 0
+            self._buffer = f"{self._buffer}\n{text}"
+            self._bounds.splice(keep, _Boundaries(self._buffer[offset:], self.chunk_size), offset)
+
+        bounds = self._bounds
+        chunks: list[str] = []
+        carry = None
+        for start, end, following in _windows(bounds, self.chunk_size, self.chunk_overlap, final=False):
+            chunks.append(self._buffer[bounds.starts[start] : bounds.ends[end - 1]])
+            carry = following
+        if carry is not None:
+            self._buffer = self._buffer[bounds.starts[carry] :]
+            bounds.drop(carry)
+        return chunks
+
+    def flush(self) -> list[str]:
+        # Reuse the boundaries: a fresh scan of the carried text could miss a sentence end in dropped text.
+        buffer, bounds = self._buffer, self._bounds
+        self._buffer, self._bounds = "", None
+        if bounds is None:
+            return []
+        return [
+            buffer[bounds.starts[start] : bounds.ends[end - 1]]
+            for start, end, _ in _windows(bounds, self.chunk_size, self.chunk_overlap, final=True)
+        ]
@@ -1,13 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
 
 import asyncio
+import logging
 
 from sentence_transformers import SentenceTransformer
 
 from app.core.config.settings import Settings
+from app.core.errors import AppError
+
+logger = logging.getLogger(__name__)
 
 _MODEL = None
 _MODEL_LOCK = Lock()
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = Lock()
 
 
 def _get_model(settings: Settings) -> SentenceTransformer:
@@ -19,17 +26,151 @@ def _get_model(settings: Settings) -> SentenceTransformer:
     return _MODEL
 
 
+def _get_executor(settings: Settings) -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=max(1, settings.embedding_workers),
+                    thread_name_prefix="embedding",
+                )
+    return _EXECUTOR
+
+
+def shutdown_embedding_executor() -> None:
+    global _EXECUTOR
+    executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _MicroBatcher:
+    """Coalesce concurrent encode requests into one ``SentenceTransformer.encode`` call.
+
+    A batch is dispatched once it holds ``embedding_batch_size`` texts or the
+    oldest request has waited ``embedding_batch_wait_ms``. At most
+    ``embedding_workers`` batches are encoded at the same time. ``close``
+    fails every request still waiting with ``embedding_batcher_closed``.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self._queue: asyncio.Queue[tuple[list[str], asyncio.Future]] = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max(1, settings.embedding_workers))
+        self._task = asyncio.create_task(self._collect())
+        self._inflight: set[asyncio.Task] = set()
+        # Futures not yet resolved, wherever they are: queued, being collected or encoding.
+        self._pending: set[asyncio.Future] = set()
+        self._closed = False
+
+    async def submit(self, texts: list[str]) -> list[list[float]]:
+        if self._closed:
+            raise AppError("embedding_batcher_closed", status_code=503)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        await self._queue.put((texts, future))
+        return await future
+
+    async def close(self) -> None:
+        self._closed = True
+        self._task.cancel()
+        for task in list(self._inflight):
+            task.cancel()
+        await asyncio.gather(self._task, *self._inflight, return_exceptions=True)
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(AppError("embedding_batcher_closed", status_code=503))
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        max_size = max(1, self.settings.embedding_batch_size)
+        max_wait = max(0.0, self.settings.embedding_batch_wait_ms) / 1000
+
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + max_wait
+            while size < max_size:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                batch.append(item)
+                size += len(item[0])
+
+            await self._slots.acquire()
+            task = asyncio.create_task(self._encode(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _encode(self, batch: list[tuple[list[str], asyncio.Future]]) -> None:
+        try:
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            settings = self.settings
+
+            def _run() -> list[list[float]]:
+                model = _get_model(settings)
+                embeddings = model.encode(texts, batch_size=len(texts), normalize_embeddings=True)
+                return embeddings.tolist()
+
+            try:
+                vectors = await asyncio.get_running_loop().run_in_executor(_get_executor(settings), _run)
+            except Exception as exc:
+                logger.exception("embedding_batch_failed size=%s", len(texts))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+
+            offset = 0
+            for item_texts, future in batch:
+                if not future.done():
+                    future.set_result(vectors[offset : offset + len(item_texts)])
+                offset += len(item_texts)
+        finally:
+            self._slots.release()
+
+
 class EmbeddingClient:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
+        self._batcher: _MicroBatcher | None = None
+        self._batcher_loop: asyncio.AbstractEventLoop | None = None
 
     async def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        def _encode() -> list[list[float]]:
-            model = _get_model(self.settings)
-            embeddings = model.encode(texts, normalize_embeddings=True)
-            return embeddings.tolist()
+        if not texts:
+            return []
+        batcher = self._get_batcher()
+        size = max(1, self.settings.embedding_batch_size)
+        if len(texts) <= size:
+            return await batcher.submit(texts)
 
-        return await asyncio.to_thread(_encode)
+        parts = await asyncio.gather(
+            *(batcher.submit(texts[start : start + size]) for start in range(0, len(texts), size))
+        )
+        return [vector for part in parts for vector in part]
 
     async def embed_query(self, text: str) -> list[float]:
         return (await self.embed_texts([text]))[0]
+
+    async def aclose(self) -> None:
+        if self._batcher is not None:
+            await self._batcher.close()
+            self._batcher = None
+
+    def _get_batcher(self) -> _MicroBatcher:
+        loop = asyncio.get_running_loop()
+        if self._batcher is None or self._batcher_loop is not loop:
+            self._batcher = _MicroBatcher(self.settings)
+            self._batcher_loop = loop
+        return self._batcher
@@ -1,10 +1,27 @@
+import asyncio
 import io
-from typing import Iterable
+import multiprocessing
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import AsyncIterator, Iterable, Protocol
 
 from pypdf import PdfReader
 
+from app.core.config.settings import Settings
 from app.core.errors import AppError
 
+_SPOOL_CHUNK_BYTES = 1024 * 1024
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = Lock()
+
+
+class _AsyncReadable(Protocol):
+    async def read(self, size: int = -1) -> bytes: ...
+
 
 def extract_pdf_text(pdf_bytes: bytes) -> str:
     try:
@@ -22,3 +39,86 @@ def extract_pdf_text(pdf_bytes: bytes) -> str:
 def iter_texts(text: str) -> Iterable[str]:
     if text:
         yield text
+
+
+async def spool_upload(upload: _AsyncReadable, suffix: str = ".pdf", directory: Path | None = None) -> Path:
+    """Copy an upload to a temporary file in fixed-size chunks instead of reading it whole.
+
+    Pass ``directory`` to spool next to where the file will be kept, so
+    moving it there is a rename rather than a copy across filesystems.
+    """
+    fd, name = tempfile.mkstemp(suffix=suffix, dir=directory)
+    path = Path(name)
+    try:
+        with open(fd, "wb") as handle:
+            while chunk := await upload.read(_SPOOL_CHUNK_BYTES):
+                handle.write(chunk)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+async def count_pdf_pages(path: Path, settings: Settings) -> int:
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_pool(settings), _count_pages, str(path))
+    except Exception as exc:
+        raise AppError("invalid_pdf", status_code=400) from exc
+
+
+async def iter_pdf_pages(path: Path, settings: Settings, total: int | None = None) -> AsyncIterator[str]:
+    """Yield page texts in order while later page ranges are extracted in a process pool.
+
+    At most ``ingest_max_inflight_tasks`` ranges are scheduled ahead of the
+    consumer, which bounds memory when embedding is the slower stage.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pool(settings)
+    if total is None:
+        total = await count_pdf_pages(path, settings)
+
+    per_task = max(1, settings.ingest_pages_per_task)
+    max_inflight = max(1, settings.ingest_max_inflight_tasks)
+    pending: deque[asyncio.Future] = deque()
+    try:
+        for start in range(0, total, per_task):
+            end = min(start + per_task, total)
+            pending.append(loop.run_in_executor(pool, _extract_page_range, str(path), start, end))
+            if len(pending) >= max_inflight:
+                for text in await pending.popleft():
+                    yield text
+        while pending:
+            for text in await pending.popleft():
+                yield text
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def shutdown_ingest_pool() -> None:
+    global _POOL
+    pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_pool(settings: Settings) -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ProcessPoolExecutor(
+                    max_workers=max(1, settings.ingest_workers),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _POOL
+
+
+def _count_pages(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+
+def _extract_page_range(path: str, start: int, end: int) -> list[str]:
+    reader = PdfReader(path)
+    return [reader.pages[index].extract_text() or "" for index in range(start, end)]
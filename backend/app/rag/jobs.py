@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from app.core.config.settings import Settings
+from app.core.errors import AppError
+from app.models.rag import IngestJob
+from app.rag.service import RAGService
+
+logger = logging.getLogger(__name__)
+
+# Uploads being spooled into the jobs directory; leftovers from a crash are removed on start.
+SPOOL_SUFFIX = ".upload"
+_FINISHED = ("completed", "failed")
+# Progress updates are written to disk at most this often per job; state changes always are.
+_PROGRESS_PERSIST_SECONDS = 1.0
+
+
+class IngestJobQueue:
+    """Background PDF ingestion with a bounded worker pool.
+
+    Each job is persisted as ``<job_id>.json`` next to its spooled
+    ``<job_id>.pdf`` under ``ingest_jobs_path``. Jobs that were queued or
+    running when the process stopped are re-queued on ``start``; chunks the
+    interrupted run already stored are recognised by their content id and
+    not embedded again. Finished jobs are dropped, with their files, once
+    they are older than ``ingest_job_retention_seconds``. Job files are
+    written in a thread; progress is written at most once a second.
+    """
+
+    def __init__(self, settings: Settings, rag: RAGService) -> None:
+        self.settings = settings
+        self.rag = rag
+        self._dir = Path(settings.ingest_jobs_path)
+        self._jobs: dict[str, IngestJob] = {}
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._saving: dict[str, asyncio.Task] = {}
+        self._saved_at: dict[str, float] = {}
+
+    async def start(self) -> None:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        for path in self._dir.glob(f"*{SPOOL_SUFFIX}"):
+            path.unlink(missing_ok=True)
+        for path in sorted(self._dir.glob("*.json")):
+            try:
+                job = IngestJob.model_validate_json(path.read_text(encoding="utf-8"))
+            except ValueError as exc:
+                logger.warning("ingest_job_unreadable path=%s error=%s", path, exc)
+                continue
+            self._jobs[job.job_id] = job
+            if job.status in {"queued", "running"}:
+                self._queue.put_nowait(job.job_id)
+                logger.info("ingest_job_resumed job_id=%s chunks_done=%s", job.job_id, job.chunks_done)
+        await self._prune()
+
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"ingest-worker-{index}")
+            for index in range(max(1, self.settings.ingest_job_workers))
+        ]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def spool_dir(self) -> Path:
+        """Where uploads should be spooled so ``submit`` can rename them into place."""
+        self._dir.mkdir(parents=True, exist_ok=True)
+        return self._dir
+
+    async def submit(self, upload_path: Path, source: str) -> IngestJob:
+        """Take ownership of a spooled upload and queue it for ingestion."""
+        self._dir.mkdir(parents=True, exist_ok=True)
+        now = datetime.now(timezone.utc)
+        job = IngestJob(job_id=uuid4().hex, source=source, created_at=now, updated_at=now)
+        # A rename when spooled into spool_dir(), but a full copy across filesystems otherwise.
+        await asyncio.to_thread(shutil.move, str(upload_path), self._pdf_path(job.job_id))
+        self._jobs[job.job_id] = job
+        await self._save(job)
+        self._queue.put_nowait(job.job_id)
+        return job
+
+    def get(self, job_id: str) -> IngestJob:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise AppError("job_not_found", status_code=404)
+        return job
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(self._jobs[job_id])
+                await self._prune()
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: IngestJob) -> None:
+        await self._update(job, status="running")
+
+        def on_progress(progress: dict[str, int]) -> None:
+            self._set(job, **progress)
+            self._save_soon(job)
+
+        try:
+            await self.rag.ingest_pdf_file(
+                self._pdf_path(job.job_id),
+                job.source,
+                progress=on_progress,
+            )
+        except asyncio.CancelledError:
+            # Shutting down: leave the job "running" so it resumes on the next start.
+            raise
+        except AppError as exc:
+            await self._update(job, status="failed", error=exc.message)
+        except Exception as exc:
+            logger.exception("ingest_job_failed job_id=%s", job.job_id)
+            await self._update(job, status="failed", error=str(exc) or type(exc).__name__)
+        else:
+            await self._update(job, status="completed")
+        self._pdf_path(job.job_id).unlink(missing_ok=True)
+        self._saved_at.pop(job.job_id, None)
+
+    async def _update(self, job: IngestJob, **changes: object) -> None:
+        self._set(job, **changes)
+        await self._save(job)
+
+    @staticmethod
+    def _set(job: IngestJob, **changes: object) -> None:
+        for key, value in changes.items():
+            setattr(job, key, value)
+        job.updated_at = datetime.now(timezone.utc)
+
+    def _save_soon(self, job: IngestJob) -> None:
+        """Write ``job`` in the background unless it was written recently or a write is under way."""
+        if job.job_id in self._saving:
+            return
+        if time.monotonic() - self._saved_at.get(job.job_id, 0.0) < _PROGRESS_PERSIST_SECONDS:
+            return
+        task = asyncio.create_task(self._save(job))
+        self._saving[job.job_id] = task
+        task.add_done_callback(lambda _: self._saving.pop(job.job_id, None))
+
+    async def _save(self, job: IngestJob) -> None:
+        # Let an earlier write finish first so an older snapshot can never land last.
+        pending = self._saving.get(job.job_id)
+        if pending is not None and pending is not asyncio.current_task():
+            await asyncio.gather(pending, return_exceptions=True)
+        self._saved_at[job.job_id] = time.monotonic()
+        await asyncio.to_thread(self._persist, job.job_id, job.model_dump_json())
+
+    def _persist(self, job_id: str, data: str) -> None:
+        path = self._json_path(job_id)
+        tmp = path.with_suffix(".json.tmp")
+        try:
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as exc:
+            # The in-memory job stays current; only resume-after-restart loses this update.
+            logger.warning("ingest_job_persist_failed job_id=%s error=%s", job_id, exc)
+
+    async def _prune(self) -> None:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.settings.ingest_job_retention_seconds)
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in _FINISHED and job.updated_at < cutoff
+        ]
+        if not expired:
+            return
+        for job_id in expired:
+            del self._jobs[job_id]
+        await asyncio.to_thread(self._delete_files, expired)
+        logger.info("ingest_jobs_pruned count=%s", len(expired))
+
+    def _delete_files(self, job_ids: list[str]) -> None:
+        for job_id in job_ids:
+            for path in (self._json_path(job_id), self._pdf_path(job_id)):
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError as exc:
+                    logger.warning("ingest_job_delete_failed path=%s error=%s", path, exc)
+
+    def _json_path(self, job_id: str) -> Path:
+        return self._dir / f"{job_id}.json"
+
+    def _pdf_path(self, job_id: str) -> Path:
+        return self._dir / f"{job_id}.pdf"
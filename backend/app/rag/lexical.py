@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import math
+import re
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from threading import Lock
+from typing import Iterator
+
+from app.core.config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Identifiers, error codes and file names ("ERR_CONN_RESET", "E1234", "config.yaml")
+# are kept whole; compound tokens are also indexed by their parts.
+_TOKEN_RE = re.compile(r"\w+(?:[.\-/:]\w+)*")
+_PART_RE = re.compile(r"[.\-/:]")
+# Stays below SQLite's bound-variable limit (999 in older builds).
+_SQL_BATCH = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    term_id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE,
+    df INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id INTEGER PRIMARY KEY,
+    chunk_id TEXT NOT NULL UNIQUE,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term_id, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def tokenize(text: str) -> list[str]:
+    tokens: list[str] = []
+    for match in _TOKEN_RE.finditer(text.casefold()):
+        token = match.group()
+        tokens.append(token)
+        if _PART_RE.search(token):
+            tokens.extend(part for part in _PART_RE.split(token) if part)
+    return tokens
+
+
+class LexicalIndex:
+    """BM25 inverted index over stored chunks, kept in ``lexical.db`` next to the vector store.
+
+    Terms and chunks are interned to integer ids, and postings are a
+    ``(term_id, doc_id, tf)`` table clustered by term, so a query reads one
+    contiguous range per term and scores it inside SQLite. Adds and deletes
+    update postings and document frequencies in place. ``backfilled`` records
+    whether chunks stored before the index existed have been added to it
+    (see ``RAGService.backfill_lexical``).
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        path = Path(settings.vector_store_path) / "lexical.db"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._doc_count, self._total_length = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+        ).fetchone()
+
+    async def add(self, chunk_ids: list[str], texts: list[str]) -> None:
+        await asyncio.to_thread(self._add, chunk_ids, texts)
+
+    async def delete(self, chunk_ids: list[str]) -> None:
+        await asyncio.to_thread(self._delete, chunk_ids)
+
+    async def search(self, query: str, top_k: int) -> list[tuple[str, float]]:
+        return await asyncio.to_thread(self._search, query, top_k)
+
+    @property
+    def backfilled(self) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM state WHERE key = 'backfilled'").fetchone()
+        return bool(row and row[0])
+
+    def mark_backfilled(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('backfilled', 1)")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _add(self, chunk_ids: list[str], texts: list[str]) -> None:
+        with self._lock, self._db:
+            known = {
+                chunk_id
+                for batch in _batches(chunk_ids)
+                for (chunk_id,) in self._db.execute(
+                    f"SELECT chunk_id FROM docs WHERE chunk_id IN ({_placeholders(batch)})", batch
+                )
+            }
+            for chunk_id, text in zip(chunk_ids, texts, strict=False):
+                if chunk_id in known:
+                    continue
+                known.add(chunk_id)
+                counts = Counter(tokenize(text))
+                length = sum(counts.values())
+                doc_id = self._db.execute(
+                    "INSERT INTO docs (chunk_id, length) VALUES (?, ?)", (chunk_id, length)
+                ).lastrowid
+                self._db.executemany(
+                    "INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                    [(term,) for term in counts],
+                )
+                self._db.executemany(
+                    "INSERT INTO postings (term_id, doc_id, tf) SELECT term_id, ?, ? FROM terms WHERE term = ?",
+                    [(doc_id, tf, term) for term, tf in counts.items()],
+                )
+                self._doc_count += 1
+                self._total_length += length
+
+    def _delete(self, chunk_ids: list[str]) -> None:
+        with self._lock, self._db:
+            for chunk_id in chunk_ids:
+                row = self._db.execute("SELECT doc_id, length FROM docs WHERE chunk_id = ?", (chunk_id,)).fetchone()
+                if row is None:
+                    continue
+                doc_id, length = row
+                self._db.execute(
+                    "UPDATE terms SET df = df - 1 WHERE term_id IN (SELECT term_id FROM postings WHERE doc_id = ?)",
+                    (doc_id,),
+                )
+                self._db.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                self._db.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+                self._doc_count -= 1
+                self._total_length -= length
+            self._db.execute("DELETE FROM terms WHERE df <= 0")
+
+    def _search(self, query: str, top_k: int) -> list[tuple[str, float]]:
+        terms = sorted(set(tokenize(query)))
+        if not terms or top_k <= 0:
+            return []
+        with self._lock:
+            if not self._doc_count:
+                return []
+            rows = [
+                row
+                for batch in _batches(terms)
+                for row in self._db.execute(
+                    f"SELECT term_id, df FROM terms WHERE term IN ({_placeholders(batch)})", batch
+                )
+            ]
+            if not rows:
+                return []
+
+            n = self._doc_count
+            weights = [(term_id, math.log(1 + (n - df + 0.5) / (df + 0.5))) for term_id, df in rows]
+            # Two parameters per term: very long queries keep their rarest terms.
+            weights = sorted(weights, key=lambda item: item[1], reverse=True)[: _SQL_BATCH // 2 - 3]
+            k1 = self.settings.rag_bm25_k1
+            b = self.settings.rag_bm25_b
+            avgdl = self._total_length / n or 1.0
+            values = ",".join("(?, ?)" for _ in weights)
+            params = [value for weight in weights for value in weight]
+            cursor = self._db.execute(
+                f"""
+                WITH query (term_id, idf) AS (VALUES {values})
+                SELECT d.chunk_id,
+                       SUM(q.idf * p.tf * (? + 1) / (p.tf + ? * (1 - ? + ? * d.length / ?))) AS score
+                FROM query q
+                JOIN postings p ON p.term_id = q.term_id
+                JOIN docs d ON d.doc_id = p.doc_id
+                GROUP BY p.doc_id
+                ORDER BY score DESC
+                LIMIT ?
+                """,
+                [*params, k1, k1, b, b, avgdl, top_k],
+            )
+            return [(chunk_id, float(score)) for chunk_id, score in cursor]
+
+
+def _batches(values: list[str]) -> Iterator[list[str]]:
+    for start in range(0, len(values), _SQL_BATCH):
+        yield values[start : start + _SQL_BATCH]
+
+
+def _placeholders(values: list[str]) -> str:
+    return ",".join("?" * len(values))
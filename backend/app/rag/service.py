@@ -1,12 +1,23 @@
-from typing import Iterable
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Callable
 
 from app.core.config.settings import Settings, get_settings
 from app.core.errors import AppError
-from app.rag.chunking import chunk_text
+from app.rag.cache import RetrievalCache, normalize_query
+from app.rag.chunking import ChunkStream
 from app.rag.embeddings import EmbeddingClient
-from app.rag.ingest import extract_pdf_text
+from app.rag.ingest import count_pdf_pages, iter_pdf_pages
+from app.rag.lexical import LexicalIndex
 from app.vectorstore.chroma.client import ChromaStore
 from app.vectorstore.faiss.client import FaissStore
+from app.vectorstore.ids import chunk_id_for, source_key_for
+
+logger = logging.getLogger(__name__)
+
+IngestProgress = Callable[[dict[str, int]], None]
 
 
 class RAGService:
@@ -14,6 +25,8 @@ class RAGService:
         self.settings = settings or get_settings()
         self.embeddings = EmbeddingClient(self.settings)
         self.store = self._init_store()
+        self.cache = RetrievalCache(self.settings)
+        self.lexical = LexicalIndex(self.settings) if self.settings.rag_hybrid_enabled else None
 
     def _init_store(self):
         if self.settings.vector_db == "chroma":
@@ -21,22 +34,196 @@ class RAGService:
         return FaissStore(self.settings)
 
     async def ingest_pdf_bytes(self, pdf_bytes: bytes, source: str) -> int:
-        text = extract_pdf_text(pdf_bytes)
-        if not text:
+        fd, name = tempfile.mkstemp(suffix=".pdf")
+        path = Path(name)
+        try:
+            with open(fd, "wb") as handle:
+                handle.write(pdf_bytes)
+            return await self.ingest_pdf_file(path, source)
+        finally:
+            path.unlink(missing_ok=True)
+
+    async def ingest_pdf_file(
+        self,
+        path: Path,
+        source: str,
+        progress: IngestProgress | None = None,
+    ) -> int:
+        """Stream a PDF through extraction, chunking, embedding and storage.
+
+        Pages are extracted in a process pool and chunked as they arrive;
+        chunk batches go through a bounded queue, so extraction pauses while
+        embedding and ``store.add_texts`` catch up. ``progress`` receives
+        ``pages_total``/``pages_done``/``chunks_done`` updates.
+
+        Chunks are keyed by a hash of the source and their text. Chunks the
+        store already holds for ``source`` are not embedded again, and chunks
+        a previous version of the document had but this one lacks are deleted
+        once the whole document has been read. Re-ingesting an unchanged file
+        is therefore cheap, and an interrupted ingest resumes where it stopped.
+        The lexical index is updated alongside the store (and backfilled for
+        chunks it does not know yet).
+        """
+        batches: asyncio.Queue[list[str] | None] = asyncio.Queue(maxsize=max(1, self.settings.ingest_queue_size))
+        source_key = source_key_for(source)
+        existing = await self.store.existing_ids(source_key)
+        seen: set[str] = set()
+        pages_total = await count_pdf_pages(path, self.settings)
+        pages_done = 0
+        stored = 0
+        added = 0
+
+        def report() -> None:
+            if progress is not None:
+                progress({"pages_total": pages_total, "pages_done": pages_done, "chunks_done": stored})
+
+        report()
+
+        async def produce() -> None:
+            nonlocal pages_done
+            chunker = ChunkStream(self.settings.chunk_size_tokens, self.settings.chunk_overlap_tokens)
+            batch: list[str] = []
+            batch_size = max(1, self.settings.ingest_batch_size)
+            try:
+                async for page in iter_pdf_pages(path, self.settings, total=pages_total):
+                    pages_done += 1
+                    for chunk in chunker.feed(page):
+                        batch.append(chunk)
+                        if len(batch) >= batch_size:
+                            await batches.put(batch)
+                            batch = []
+                batch.extend(chunker.flush())
+                if batch:
+                    await batches.put(batch)
+            except Exception:
+                await batches.put(None)
+                raise
+            await batches.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (chunks := await batches.get()) is not None:
+                texts: list[str] = []
+                ids: list[str] = []
+                metadata: list[dict] = []
+                unique: dict[str, str] = {}
+                for index, chunk in enumerate(chunks, start=stored):
+                    chunk_id = chunk_id_for(source_key, chunk)
+                    if chunk_id in seen:
+                        continue
+                    seen.add(chunk_id)
+                    unique[chunk_id] = chunk
+                    if chunk_id in existing:
+                        continue
+                    texts.append(chunk)
+                    ids.append(chunk_id)
+                    metadata.append({"source": source, "source_key": source_key, "chunk": index})
+                if texts:
+                    embeddings = await self.embeddings.embed_texts(texts)
+                    await self.store.add_texts(texts, embeddings, metadata, ids=ids)
+                    added += len(texts)
+                if self.lexical is not None and unique:
+                    await self.lexical.add(list(unique), list(unique.values()))
+                stored += len(chunks)
+                report()
+        finally:
+            if not producer.done():
+                producer.cancel()
+        # Re-raise extraction errors (e.g. invalid_pdf) once the consumer has drained.
+        await producer
+        report()
+
+        if not stored:
             raise AppError("empty_pdf", status_code=400)
+        stale = existing - seen
+        if stale:
+            await self.store.delete_ids(sorted(stale))
+            if self.lexical is not None:
+                await self.lexical.delete(sorted(stale))
+        logger.info(
+            "rag_ingested source=%s chunks=%s added=%s unchanged=%s deleted=%s",
+            source,
+            stored,
+            added,
+            len(seen) - added,
+            len(stale),
+        )
+        return stored
 
-        chunks = list(chunk_text(text, self.settings.chunk_size, self.settings.chunk_overlap))
-        if not chunks:
-            raise AppError("empty_chunks", status_code=400)
+    async def backfill_lexical(self) -> int:
+        """Add chunks the vector store holds but the lexical index lacks; runs once per index.
 
-        embeddings = await self.embeddings.embed_texts(chunks)
-        metadata = [{"source": source, "chunk": index} for index in range(len(chunks))]
-        await self.store.add_texts(chunks, embeddings, metadata)
-        return len(chunks)
+        Chunks stored before hybrid search was enabled (or before ``lexical.db``
+        was created) are otherwise invisible to BM25. Already indexed chunks are
+        skipped, so an interrupted backfill simply resumes on the next start.
+        """
+        if self.lexical is None or self.lexical.backfilled:
+            return 0
+        added = 0
+        async for batch in self.store.iter_chunks(max(1, self.settings.ingest_batch_size) * 8):
+            await self.lexical.add([chunk_id for chunk_id, _ in batch], [text for _, text in batch])
+            added += len(batch)
+        self.lexical.mark_backfilled()
+        logger.info("rag_lexical_backfilled chunks=%s", added)
+        return added
+
+    async def aclose(self) -> None:
+        await self.embeddings.aclose()
+        self.cache.close()
+        if self.lexical is not None:
+            self.lexical.close()
 
     async def retrieve_context(self, query: str) -> str:
-        if not query:
-            return ""
-        embedding = await self.embeddings.embed_query(query)
-        hits = await self.store.similarity_search(embedding, self.settings.rag_top_k)
+        hits = await self.retrieve(query)
         return "\n\n".join(hit["text"] for hit in hits)
+
+    async def retrieve(self, query: str) -> list[dict[str, Any]]:
+        """Top ``rag_top_k`` hits for ``query``, best first, served from the cache when possible."""
+        query = normalize_query(query)
+        if not query:
+            return []
+
+        top_k = self.settings.rag_top_k
+        # Read the generation before searching so a concurrent ingest invalidates this entry.
+        generation = self.store.generation
+        hits = self.cache.get_hits(query, top_k, generation)
+        if hits is None:
+            hits = await self._search(query, top_k)
+            self.cache.set_hits(query, top_k, generation, hits)
+        return hits
+
+    async def _search(self, query: str, top_k: int) -> list[dict[str, Any]]:
+        if self.lexical is None:
+            return await self._dense_search(query, top_k)
+        dense, lexical = await asyncio.gather(
+            self._dense_search(query, top_k),
+            self.lexical.search(query, self.settings.rag_lexical_top_k),
+        )
+        return await self._fuse(dense, lexical, top_k)
+
+    async def _dense_search(self, query: str, top_k: int) -> list[dict[str, Any]]:
+        embedding = self.cache.get_embedding(query)
+        if embedding is None:
+            embedding = await self.embeddings.embed_query(query)
+            self.cache.set_embedding(query, embedding)
+        return await self.store.similarity_search(embedding, top_k)
+
+    async def _fuse(
+        self,
+        dense: list[dict[str, Any]],
+        lexical: list[tuple[str, float]],
+        top_k: int,
+    ) -> list[dict[str, Any]]:
+        """Reciprocal rank fusion: each list contributes ``1 / (rag_rrf_k + rank)`` per chunk."""
+        k = self.settings.rag_rrf_k
+        scores: dict[str, float] = {}
+        for ranking in ([hit["id"] for hit in dense], [chunk_id for chunk_id, _ in lexical]):
+            for rank, chunk_id in enumerate(ranking, start=1):
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank)
+        ranked = sorted(scores, key=scores.__getitem__, reverse=True)[:top_k]
+
+        by_id = {hit["id"]: hit for hit in dense}
+        missing = [chunk_id for chunk_id in ranked if chunk_id not in by_id]
+        if missing:
+            by_id.update((hit["id"], hit) for hit in await self.store.get_by_ids(missing))
+        return [{**by_id[chunk_id], "score": scores[chunk_id]} for chunk_id in ranked if chunk_id in by_id]
@@ -1,9 +1,13 @@
 from uuid import uuid4
 import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable
 
 from app.agents.controller import AgentController
-from app.core.config.settings import get_settings
+from app.agents.loop import AgentEvent
+from app.core.config.settings import Settings, get_settings
 from app.llm.client import LLMClient
+from app.llm.context import ContextAssembler
 from app.llm.schemas import StructuredOutput
 from app.memory.short_term.conversation import ConversationMemory
 from app.models.chat import ChatRequest
@@ -14,63 +18,87 @@ from app.tools.loader import load_builtin_tools
 from app.plugins.loader import load_plugins
 from app.tools.registry import ToolRegistry
 
+logger = logging.getLogger(__name__)
+
 
 class ChatService:
-    def __init__(self) -> None:
-        self.settings = get_settings()
-        self.tools = ToolRegistry()
-        load_builtin_tools(self.tools)
-        load_plugins(self.tools, self.settings)
-        self.llm = LLMClient(self.settings)
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        tools: ToolRegistry | None = None,
+        llm: LLMClient | None = None,
+        memory: ConversationMemory | None = None,
+        rag: RAGService | None = None,
+    ) -> None:
+        self.settings = settings or get_settings()
+        if tools is None:
+            tools = ToolRegistry(self.settings)
+            load_builtin_tools(tools)
+            load_plugins(tools, self.settings)
+        self.tools = tools
+        self.llm = llm or LLMClient(self.settings)
         self.agent = AgentController(self.tools, self.llm, self.settings)
-        self.memory = ConversationMemory(self.settings)
-        self.rag = RAGService(self.settings)
+        self.memory = memory or ConversationMemory(self.settings)
+        self.rag = rag or RAGService(self.settings)
+        self.context = ContextAssembler(self.settings)
 
     async def handle_chat(self, request: ChatRequest) -> tuple[StructuredOutput, str]:
+        session_id, usage = await self._prepare(request)
+        output = await self.agent.run(request)
+        output.data = {**(output.data or {}), "context": usage}
+        await self._remember(session_id, request, output)
+        return output, session_id
+
+    async def stream_chat(self, request: ChatRequest) -> AsyncIterator[AgentEvent]:
+        session_id, usage = await self._prepare(request)
+        yield AgentEvent("session", {"session_id": session_id})
+
+        async for event in self.agent.stream(request):
+            if event.type == "final":
+                output = StructuredOutput.model_validate(event.data)
+                output.data = {**(output.data or {}), "context": usage}
+                yield AgentEvent("final", output.model_dump())
+                await self._remember(session_id, request, output)
+                continue
+            yield event
+
+    async def _prepare(self, request: ChatRequest) -> tuple[str, dict[str, int]]:
         session_id = request.session_id or str(uuid4())
         validate_user_input(request.message)
-        
-        # Try to get history from MongoDB, but don't fail if unavailable
-        history = []
-        try:
-            history = await asyncio.wait_for(
-                self.memory.get_history(session_id),
-                timeout=2.0
-            )
-        except (Exception, asyncio.TimeoutError):
-            # MongoDB not available or timeout, use empty history
-            pass
-        
-        # Try to get RAG context, but don't fail if unavailable
-        try:
-            context = await asyncio.wait_for(
-                self.rag.retrieve_context(request.message),
-                timeout=2.0
-            )
-            if context:
-                history = [ChatMessage(role="system", name="rag_context", content=f"Context:\n{context}")] + history
-        except (Exception, asyncio.TimeoutError):
-            # RAG not available or timeout, skip context
-            pass
-            
-        request.history = history
 
-        output = await self.agent.run(request)
+        # History and RAG context are independent: fetch both under one deadline and
+        # continue with whatever arrived (Mongo or the vector store may be unavailable).
+        history, hits = await self._prefetch(
+            (self.memory.get_history(session_id), []),
+            (self.rag.retrieve(request.message), []),
+        )
 
-        # Try to save to MongoDB, but don't fail if unavailable
-        try:
-            await asyncio.wait_for(
-                self.memory.append_messages(
-                    session_id,
-                    [
-                        ChatMessage(role="user", content=request.message),
-                        ChatMessage(role="assistant", content=output.reply),
-                    ],
-                ),
-                timeout=2.0
-            )
-        except (Exception, asyncio.TimeoutError):
-            # MongoDB not available or timeout, skip saving
-            pass
+        assembled = self.context.assemble(self.agent.system_prompt(), request.message, history, hits)
+        request.history = assembled.history
+        return session_id, assembled.usage
 
-        return output, session_id
+    async def _prefetch(self, *sources: tuple[Awaitable[Any], Any]) -> list[Any]:
+        tasks = [asyncio.ensure_future(awaitable) for awaitable, _ in sources]
+        _, pending = await asyncio.wait(tasks, timeout=self.settings.chat_prefetch_timeout_seconds)
+        for task in pending:
+            task.cancel()
+
+        results = []
+        for task, (_, default) in zip(tasks, sources):
+            if task in pending:
+                logger.warning("chat_prefetch_timeout source=%s", task.get_coro().__qualname__)
+                results.append(default)
+            elif task.exception() is not None:
+                logger.warning("chat_prefetch_failed source=%s error=%s", task.get_coro().__qualname__, task.exception())
+                results.append(default)
+            else:
+                results.append(task.result())
+        return results
+
+    async def _remember(self, session_id: str, request: ChatRequest, output: StructuredOutput) -> None:
+        """Queue the turn for the memory's write-behind flusher, which retries failed writes."""
+        messages = [
+            ChatMessage(role="user", content=request.message),
+            ChatMessage(role="assistant", content=output.reply),
+        ]
+        await self.memory.append_messages(session_id, messages)
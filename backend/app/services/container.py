@@ -0,0 +1,76 @@
+import asyncio
+import logging
+
+from fastapi import Request
+
+from app.core.config.settings import Settings
+from app.core.http import close_http_client
+from app.db.mongo.client import close_mongo_client
+from app.llm.cache import ResponseCache
+from app.llm.client import LLMClient
+from app.memory.short_term.conversation import ConversationMemory
+from app.plugins.executor import shutdown_plugin_pools
+from app.plugins.loader import load_plugins
+from app.rag.embeddings import shutdown_embedding_executor
+from app.rag.ingest import shutdown_ingest_pool
+from app.rag.jobs import IngestJobQueue
+from app.rag.service import RAGService
+from app.services.chat_service import ChatService
+from app.services.planning_service import PlanningService
+from app.services.tts_service import TTSService
+from app.services.voice_service import VoiceService
+from app.tools.executors import shutdown_tool_executors
+from app.tools.loader import load_builtin_tools
+from app.tools.registry import ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Application-scoped services, built once in the lifespan and shared by every request."""
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.tools = ToolRegistry(settings)
+        load_builtin_tools(self.tools)
+        load_plugins(self.tools, settings)
+        self.rag = RAGService(settings)
+        self.llm = LLMClient(settings, cache=ResponseCache(settings, embeddings=self.rag.embeddings))
+        self.memory = ConversationMemory(settings)
+        self.ingest_jobs = IngestJobQueue(settings, self.rag)
+
+        self.chat = ChatService(settings, tools=self.tools, llm=self.llm, memory=self.memory, rag=self.rag)
+        self.planning = PlanningService(settings, llm=self.llm)
+        self.voice = VoiceService(settings)
+        self.tts = TTSService(settings)
+        self._backfill: asyncio.Task | None = None
+        logger.info("service_container_ready tools=%s", len(self.tools.list_tools()))
+
+    async def start(self) -> None:
+        await self.ingest_jobs.start()
+        # Index chunks stored before hybrid search existed, without delaying startup.
+        self._backfill = asyncio.create_task(self._backfill_lexical())
+
+    async def _backfill_lexical(self) -> None:
+        try:
+            await self.rag.backfill_lexical()
+        except Exception as exc:
+            logger.warning("rag_lexical_backfill_failed error=%s", exc)
+
+    async def aclose(self) -> None:
+        if self._backfill is not None:
+            self._backfill.cancel()
+            await asyncio.gather(self._backfill, return_exceptions=True)
+        await self.ingest_jobs.stop()
+        await self.memory.aclose()
+        await self.rag.aclose()
+        shutdown_embedding_executor()
+        shutdown_ingest_pool()
+        shutdown_plugin_pools()
+        shutdown_tool_executors()
+        close_mongo_client()
+        await close_http_client()
+
+
+def get_services(request: Request) -> ServiceContainer:
+    return request.app.state.services
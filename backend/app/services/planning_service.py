@@ -1,16 +1,39 @@
+from typing import AsyncIterator
+
+from app.agents.loop import AgentEvent
 from app.agents.planning.planner import PlanningAgent
-from app.core.config.settings import get_settings
+from app.agents.planning.runs import PlanRunStore
+from app.core.config.settings import Settings, get_settings
 from app.llm.client import LLMClient
-from app.models.planning import PlanRequest, PlanResponse
+from app.core.errors import AppError
+from app.models.planning import PlanRequest, PlanResponse, PlanRun
 from app.security.validation import validate_user_input
 
 
 class PlanningService:
-    def __init__(self) -> None:
-        self.settings = get_settings()
-        self.llm = LLMClient(self.settings)
-        self.agent = PlanningAgent(self.llm, self.settings)
+    def __init__(self, settings: Settings | None = None, llm: LLMClient | None = None) -> None:
+        self.settings = settings or get_settings()
+        self.llm = llm or LLMClient(self.settings)
+        self.runs = PlanRunStore(self.settings) if self.settings.planning_persist_runs else None
+        self.agent = PlanningAgent(self.llm, self.settings, runs=self.runs)
+
+    async def ensure_indexes(self) -> None:
+        if self.runs is not None:
+            await self.runs.ensure_indexes()
 
     async def run(self, request: PlanRequest) -> PlanResponse:
         validate_user_input(request.goal)
         return await self.agent.run(request)
+
+    async def stream(self, request: PlanRequest) -> AsyncIterator[AgentEvent]:
+        validate_user_input(request.goal)
+        async for event in self.agent.stream(request):
+            yield event
+
+    async def get_run(self, run_id: str) -> PlanRun:
+        if self.runs is None:
+            raise AppError("plan_runs_disabled", status_code=503)
+        return await self.runs.get(run_id)
+
+    async def resume(self, run_id: str) -> PlanResponse:
+        return await self.agent.resume(run_id)
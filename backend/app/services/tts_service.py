@@ -1,6 +1,6 @@
 from typing import AsyncIterator
 
-from app.core.config.settings import get_settings
+from app.core.config.settings import Settings, get_settings
 from app.core.errors import AppError
 from app.models.voice import TTSRequest
 from app.voice.tts.base import AUDIO_MIME_TYPES, TTSResult
@@ -9,8 +9,8 @@ from app.voice.tts.openai import OpenAITTSClient
 
 
 class TTSService:
-    def __init__(self) -> None:
-        self.settings = get_settings()
+    def __init__(self, settings: Settings | None = None) -> None:
+        self.settings = settings or get_settings()
         self.local = LocalTTSClient()
         self.openai = OpenAITTSClient(self.settings)
 
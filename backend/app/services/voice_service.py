@@ -3,14 +3,14 @@ from pathlib import Path
 
 from fastapi import UploadFile
 
-from app.core.config.settings import get_settings
+from app.core.config.settings import Settings, get_settings
 from app.core.errors import AppError
 from app.voice.stt.whisper import WhisperClient
 
 
 class VoiceService:
-    def __init__(self) -> None:
-        self.settings = get_settings()
+    def __init__(self, settings: Settings | None = None) -> None:
+        self.settings = settings or get_settings()
         self.whisper = WhisperClient(self.settings)
 
     async def transcribe(self, file: UploadFile) -> str:
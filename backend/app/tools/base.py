@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Any, Awaitable, Callable, Type
 
 from pydantic import BaseModel
@@ -14,7 +15,12 @@ class ToolDefinition:
     allowed_roles: list[str] | None = None
     requires_confirmation: bool = False
     permissions: list[str] | None = None
+    # How a sync handler runs: "inline" (on the event loop), "thread" or "process" (shared pools).
+    # Async handlers always run natively on the loop.
+    executor: str = "thread"
+    max_concurrency: int | None = None
+    timeout_seconds: float | None = None
 
-    @property
+    @cached_property
     def parameters(self) -> dict[str, Any]:
         return self.args_model.model_json_schema()
@@ -0,0 +1,39 @@
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+
+from app.core.config.settings import Settings
+
+TOOL_EXECUTORS = ("inline", "thread", "process")
+
+_EXECUTORS: dict[str, Executor] = {}
+_EXECUTORS_LOCK = Lock()
+
+
+def get_tool_executor(kind: str, settings: Settings) -> Executor:
+    """Shared bounded executor for sync tool handlers (``"thread"`` or ``"process"``)."""
+    executor = _EXECUTORS.get(kind)
+    if executor is None:
+        with _EXECUTORS_LOCK:
+            executor = _EXECUTORS.get(kind)
+            if executor is None:
+                executor = _EXECUTORS[kind] = _create(kind, settings)
+    return executor
+
+
+def shutdown_tool_executors() -> None:
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _create(kind: str, settings: Settings) -> Executor:
+    if kind == "process":
+        # Handlers and their arguments must be picklable (module-level functions).
+        return ProcessPoolExecutor(
+            max_workers=max(1, settings.tool_process_workers),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return ThreadPoolExecutor(max_workers=max(1, settings.tool_thread_workers), thread_name_prefix="tool")
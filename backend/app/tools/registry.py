@@ -1,50 +1,82 @@
+import asyncio
+import contextlib
 import inspect
 import logging
-from typing import Any
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, get_args
 
-from pydantic import ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
+from app.core.config.settings import Settings, get_settings
 from app.security.audit import log_tool_allowed, log_tool_block
 from app.tools.base import ToolDefinition
 from app.tools.context import ToolContext
+from app.tools.executors import TOOL_EXECUTORS, get_tool_executor
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class _CompiledTool:
+    """Everything ``ToolRegistry.call`` needs for one tool, built once at registration."""
+
+    definition: ToolDefinition
+    adapter: TypeAdapter
+    provider_schema: dict[str, Any]
+    # Nested models must go through dump_python to reach the handler as plain data.
+    needs_dump: bool
+    executor: str
+    limit: asyncio.Semaphore | None
+
+
 class ToolRegistry:
-    def __init__(self) -> None:
-        self._tools: dict[str, ToolDefinition] = {}
+    """Registered tools plus precomputed schemas and validators.
+
+    Schemas, ``TypeAdapter`` validators and the sorted provider tool list are
+    built when a tool is registered; ``version`` increases with every
+    registration so callers can cache anything derived from the registry.
+    The returned schema objects are shared and must not be mutated.
+
+    Handlers never block the event loop: async handlers are awaited
+    directly, sync handlers run on the shared thread pool (or process pool,
+    or inline, per ``ToolDefinition.executor``). Every call is bounded by the
+    tool's ``timeout_seconds`` (default ``tool_timeout_seconds``), which
+    includes waiting for one of its ``max_concurrency`` slots. A timed-out
+    thread is not interrupted, only abandoned.
+    """
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self.settings = settings or get_settings()
+        self._tools: dict[str, _CompiledTool] = {}
+        self.version = 0
+        self._sorted: list[ToolDefinition] = []
+        self._openai_tools: list[dict[str, Any]] = []
 
     def register_tool(self, tool: ToolDefinition) -> None:
         if tool.name in self._tools:
             raise ValueError(f"Tool already registered: {tool.name}")
-        self._tools[tool.name] = tool
+        self._tools[tool.name] = _compile(tool)
+        self.version += 1
+        names = sorted(self._tools)
+        self._sorted = [self._tools[name].definition for name in names]
+        self._openai_tools = [self._tools[name].provider_schema for name in names]
 
     def get(self, name: str) -> ToolDefinition:
-        return self._tools[name]
+        return self._tools[name].definition
 
     def list_tools(self) -> list[ToolDefinition]:
-        return [self._tools[name] for name in sorted(self._tools.keys())]
+        return list(self._sorted)
 
     def openai_tools(self) -> list[dict[str, Any]]:
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "parameters": tool.parameters,
-                },
-            }
-            for tool in self.list_tools()
-        ]
+        return self._openai_tools
 
     async def call(self, name: str, arguments: dict[str, Any], context: ToolContext) -> Any:
-        try:
-            tool = self.get(name)
-        except KeyError:
+        compiled = self._tools.get(name)
+        if compiled is None:
             log_tool_block("tool_not_found", name, context.role)
             return {"error": "tool_not_found"}
+        tool = compiled.definition
         logger.info("tool_call name=%s arguments=%s", name, arguments)
 
         if tool.allowed_roles is not None and context.role not in tool.allowed_roles:
@@ -62,18 +94,67 @@ class ToolRegistry:
             return {"error": "confirmation_required", "tool": name}
 
         try:
-            parsed = tool.args_model.model_validate(arguments)
+            parsed = compiled.adapter.validate_python(arguments)
         except ValidationError as exc:
             logger.warning("tool_validation_failed name=%s error=%s", name, exc)
             return {"error": "tool_validation_failed", "details": exc.errors()}
 
+        if compiled.needs_dump:
+            kwargs = compiled.adapter.dump_python(parsed)
+        else:
+            kwargs = dict(parsed.__dict__)
+            if parsed.__pydantic_extra__:
+                kwargs.update(parsed.__pydantic_extra__)
+
+        timeout = tool.timeout_seconds or self.settings.tool_timeout_seconds
         try:
-            result = tool.handler(**parsed.model_dump())
-            if inspect.isawaitable(result):
-                result = await result
+            result = await asyncio.wait_for(self._run(compiled, kwargs), timeout)
             log_tool_allowed(name, context.role)
             logger.info("tool_call_success name=%s", name)
             return result
+        except asyncio.TimeoutError:
+            logger.warning("tool_call_timeout name=%s timeout=%s", name, timeout)
+            return {"error": "tool_timeout", "timeout_seconds": timeout}
         except Exception as exc:
             logger.exception("tool_call_failed name=%s", name)
             return {"error": "tool_execution_failed", "details": str(exc)}
+
+    async def _run(self, compiled: _CompiledTool, kwargs: dict[str, Any]) -> Any:
+        handler = compiled.definition.handler
+        async with compiled.limit or contextlib.nullcontext():
+            if compiled.executor == "inline" or inspect.iscoroutinefunction(handler):
+                result = handler(**kwargs)
+            else:
+                executor = get_tool_executor(compiled.executor, self.settings)
+                result = await asyncio.get_running_loop().run_in_executor(executor, partial(handler, **kwargs))
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+
+def _compile(tool: ToolDefinition) -> _CompiledTool:
+    executor = tool.executor
+    if executor not in TOOL_EXECUTORS:
+        logger.warning("tool_unknown_executor name=%s executor=%s", tool.name, executor)
+        executor = "thread"
+    return _CompiledTool(
+        definition=tool,
+        adapter=TypeAdapter(tool.args_model),
+        provider_schema={
+            "type": "function",
+            "function": {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": tool.parameters,
+            },
+        },
+        needs_dump=any(_has_model(field.annotation) for field in tool.args_model.model_fields.values()),
+        executor=executor,
+        limit=asyncio.Semaphore(tool.max_concurrency) if tool.max_concurrency else None,
+    )
+
+
+def _has_model(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_has_model(arg) for arg in get_args(annotation))
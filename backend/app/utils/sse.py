@@ -0,0 +1,40 @@
+import asyncio
+import json
+from typing import AsyncIterator, TypeVar
+
+T = TypeVar("T")
+
+# An SSE comment line: ignored by clients, but keeps proxies from timing out an idle stream.
+KEEPALIVE = ": keep-alive\n\n"
+
+
+def format_sse(event: str, data: object) -> str:
+    payload = json.dumps(data, ensure_ascii=True, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def with_heartbeat(events: AsyncIterator[T], interval: float) -> AsyncIterator[T | None]:
+    """Re-yield ``events``, yielding ``None`` whenever nothing arrived for ``interval`` seconds.
+
+    An ``interval`` of zero or less disables heartbeats.
+    """
+    if interval <= 0:
+        async for item in events:
+            yield item
+        return
+    iterator = events.__aiter__()
+    pending = asyncio.ensure_future(iterator.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({pending}, timeout=interval)
+            if not done:
+                yield None
+                continue
+            try:
+                item = pending.result()
+            except StopAsyncIteration:
+                return
+            yield item
+            pending = asyncio.ensure_future(iterator.__anext__())
+    finally:
+        pending.cancel()
@@ -1,4 +1,6 @@
-from typing import Any
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator
 
 import chromadb
 
@@ -10,19 +12,77 @@ class ChromaStore:
         self.settings = settings
         self._client = chromadb.PersistentClient(path=settings.vector_store_path)
         self._collection = self._client.get_or_create_collection("rag")
+        self._generation_path = Path(settings.vector_store_path) / "generation"
+        self.generation = self._load_generation()
 
-    async def add_texts(self, texts: list[str], embeddings: list[list[float]], metadata: list[dict]) -> None:
-        ids = [f"doc-{index}" for index in range(len(texts))]
-        self._collection.add(documents=texts, embeddings=embeddings, metadatas=metadata, ids=ids)
+    async def add_texts(
+        self,
+        texts: list[str],
+        embeddings: list[list[float]],
+        metadata: list[dict],
+        ids: list[str] | None = None,
+    ) -> None:
+        if ids is None:
+            ids = [uuid.uuid4().hex for _ in texts]
+        self._collection.upsert(documents=texts, embeddings=embeddings, metadatas=metadata, ids=ids)
+        self._bump_generation()
+
+    async def existing_ids(self, source_key: str) -> set[str]:
+        result = self._collection.get(where={"source_key": source_key}, include=[])
+        return set(result.get("ids", []))
+
+    async def delete_ids(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        self._collection.delete(ids=ids)
+        self._bump_generation()
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        if not ids:
+            return []
+        result = self._collection.get(ids=ids, include=["documents", "metadatas"])
+        rows = {
+            chunk_id: (doc, meta)
+            for chunk_id, doc, meta in zip(
+                result.get("ids", []), result.get("documents", []), result.get("metadatas", []), strict=False
+            )
+        }
+        return [
+            {"id": chunk_id, "text": rows[chunk_id][0], "metadata": rows[chunk_id][1]}
+            for chunk_id in ids
+            if chunk_id in rows
+        ]
+
+    async def iter_chunks(self, batch_size: int) -> AsyncIterator[list[tuple[str, str]]]:
+        """Yield every stored ``(chunk_id, text)`` in batches."""
+        offset = 0
+        while True:
+            result = self._collection.get(include=["documents"], limit=max(1, batch_size), offset=offset)
+            ids = result.get("ids", [])
+            if not ids:
+                return
+            offset += len(ids)
+            yield list(zip(ids, result.get("documents", []), strict=False))
 
     async def similarity_search(self, embedding: list[float], top_k: int) -> list[dict[str, Any]]:
         results = self._collection.query(query_embeddings=[embedding], n_results=top_k)
         hits: list[dict[str, Any]] = []
-        for doc, meta, dist in zip(
+        for chunk_id, doc, meta, dist in zip(
+            results.get("ids", [[]])[0],
             results.get("documents", [[]])[0],
             results.get("metadatas", [[]])[0],
             results.get("distances", [[]])[0],
             strict=False,
         ):
-            hits.append({"text": doc, "metadata": meta, "score": float(dist)})
+            hits.append({"id": chunk_id, "text": doc, "metadata": meta, "score": float(dist)})
         return hits
+
+    def _load_generation(self) -> int:
+        try:
+            return int(self._generation_path.read_text(encoding="utf-8").strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _bump_generation(self) -> None:
+        self.generation += 1
+        self._generation_path.write_text(str(self.generation), encoding="utf-8")
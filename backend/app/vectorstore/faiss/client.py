@@ -1,54 +1,578 @@
+import asyncio
 import json
+import logging
+import os
+import sqlite3
 from pathlib import Path
-from typing import Any
+from threading import Lock, RLock
+from typing import Any, AsyncIterator
 
 import faiss
 import numpy as np
 
 from app.core.config.settings import Settings
+from app.vectorstore.ids import source_key_for
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    pos INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    seq INTEGER PRIMARY KEY,
+    start INTEGER NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_CHUNK_ID_SCHEMA = """
+ALTER TABLE chunks ADD COLUMN chunk_id TEXT;
+ALTER TABLE chunks ADD COLUMN source_key TEXT;
+ALTER TABLE chunks ADD COLUMN deleted INTEGER NOT NULL DEFAULT 0;
+"""
+
+# Stays below SQLite's bound-variable limit (999 in older builds).
+_SQL_BATCH = 900
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS chunks_chunk_id ON chunks (chunk_id);
+CREATE INDEX IF NOT EXISTS chunks_source_key ON chunks (source_key, deleted);
+"""
 
 
 class FaissStore:
+    """FAISS vector store with an append-only on-disk layout.
+
+    ``index.faiss`` and ``base.npy`` hold the compacted base and are memory
+    mapped on load. Every ``add_texts`` call appends one ``segments/*.npy``
+    file and inserts its rows into ``metadata.db`` (SQLite, keyed by vector
+    position), so ingest cost depends only on the new data. Appended segments
+    are searched through a small in-memory delta index until compaction folds
+    them into the base.
+
+    Chunks carry content-addressed ids. Replacing or deleting a chunk only
+    tombstones its row; tombstoned vectors are filtered at search time and
+    dropped (with positions renumbered) by the next compaction.
+
+    The base is an exact ``IndexFlatIP`` until the corpus reaches
+    ``faiss_ann_min_vectors``; from then on compaction builds the configured
+    ``faiss_index_type``. Compaction runs without holding the store lock, so
+    searches keep using the previous base while a new one is trained.
+    """
+
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
         self._dir = Path(settings.vector_store_path)
         self._dir.mkdir(parents=True, exist_ok=True)
+        self._segments_dir = self._dir / "segments"
+        self._segments_dir.mkdir(exist_ok=True)
         self._index_path = self._dir / "index.faiss"
-        self._meta_path = self._dir / "metadata.json"
-        self._index = None
-        self._metadata: list[dict[str, Any]] = []
+        self._base_path = self._dir / "base.npy"
+        self._db_path = self._dir / "metadata.db"
+        self._legacy_meta_path = self._dir / "metadata.json"
+
+        self._lock = RLock()
+        self._compact_lock = Lock()
+        self._db = sqlite3.connect(self._db_path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._upgrade_schema()
+        self._base = None
+        self._base_count = 0
+        self._delta = None
+        self._segment_count = 0
+        self._total = 0
+        self._deleted = 0
+        self.generation = 0
         self._load()
 
+    def _upgrade_schema(self) -> None:
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(chunks)")}
+        if "chunk_id" not in columns:
+            with self._db:
+                for statement in filter(str.strip, _CHUNK_ID_SCHEMA.split(";")):
+                    self._db.execute(statement)
+            self._backfill_chunk_ids()
+        self._db.executescript(_INDEXES)
+
+    def _backfill_chunk_ids(self) -> None:
+        """Give rows written before chunk ids existed a placeholder id and their source key.
+
+        Re-ingesting such a source then treats the placeholders as stale and replaces them.
+        """
+        rows = self._db.execute("SELECT pos, metadata FROM chunks WHERE chunk_id IS NULL").fetchall()
+        updates = []
+        for pos, meta in rows:
+            source = (json.loads(meta) or {}).get("source")
+            updates.append((f"legacy-{pos}", source_key_for(source) if source else None, pos))
+        with self._db:
+            self._db.executemany("UPDATE chunks SET chunk_id = ?, source_key = ? WHERE pos = ?", updates)
+
     def _load(self) -> None:
+        if self._legacy_meta_path.exists() and self._row_count() == 0:
+            self._migrate_legacy()
+
+        self._finish_swap()
+        self._base_count = self._get_state("base_count")
+        self.generation = self._get_state("generation")
         if self._index_path.exists():
-            self._index = faiss.read_index(str(self._index_path))
-        if self._meta_path.exists():
-            self._metadata = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            self._base = self._read_base()
 
-    def _save(self) -> None:
-        if self._index is not None:
-            faiss.write_index(self._index, str(self._index_path))
-        self._meta_path.write_text(json.dumps(self._metadata), encoding="utf-8")
+        self._total = self._base_count
+        known: set[str] = set()
+        for seq, start, count in self._db.execute("SELECT seq, start, count FROM segments ORDER BY seq"):
+            path = self._segment_path(seq)
+            known.add(path.name)
+            vectors = np.load(path)
+            self._delta_index(vectors.shape[1]).add(vectors)
+            self._segment_count += 1
+            self._total = start + count
+        self._deleted = self._count_deleted()
 
-    async def add_texts(self, texts: list[str], embeddings: list[list[float]], metadata: list[dict]) -> None:
-        vectors = np.array(embeddings, dtype="float32")
-        if self._index is None:
-            self._index = faiss.IndexFlatIP(vectors.shape[1])
-        self._index.add(vectors)
-        for text, meta in zip(texts, metadata, strict=False):
-            self._metadata.append({"text": text, "metadata": meta})
-        self._save()
+        for path in self._segments_dir.glob("*.npy"):
+            if path.name not in known:
+                # Written by an ingest that crashed before its metadata commit.
+                path.unlink(missing_ok=True)
+
+    def _finish_swap(self) -> None:
+        """Complete or roll back a compaction that was interrupted mid-swap."""
+        tmp_paths = (self._tmp_path(self._base_path), self._tmp_path(self._index_path))
+        if self._get_state("swap_pending"):
+            # Metadata already describes the new base; install its files.
+            for tmp, final in zip(tmp_paths, (self._base_path, self._index_path)):
+                if tmp.exists():
+                    os.replace(tmp, final)
+            with self._db:
+                self._set_state("swap_pending", 0)
+        else:
+            for tmp in tmp_paths:
+                tmp.unlink(missing_ok=True)
+
+    async def add_texts(
+        self,
+        texts: list[str],
+        embeddings: list[list[float]],
+        metadata: list[dict],
+        ids: list[str] | None = None,
+    ) -> None:
+        await asyncio.to_thread(self._add, texts, embeddings, metadata, ids)
 
     async def similarity_search(self, embedding: list[float], top_k: int) -> list[dict[str, Any]]:
-        if self._index is None or not self._metadata:
-            return []
-        vector = np.array([embedding], dtype="float32")
-        scores, indices = self._index.search(vector, top_k)
+        return await asyncio.to_thread(self._search, embedding, top_k)
+
+    async def existing_ids(self, source_key: str) -> set[str]:
+        return await asyncio.to_thread(self._existing_ids, source_key)
+
+    async def delete_ids(self, ids: list[str]) -> None:
+        await asyncio.to_thread(self._delete, ids)
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        return await asyncio.to_thread(self._get_by_ids, ids)
+
+    async def iter_chunks(self, batch_size: int) -> AsyncIterator[list[tuple[str, str]]]:
+        """Yield every live ``(chunk_id, text)`` in batches, in insertion order."""
+        after = -1
+        while batch := await asyncio.to_thread(self._chunks_after, after, batch_size):
+            after = batch[-1][0]
+            yield [(chunk_id, text) for _, chunk_id, text in batch]
+
+    def _add(
+        self,
+        texts: list[str],
+        embeddings: list[list[float]],
+        metadata: list[dict],
+        ids: list[str] | None,
+    ) -> None:
+        if self._append(texts, embeddings, metadata, ids):
+            self._compact()
+
+    def _append(
+        self,
+        texts: list[str],
+        embeddings: list[list[float]],
+        metadata: list[dict],
+        ids: list[str] | None,
+    ) -> bool:
+        vectors = np.array(embeddings, dtype="float32")
+        if vectors.size == 0:
+            return False
+
+        with self._lock:
+            start = self._total
+            if ids is None:
+                ids = [f"{self.generation}-{start + offset}" for offset in range(len(vectors))]
+            seq = self._next_segment_seq()
+            path = self._segment_path(seq)
+            _atomic_save_npy(path, vectors)
+
+            rows = [
+                (start + offset, text, json.dumps(meta), chunk_id, meta.get("source_key"))
+                for offset, (text, meta, chunk_id) in enumerate(zip(texts, metadata, ids, strict=False))
+            ]
+            with self._db:
+                # Re-adding an id replaces the previous vector for it.
+                replaced = self._tombstone(ids)
+                self._db.executemany(
+                    "INSERT INTO chunks (pos, text, metadata, chunk_id, source_key) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.execute(
+                    "INSERT INTO segments (seq, start, count) VALUES (?, ?, ?)",
+                    (seq, start, len(vectors)),
+                )
+                self._set_state("generation", self.generation + 1)
+            self.generation += 1
+            self._deleted += replaced
+
+            self._delta_index(vectors.shape[1]).add(vectors)
+            self._segment_count += 1
+            self._total = start + len(vectors)
+
+            return self._segment_count >= max(1, self.settings.faiss_compaction_segments) or self._needs_rebuild()
+
+    def _delete(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        with self._lock:
+            with self._db:
+                removed = self._tombstone(ids)
+                if removed:
+                    self._set_state("generation", self.generation + 1)
+            if not removed:
+                return
+            self.generation += 1
+            self._deleted += removed
+            needs_compaction = self._too_many_deleted()
+        if needs_compaction:
+            self._compact()
+
+    def _existing_ids(self, source_key: str) -> set[str]:
+        with self._lock:
+            cursor = self._db.execute(
+                "SELECT chunk_id FROM chunks WHERE source_key = ? AND deleted = 0",
+                (source_key,),
+            )
+            return {chunk_id for (chunk_id,) in cursor}
+
+    def _get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        rows: dict[str, tuple[str, str]] = {}
+        with self._lock:
+            for start in range(0, len(ids), _SQL_BATCH):
+                batch = ids[start : start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                cursor = self._db.execute(
+                    f"SELECT chunk_id, text, metadata FROM chunks WHERE chunk_id IN ({placeholders}) AND deleted = 0",
+                    batch,
+                )
+                rows.update((chunk_id, (text, meta)) for chunk_id, text, meta in cursor)
+        return [
+            {"id": chunk_id, "text": rows[chunk_id][0], "metadata": json.loads(rows[chunk_id][1])}
+            for chunk_id in ids
+            if chunk_id in rows
+        ]
+
+    def _chunks_after(self, pos: int, limit: int) -> list[tuple[int, str, str]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT pos, chunk_id, text FROM chunks WHERE pos > ? AND deleted = 0 ORDER BY pos LIMIT ?",
+                (pos, max(1, limit)),
+            ).fetchall()
+
+    def _tombstone(self, ids: list[str]) -> int:
+        cursor = self._db.executemany(
+            "UPDATE chunks SET deleted = 1 WHERE chunk_id = ? AND deleted = 0",
+            [(chunk_id,) for chunk_id in ids],
+        )
+        return max(0, cursor.rowcount)
+
+    def _too_many_deleted(self) -> bool:
+        return self._deleted > 0 and self._deleted >= self.settings.faiss_compaction_deleted_ratio * self._total
+
+    def _needs_rebuild(self) -> bool:
+        """True once the corpus has outgrown the exact base index."""
+        if self._too_many_deleted():
+            return True
+        if self.settings.faiss_index_type == "flat" or self._total < self.settings.faiss_ann_min_vectors:
+            return False
+        if self._base is None:
+            return True
+        # A flat base built after the threshold means the ANN build fell back; don't retry it on every add.
+        return isinstance(self._base, faiss.IndexFlat) and self._base_count < self.settings.faiss_ann_min_vectors
+
+    def _search(self, embedding: list[float], top_k: int) -> list[dict[str, Any]]:
+        with self._lock:
+            if self._total == 0 or top_k <= 0:
+                return []
+            vector = np.array([embedding], dtype="float32")
+            # Over-fetch a bounded multiple so tombstones rarely starve the result, and widen
+            # only for the queries where they do.
+            factor = max(1, self.settings.faiss_search_overfetch) if self._deleted else 1
+            fetch_k = min(self._total, top_k * factor)
+            found = -1
+            while True:
+                candidates = self._candidates(vector, fetch_k)
+                rows = self._fetch_rows([pos for _, pos in candidates])
+                live = sum(1 for _, pos in candidates if pos in rows)
+                if live >= top_k or fetch_k >= self._total or len(candidates) <= found:
+                    break
+                found = len(candidates)
+                fetch_k = min(self._total, fetch_k * 2)
+
         results: list[dict[str, Any]] = []
-        for score, idx in zip(scores[0], indices[0], strict=False):
-            if idx < 0 or idx >= len(self._metadata):
+        for score, pos in candidates:
+            row = rows.get(pos)
+            if row is None:
                 continue
-            payload = dict(self._metadata[idx])
-            payload["score"] = float(score)
-            results.append(payload)
+            chunk_id, text, meta = row
+            results.append({"id": chunk_id, "text": text, "metadata": json.loads(meta), "score": score})
+            if len(results) >= top_k:
+                break
         return results
+
+    def _candidates(self, vector: np.ndarray, fetch_k: int) -> list[tuple[float, int]]:
+        """Up to ``fetch_k`` nearest positions from the base and the delta index, best first."""
+        candidates: list[tuple[float, int]] = []
+        if self._base is not None and self._base.ntotal:
+            scores, indices = self._base.search(vector, fetch_k)
+            candidates.extend((float(score), int(idx)) for score, idx in zip(scores[0], indices[0]) if idx >= 0)
+        if self._delta is not None and self._delta.ntotal:
+            scores, indices = self._delta.search(vector, min(fetch_k, self._delta.ntotal))
+            candidates.extend(
+                (float(score), self._base_count + int(idx)) for score, idx in zip(scores[0], indices[0]) if idx >= 0
+            )
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        return candidates
+
+    def _compact(self) -> None:
+        """Fold appended segments into a new base index and drop tombstoned vectors.
+
+        The new base is built from a snapshot of the segment list; segments
+        appended meanwhile stay in the delta index and are compacted next time.
+        Metadata and the new files are swapped in together: the SQLite commit
+        sets ``swap_pending`` and ``_finish_swap`` completes the file renames
+        if the process dies in between.
+        """
+        if not self._compact_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                segments = self._db.execute("SELECT seq, start, count FROM segments ORDER BY seq").fetchall()
+                base_count = self._base_count
+                snapshot_total = self._total
+                dead = [
+                    pos
+                    for (pos,) in self._db.execute(
+                        "SELECT pos FROM chunks WHERE deleted = 1 AND pos < ? ORDER BY pos",
+                        (snapshot_total,),
+                    )
+                ]
+            if not segments and not dead:
+                return
+
+            parts = [np.load(self._segment_path(seq)) for seq, _, _ in segments]
+            if self._base_path.exists() and base_count:
+                parts.insert(0, np.load(self._base_path, mmap_mode="r")[:base_count])
+            vectors = np.concatenate(parts)
+            if dead:
+                keep = np.ones(len(vectors), dtype=bool)
+                keep[dead] = False
+                vectors = vectors[keep]
+            vectors = np.ascontiguousarray(vectors, dtype="float32")
+            index = build_index(vectors, self.settings)
+
+            tmp_base = self._tmp_path(self._base_path)
+            tmp_index = self._tmp_path(self._index_path)
+            with open(tmp_base, "wb") as handle:
+                np.save(handle, vectors)
+            faiss.write_index(index, str(tmp_index))
+
+            with self._lock:
+                compacted = [seq for seq, _, _ in segments]
+                with self._db:
+                    self._db.executemany("DELETE FROM segments WHERE seq = ?", [(seq,) for seq in compacted])
+                    if dead:
+                        self._drop_rows(dead)
+                    self._set_state("base_count", len(vectors))
+                    self._set_state("swap_pending", 1)
+                os.replace(tmp_base, self._base_path)
+                os.replace(tmp_index, self._index_path)
+                with self._db:
+                    self._set_state("swap_pending", 0)
+                for seq in compacted:
+                    self._segment_path(seq).unlink(missing_ok=True)
+
+                self._base = self._read_base()
+                self._base_count = len(vectors)
+                self._total -= len(dead)
+                self._deleted = self._count_deleted()
+                self._delta = None
+                self._segment_count = 0
+                for (seq,) in self._db.execute("SELECT seq FROM segments ORDER BY seq"):
+                    appended = np.load(self._segment_path(seq))
+                    self._delta_index(appended.shape[1]).add(appended)
+                    self._segment_count += 1
+
+            logger.info(
+                "faiss_compacted vectors=%s segments=%s dropped=%s index=%s",
+                len(vectors),
+                len(segments),
+                len(dead),
+                type(index).__name__,
+            )
+        finally:
+            self._compact_lock.release()
+
+    def _drop_rows(self, dead: list[int]) -> None:
+        """Delete tombstoned rows and close the gaps they leave in ``pos``."""
+        self._db.execute("CREATE TEMP TABLE IF NOT EXISTS dead (pos INTEGER PRIMARY KEY)")
+        self._db.execute("DELETE FROM temp.dead")
+        self._db.executemany("INSERT INTO temp.dead (pos) VALUES (?)", [(pos,) for pos in dead])
+        self._db.execute("DELETE FROM chunks WHERE pos IN (SELECT pos FROM temp.dead)")
+        # Two passes through negative values keep pos unique while rows shift down.
+        self._db.execute(
+            "UPDATE chunks SET pos = -1 - (pos - (SELECT COUNT(*) FROM temp.dead WHERE temp.dead.pos < chunks.pos))"
+        )
+        self._db.execute("UPDATE chunks SET pos = -1 - pos WHERE pos < 0")
+        self._db.execute("UPDATE segments SET start = start - ?", (len(dead),))
+
+    def _read_base(self) -> faiss.Index:
+        index = faiss.read_index(str(self._index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        configure_search(index, self.settings)
+        return index
+
+    def _migrate_legacy(self) -> None:
+        """Import a ``metadata.json`` + ``index.faiss`` store written by earlier versions."""
+        metadata = json.loads(self._legacy_meta_path.read_text(encoding="utf-8"))
+        count = 0
+        if self._index_path.exists() and metadata:
+            legacy = faiss.read_index(str(self._index_path))
+            count = min(len(metadata), legacy.ntotal)
+            _atomic_save_npy(self._base_path, legacy.reconstruct_n(0, count))
+
+        rows = [
+            (pos, item.get("text", ""), json.dumps(item.get("metadata") or {}))
+            for pos, item in enumerate(metadata[:count])
+        ]
+        with self._db:
+            self._db.executemany("INSERT INTO chunks (pos, text, metadata) VALUES (?, ?, ?)", rows)
+            self._set_state("base_count", count)
+        self._backfill_chunk_ids()
+        self._legacy_meta_path.rename(self._legacy_meta_path.with_suffix(".json.migrated"))
+        logger.info("faiss_legacy_store_migrated chunks=%s", count)
+
+    def _delta_index(self, dim: int) -> faiss.Index:
+        if self._delta is None:
+            self._delta = faiss.IndexFlatIP(dim)
+        return self._delta
+
+    def _fetch_rows(self, positions: list[int]) -> dict[int, tuple[str, str, str]]:
+        rows: dict[int, tuple[str, str, str]] = {}
+        for start in range(0, len(positions), _SQL_BATCH):
+            batch = positions[start : start + _SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            cursor = self._db.execute(
+                f"SELECT pos, chunk_id, text, metadata FROM chunks WHERE pos IN ({placeholders}) AND deleted = 0",
+                batch,
+            )
+            rows.update((pos, (chunk_id, text, meta)) for pos, chunk_id, text, meta in cursor)
+        return rows
+
+    def _next_segment_seq(self) -> int:
+        row = self._db.execute("SELECT MAX(seq) FROM segments").fetchone()
+        return (row[0] or 0) + 1
+
+    def _segment_path(self, seq: int) -> Path:
+        return self._segments_dir / f"segment-{seq:08d}.npy"
+
+    @staticmethod
+    def _tmp_path(path: Path) -> Path:
+        return path.with_name(path.name + ".tmp")
+
+    def _row_count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def _count_deleted(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM chunks WHERE deleted = 1").fetchone()[0]
+
+    def _get_state(self, key: str) -> int:
+        row = self._db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _set_state(self, key: str, value: int) -> None:
+        self._db.execute(
+            "INSERT INTO state (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+
+def build_index(vectors: np.ndarray, settings: Settings) -> faiss.Index:
+    """Build the base index for ``vectors`` according to ``faiss_index_type``.
+
+    Falls back to an exact ``IndexFlatIP`` below ``faiss_ann_min_vectors`` or
+    when the configured index cannot be built for this corpus.
+    """
+    count, dim = vectors.shape
+    index_type = settings.faiss_index_type
+    if index_type not in INDEX_TYPES:
+        logger.warning("faiss_unknown_index_type type=%s", index_type)
+        index_type = "flat"
+    if index_type == "flat" or count < settings.faiss_ann_min_vectors:
+        index = faiss.IndexFlatIP(dim)
+        index.add(vectors)
+        return index
+
+    try:
+        index = _new_ann_index(index_type, dim, count, settings)
+        if not index.is_trained:
+            index.train(vectors[: max(1, settings.faiss_train_size)])
+        index.add(vectors)
+    except RuntimeError as exc:
+        logger.warning("faiss_ann_build_failed type=%s error=%s", index_type, exc)
+        index = faiss.IndexFlatIP(dim)
+        index.add(vectors)
+    configure_search(index, settings)
+    return index
+
+
+def configure_search(index: faiss.Index, settings: Settings) -> None:
+    """Apply the query-time knobs (``nprobe``/``efSearch``) to an ANN index."""
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = settings.faiss_hnsw_ef_search
+        return
+    try:
+        faiss.extract_index_ivf(index).nprobe = settings.faiss_nprobe
+    except RuntimeError:
+        pass
+
+
+def _new_ann_index(index_type: str, dim: int, count: int, settings: Settings) -> faiss.Index:
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, settings.faiss_hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = settings.faiss_hnsw_ef_construction
+        return index
+
+    # k-means needs at least one training vector per list.
+    nlist = max(1, min(settings.faiss_ivf_nlist, count, settings.faiss_train_size))
+    quantizer = faiss.IndexFlatIP(dim)
+    if index_type == "ivf_pq":
+        if dim % settings.faiss_pq_m:
+            raise RuntimeError(f"dimension {dim} is not divisible by faiss_pq_m={settings.faiss_pq_m}")
+        return faiss.IndexIVFPQ(
+            quantizer, dim, nlist, settings.faiss_pq_m, settings.faiss_pq_nbits, faiss.METRIC_INNER_PRODUCT
+        )
+    return faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+
+
+def _atomic_save_npy(path: Path, array: np.ndarray) -> None:
+    tmp = FaissStore._tmp_path(path)
+    with open(tmp, "wb") as handle:
+        np.save(handle, array)
+    os.replace(tmp, path)
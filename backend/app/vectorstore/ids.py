@@ -0,0 +1,11 @@
+import hashlib
+
+
+def source_key_for(source: str) -> str:
+    """Stable key for a document source (e.g. the uploaded file name)."""
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def chunk_id_for(source_key: str, text: str) -> str:
+    """Content-addressed chunk id: unchanged chunks keep their id across re-ingests."""
+    return f"{source_key}:{hashlib.sha256(text.encode('utf-8')).hexdigest()[:24]}"
@@ -6,6 +6,7 @@ import httpx
 
 from app.core.config.settings import Settings
 from app.core.errors import AppError
+from app.core.http import get_http_client
 from app.voice.tts.base import AUDIO_MIME_TYPES, TTSResult
 
 logger = logging.getLogger(__name__)
@@ -26,12 +27,18 @@ class OpenAITTSClient:
         url = f"{self.settings.tts_api_base.rstrip('/')}/v1/audio/speech"
         headers = self._headers()
 
-        async with httpx.AsyncClient(timeout=self.settings.tts_timeout_seconds) as client:
-            async with client.stream("POST", url, json=payload, headers=headers) as response:
-                response.raise_for_status()
-                async for chunk in response.aiter_bytes():
-                    if chunk:
-                        yield chunk
+        client = get_http_client(self.settings)
+        async with client.stream(
+            "POST",
+            url,
+            json=payload,
+            headers=headers,
+            timeout=self.settings.tts_timeout_seconds,
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                if chunk:
+                    yield chunk
 
     def _payload(self, text: str, voice: str, fmt: str) -> dict[str, object]:
         if not text:
@@ -58,8 +65,13 @@ class OpenAITTSClient:
 
         for attempt in range(1, self.settings.llm_max_retries + 1):
             try:
-                async with httpx.AsyncClient(timeout=self.settings.tts_timeout_seconds) as client:
-                    response = await client.post(url, json=payload, headers=headers)
+                client = get_http_client(self.settings)
+                response = await client.post(
+                    url,
+                    json=payload,
+                    headers=headers,
+                    timeout=self.settings.tts_timeout_seconds,
+                )
                 response.raise_for_status()
                 return response.content
             except httpx.HTTPError as exc:
@@ -0,0 +1,112 @@
+"""Token/sentence chunker against the previous character slicer.
+
+Reports, for each chunker: chunk count, chunking time, embedding time and
+retrieval hit rate. Queries are sentences sampled from the corpus; a query
+is a hit when one of the top-k retrieved chunks contains the whole
+sentence, so chunks that cut sentences in half lose hits.
+
+    cd backend && python -m benchmarks.bench_chunking --file docs/manual.pdf --queries 300
+    cd backend && python -m benchmarks.bench_chunking --no-embed
+"""
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config.settings import Settings
+from app.rag.chunking import chunk_text
+from app.rag.ingest import extract_pdf_text
+
+_SENTENCE_RE = re.compile(r"[^.!?]{40,400}[.!?]")
+_WORDS = (
+    "index vector query latency cache token chunk embedding retrieval model server request "
+    "response session memory plugin timeout budget segment compaction document source"
+).split()
+
+
+def legacy_chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
+    """The character slicer ``app.rag.chunking`` used before (kept here as the baseline)."""
+    step = max(1, chunk_size - max(0, chunk_overlap))
+    chunks = []
+    for start in range(0, len(text), step):
+        chunk = text[start : start + chunk_size].strip()
+        if chunk:
+            chunks.append(chunk)
+    return chunks
+
+
+def _corpus(path: str | None, paragraphs: int, seed: int) -> str:
+    if path:
+        data = Path(path).read_bytes()
+        return extract_pdf_text(data) if path.lower().endswith(".pdf") else data.decode("utf-8")
+    rng = random.Random(seed)
+    blocks = []
+    for _ in range(paragraphs):
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 30))]
+            sentences.append(" ".join(words).capitalize() + rng.choice(".!?"))
+        blocks.append(" ".join(sentences))
+    return "\n\n".join(blocks)
+
+
+def _hit_rate(chunks: list[str], vectors: np.ndarray, queries: list[str], query_vectors: np.ndarray, top_k: int) -> float:
+    scores = query_vectors @ vectors.T
+    top = np.argsort(-scores, axis=1)[:, :top_k]
+    hits = sum(any(query in chunks[index] for index in row) for query, row in zip(queries, top))
+    return hits / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", help="PDF or text file; a synthetic corpus is used if omitted")
+    parser.add_argument("--paragraphs", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--chunk-chars", type=int, default=800)
+    parser.add_argument("--overlap-chars", type=int, default=120)
+    parser.add_argument("--chunk-tokens", type=int, default=200)
+    parser.add_argument("--overlap-tokens", type=int, default=30)
+    parser.add_argument("--no-embed", action="store_true", help="only compare chunk counts and chunking time")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    text = _corpus(args.file, args.paragraphs, args.seed)
+    chunkers = {
+        "chars": lambda: legacy_chunk_text(text, args.chunk_chars, args.overlap_chars),
+        "tokens": lambda: list(chunk_text(text, args.chunk_tokens, args.overlap_tokens)),
+    }
+
+    model = None
+    queries: list[str] = []
+    query_vectors = None
+    if not args.no_embed:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(Settings().embedding_model)
+        sentences = [match.group().strip() for match in _SENTENCE_RE.finditer(text)]
+        queries = random.Random(args.seed).sample(sentences, min(args.queries, len(sentences)))
+        query_vectors = model.encode(queries, normalize_embeddings=True)
+
+    print(f"corpus: {len(text)} chars, {len(queries)} queries")
+    print(f"{'chunker':<8} {'chunks':>7} {'avg chars':>9} {'chunk ms':>9} {'embed s':>8} {f'hit@{args.top_k}':>7}")
+    for name, run in chunkers.items():
+        start = time.perf_counter()
+        chunks = run()
+        chunk_ms = (time.perf_counter() - start) * 1000
+        average = sum(map(len, chunks)) / max(1, len(chunks))
+
+        embed_s = hit_rate = float("nan")
+        if model is not None:
+            start = time.perf_counter()
+            vectors = model.encode(chunks, batch_size=32, normalize_embeddings=True)
+            embed_s = time.perf_counter() - start
+            hit_rate = _hit_rate(chunks, vectors, queries, query_vectors, args.top_k)
+        print(f"{name:<8} {len(chunks):>7} {average:>9.0f} {chunk_ms:>9.1f} {embed_s:>8.2f} {hit_rate:>7.2%}")
+
+
+if __name__ == "__main__":
+    main()
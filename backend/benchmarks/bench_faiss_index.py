@@ -0,0 +1,83 @@
+"""Recall-vs-latency of the FAISS index types against the exact flat baseline.
+
+Uses synthetic clustered, L2-normalised vectors (the embedding model produces
+normalised 384-d vectors), builds each index with the same ``build_index`` the
+store uses, and reports recall@k against ``IndexFlatIP`` ground truth.
+
+    cd backend && python -m benchmarks.bench_faiss_index --vectors 100000 --nprobe 8 16 32
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.core.config.settings import Settings
+from app.vectorstore.faiss.client import build_index
+
+
+def _dataset(count: int, dim: int, queries: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, count // 500), dim))
+    labels = rng.integers(0, len(centers), size=count + queries)
+    data = centers[labels] + 0.35 * rng.normal(size=(count + queries, dim))
+    data = (data / np.linalg.norm(data, axis=1, keepdims=True)).astype("float32")
+    return data[:count], data[count:]
+
+
+def _run(index, queries: np.ndarray, top_k: int) -> tuple[np.ndarray, list[float]]:
+    latencies: list[float] = []
+    found = np.empty((len(queries), top_k), dtype="int64")
+    for row, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found[row] = ids[0]
+    return found, latencies
+
+
+def _recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(row) & set(expected)) for row, expected in zip(found, truth))
+    return hits / truth.size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--types", nargs="+", default=["flat", "ivf_flat", "ivf_pq", "hnsw"])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    vectors, queries = _dataset(args.vectors, args.dim, args.queries, args.seed)
+    baseline = build_index(vectors, Settings(faiss_index_type="flat"))
+    truth, _ = _run(baseline, queries, args.top_k)
+
+    print(f"{'index':<10} {'knob':<20} {'build s':>8} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for index_type in args.types:
+        knobs = [None]
+        if index_type in {"ivf_flat", "ivf_pq"}:
+            knobs = [("faiss_nprobe", value) for value in args.nprobe]
+        elif index_type == "hnsw":
+            knobs = [("faiss_hnsw_ef_search", value) for value in args.ef_search]
+
+        for knob in knobs:
+            overrides = {"faiss_index_type": index_type, "faiss_ann_min_vectors": 0}
+            if knob:
+                overrides[knob[0]] = knob[1]
+            start = time.perf_counter()
+            index = build_index(vectors, Settings(**overrides))
+            build_seconds = time.perf_counter() - start
+            found, latencies = _run(index, queries, args.top_k)
+            label = f"{knob[0].removeprefix('faiss_')}={knob[1]}" if knob else "-"
+            print(
+                f"{index_type:<10} {label:<20} {build_seconds:8.2f} {_recall(found, truth):9.3f} "
+                f"{np.percentile(latencies, 50):8.3f} {np.percentile(latencies, 95):8.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
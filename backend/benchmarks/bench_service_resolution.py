@@ -0,0 +1,45 @@
+"""Per-request cost of resolving the chat service dependency.
+
+Compares building a fresh ``ChatService`` per request (the old
+``get_chat_service``) with the container lookup the routers use now.
+
+    cd backend && python -m benchmarks.bench_service_resolution --iterations 50
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+from app.api.v1.chat.router import get_chat_service
+from app.core.config.settings import get_settings
+from app.services.chat_service import ChatService
+from app.services.container import ServiceContainer, get_services
+
+
+def _time_per_call(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    start = time.perf_counter()
+    services = ServiceContainer(settings)
+    startup = time.perf_counter() - start
+
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(services=services)))
+    per_request = _time_per_call(lambda: ChatService(settings), args.iterations)
+    container = _time_per_call(lambda: get_chat_service(get_services(request)), args.iterations)
+
+    print(f"container startup (once):      {startup * 1000:10.3f} ms")
+    print(f"per-request ChatService():     {per_request * 1000:10.3f} ms/request")
+    print(f"container lookup:              {container * 1000:10.6f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
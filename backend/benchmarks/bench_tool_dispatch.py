@@ -0,0 +1,116 @@
+"""Per-call overhead of ToolRegistry dispatch and provider schema lookup.
+
+Registers ``--tools`` synthetic tools with a no-op handler and times
+``ToolRegistry.call`` and ``openai_tools()`` against the previous
+implementation (``model_validate`` + ``model_dump`` per call and a rebuilt,
+re-sorted schema list per lookup), reproduced here as the baseline.
+
+    cd backend && python -m benchmarks.bench_tool_dispatch --tools 50 --calls 20000
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from pydantic import BaseModel, Field, create_model
+
+from app.tools.base import ToolDefinition
+from app.tools.context import ToolContext
+from app.tools.registry import ToolRegistry
+
+
+def _noop(**kwargs) -> dict:
+    return kwargs
+
+
+def _tools(count: int) -> list[ToolDefinition]:
+    tools = []
+    for index in range(count):
+        args_model = create_model(
+            f"Args{index}",
+            query=(str, Field(..., description="Query text")),
+            top_k=(int, Field(5, ge=1, le=10)),
+            strict=(bool, False),
+        )
+        tools.append(
+            # Inline, so the numbers measure validation and dispatch rather than the thread hop.
+            ToolDefinition(
+                name=f"tool_{index:03d}",
+                description=f"Tool {index}",
+                args_model=args_model,
+                handler=_noop,
+                executor="inline",
+            )
+        )
+    return tools
+
+
+def _baseline_openai_tools(tools: dict[str, ToolDefinition]) -> list[dict]:
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": tool.args_model.model_json_schema(),
+            },
+        }
+        for tool in (tools[name] for name in sorted(tools))
+    ]
+
+
+async def _baseline_call(tools: dict[str, ToolDefinition], name: str, arguments: dict) -> object:
+    tool = tools[name]
+    parsed: BaseModel = tool.args_model.model_validate(arguments)
+    return tool.handler(**parsed.model_dump())
+
+
+async def _time_calls(call, names: list[str], calls: int) -> float:
+    arguments = {"query": "latency", "top_k": 3}
+    start = time.perf_counter()
+    for index in range(calls):
+        await call(names[index % len(names)], arguments)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def _time_lookup(lookup, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        lookup()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+async def _main(args: argparse.Namespace) -> None:
+    logging.disable(logging.INFO)
+    tools = _tools(args.tools)
+    by_name = {tool.name: tool for tool in tools}
+    registry = ToolRegistry()
+    for tool in tools:
+        registry.register_tool(tool)
+    names = [tool.name for tool in tools]
+    context = ToolContext(role="user", confirmed_tools=set(), permissions=set())
+
+    baseline_call = await _time_calls(
+        lambda name, arguments: _baseline_call(by_name, name, arguments), names, args.calls
+    )
+    registry_call = await _time_calls(lambda name, arguments: registry.call(name, arguments, context), names, args.calls)
+    baseline_lookup = _time_lookup(lambda: _baseline_openai_tools(by_name), args.lookups)
+    registry_lookup = _time_lookup(registry.openai_tools, args.lookups)
+
+    print(f"{args.tools} tools, {args.calls} calls, {args.lookups} schema lookups")
+    print(f"{'operation':<22} {'baseline us':>12} {'registry us':>12}")
+    print(f"{'validate + dispatch':<22} {baseline_call:>12.2f} {registry_call:>12.2f}")
+    print(f"{'openai_tools()':<22} {baseline_lookup:>12.2f} {registry_lookup:>12.2f}")
+    print("registry.call also includes the role/permission checks and audit logging the baseline skips.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tools", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=200)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
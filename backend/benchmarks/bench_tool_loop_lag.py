@@ -0,0 +1,114 @@
+"""Event-loop lag under mixed tool traffic, inline dispatch against executor dispatch.
+
+``--callers`` tasks call a mix of tools through ``ToolRegistry.call`` for
+``--seconds``: a blocking I/O tool (``time.sleep``), a CPU-bound tool and an
+async tool. A probe task sleeps ``--tick-ms`` in a loop and records how late
+it wakes up, which is the delay every other request in the worker would see.
+"inline" runs sync handlers on the loop, as the registry did before;
+"thread" and "process" run them on the shared executors.
+
+    cd backend && python -m benchmarks.bench_tool_loop_lag --callers 16 --seconds 5
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.core.config.settings import Settings
+from app.tools.base import ToolDefinition
+from app.tools.context import ToolContext
+from app.tools.executors import shutdown_tool_executors
+from app.tools.registry import ToolRegistry
+
+
+class _Args(BaseModel):
+    size: int = 1
+
+
+def blocking_io(size: int = 1) -> dict:
+    time.sleep(0.02 * size)
+    return {"slept": size}
+
+
+def cpu_bound(size: int = 1) -> dict:
+    return {"sum": sum(index * index for index in range(150_000 * size))}
+
+
+async def async_io(size: int = 1) -> dict:
+    await asyncio.sleep(0.02 * size)
+    return {"slept": size}
+
+
+def _registry(executor: str, settings: Settings) -> ToolRegistry:
+    registry = ToolRegistry(settings)
+    for handler in (blocking_io, cpu_bound, async_io):
+        registry.register_tool(
+            ToolDefinition(
+                name=handler.__name__,
+                description=handler.__name__,
+                args_model=_Args,
+                handler=handler,
+                executor=executor,
+                max_concurrency=8,
+            )
+        )
+    return registry
+
+
+async def _probe(tick: float, stop: asyncio.Event, lags: list[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(tick)
+        lags.append((loop.time() - start - tick) * 1000)
+
+
+async def _caller(registry: ToolRegistry, stop: asyncio.Event, seed: int, done: list[int]) -> None:
+    rng = random.Random(seed)
+    context = ToolContext(role="user", confirmed_tools=set(), permissions=set())
+    while not stop.is_set():
+        name = rng.choices(("blocking_io", "cpu_bound", "async_io"), weights=(3, 1, 3))[0]
+        await registry.call(name, {"size": 1}, context)
+        done.append(1)
+
+
+async def _scenario(executor: str, args: argparse.Namespace, settings: Settings) -> tuple[np.ndarray, int]:
+    registry = _registry(executor, settings)
+    stop = asyncio.Event()
+    lags: list[float] = []
+    done: list[int] = []
+    tasks = [asyncio.create_task(_probe(args.tick_ms / 1000, stop, lags))]
+    tasks += [asyncio.create_task(_caller(registry, stop, seed, done)) for seed in range(args.callers)]
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return np.array(lags), len(done)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    logging.disable(logging.WARNING)
+    settings = Settings(tool_timeout_seconds=60)
+    print(f"{args.callers} callers, {args.seconds}s per scenario, probe every {args.tick_ms} ms")
+    print(f"{'dispatch':<8} {'lag p50 ms':>10} {'lag p99 ms':>10} {'lag max ms':>10} {'calls/s':>8}")
+    for executor in args.executors:
+        lags, calls = await _scenario(executor, args, settings)
+        p50, p99 = np.percentile(lags, [50, 99])
+        print(f"{executor:<8} {p50:>10.1f} {p99:>10.1f} {lags.max():>10.1f} {calls / args.seconds:>8.0f}")
+    shutdown_tool_executors()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--callers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--tick-ms", type=float, default=5.0)
+    parser.add_argument("--executors", nargs="+", default=["inline", "thread", "process"])
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
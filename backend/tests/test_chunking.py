@@ -0,0 +1,57 @@
+from app.llm.tokenizer import CHARS_PER_TOKEN, estimate_token_costs, estimate_tokens
+from app.rag.chunking import ChunkStream, chunk_text
+
+
+def test_text_without_whitespace_is_split_to_chunk_size():
+    text = "漢字" * 9000
+    chunks = list(chunk_text(text, 200, 30))
+
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) <= 200 * CHARS_PER_TOKEN
+    assert "".join(chunks) == text
+
+
+def test_long_word_inside_prose_is_split():
+    url = "https://example.com/" + "a" * 5000
+    text = f"See {url} for details. The rest of the sentence follows here."
+    chunks = list(chunk_text(text, 200, 30))
+
+    assert max(len(chunk) for chunk in chunks) <= 200 * CHARS_PER_TOKEN
+    assert url in "".join(chunks)
+
+
+def test_stream_matches_one_shot_chunking():
+    pages = ["Short words here. " * 50, "x" * 3000, "Another page of prose. " * 40]
+    stream = ChunkStream(200, 30)
+    chunks = [chunk for page in pages for chunk in stream.feed(page)]
+    chunks.extend(stream.flush())
+
+    assert chunks == list(chunk_text("\n".join(pages), 200, 30))
+
+
+def test_stream_buffer_stays_bounded_without_whitespace():
+    stream = ChunkStream(200, 30)
+    chunks = []
+    for _ in range(200):
+        chunks.extend(stream.feed("漢" * 2000))
+        assert len(stream._buffer) <= 2 * 200 * CHARS_PER_TOKEN
+    chunks.extend(stream.flush())
+
+    assert chunks == list(chunk_text("\n".join(["漢" * 2000] * 200), 200, 30))
+
+
+def test_chunks_stay_within_token_estimate():
+    text = "Wait... what?! (Really.) " * 200 + "a,b,c,d,e,f " * 300
+    chunks = list(chunk_text(text, 50, 10))
+
+    assert int(estimate_token_costs(text).sum()) == estimate_tokens(text)
+    assert max(estimate_tokens(chunk) for chunk in chunks) <= 50
+
+
+def test_stream_keeps_sentence_end_of_split_span():
+    # The "!!!" ending the first span falls in a piece the stream has already dropped.
+    text = "e!!!" + "'" * 200 + "\n!!! ?) xxxxx"
+    stream = ChunkStream(10, 50)
+    chunks = stream.feed(text) + stream.flush()
+
+    assert chunks == list(chunk_text(text, 10, 50))
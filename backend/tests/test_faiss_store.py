@@ -0,0 +1,133 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.config.settings import Settings
+from app.vectorstore.faiss.client import FaissStore
+
+DIM = 16
+
+
+def _store(tmp_path, **overrides) -> FaissStore:
+    options = {"faiss_compaction_segments": 100, "faiss_compaction_deleted_ratio": 0.9, **overrides}
+    return FaissStore(Settings(_env_file=None, vector_store_path=str(tmp_path), **options))
+
+
+def _vectors(count: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, DIM)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _add(store: FaissStore, vectors: np.ndarray, first: int) -> None:
+    ids = [f"c{number}" for number in range(first, first + len(vectors))]
+    metadata = [{"source_key": "s", "chunk": number} for number in range(first, first + len(vectors))]
+    asyncio.run(store.add_texts([f"text {chunk_id}" for chunk_id in ids], vectors.tolist(), metadata, ids=ids))
+
+
+def _top(store: FaissStore, vector: np.ndarray, top_k: int = 1) -> list[str]:
+    return [hit["id"] for hit in asyncio.run(store.similarity_search(vector.tolist(), top_k))]
+
+
+def test_add_delete_and_reopen(tmp_path):
+    vectors = _vectors(30)
+    store = _store(tmp_path)
+    for first in range(0, 30, 10):
+        _add(store, vectors[first : first + 10], first)
+
+    assert store._segment_count == 3
+    assert _top(store, vectors[17]) == ["c17"]
+
+    asyncio.run(store.delete_ids(["c17", "c3"]))
+    assert "c17" not in _top(store, vectors[17], 5)
+    assert asyncio.run(store.get_by_ids(["c17", "c18"]))[0]["id"] == "c18"
+    assert asyncio.run(store.existing_ids("s")) == {f"c{number}" for number in range(30)} - {"c17", "c3"}
+
+    generation = store.generation
+    before = _top(store, vectors[17], 5)
+    store._db.close()
+    reopened = _store(tmp_path)
+
+    assert reopened.generation == generation
+    assert reopened._segment_count == 3
+    assert reopened._deleted == 2
+    assert _top(reopened, vectors[17], 5) == before
+    assert _top(reopened, vectors[25]) == ["c25"]
+    reopened._db.close()
+
+
+def test_compaction_drops_tombstones_and_survives_reopen(tmp_path):
+    vectors = _vectors(40)
+    store = _store(tmp_path, faiss_compaction_segments=3)
+    _add(store, vectors[:10], 0)
+    _add(store, vectors[10:20], 10)
+    asyncio.run(store.delete_ids(["c5", "c15"]))
+    # Re-adding an id replaces its vector rather than duplicating the chunk.
+    asyncio.run(store.add_texts(["moved"], [vectors[30].tolist()], [{"source_key": "s"}], ids=["c0"]))
+
+    assert store._segment_count == 0
+    assert store._deleted == 0
+    assert store._total == 18
+    assert not list((tmp_path / "segments").glob("*.npy"))
+    assert _top(store, vectors[30]) == ["c0"]
+    assert _top(store, vectors[12]) == ["c12"]
+
+    _add(store, vectors[31:40], 31)
+    expected = {number: _top(store, vectors[number]) for number in (0, 12, 19, 35)}
+    chunks = [chunk for batch in _iter_chunks(store) for chunk in batch]
+    store._db.close()
+
+    reopened = _store(tmp_path, faiss_compaction_segments=3)
+    assert reopened._total == 27
+    assert reopened._segment_count == 1
+    assert {number: _top(reopened, vectors[number]) for number in expected} == expected
+    assert [chunk for batch in _iter_chunks(reopened) for chunk in batch] == chunks
+    assert "c5" not in {chunk_id for chunk_id, _ in chunks}
+    reopened._db.close()
+
+
+def test_deleted_ratio_triggers_compaction(tmp_path):
+    vectors = _vectors(10)
+    store = _store(tmp_path, faiss_compaction_deleted_ratio=0.3)
+    _add(store, vectors, 0)
+    asyncio.run(store.delete_ids(["c1", "c2"]))
+    assert store._deleted == 2
+
+    asyncio.run(store.delete_ids(["c3"]))
+    assert store._deleted == 0
+    assert store._total == 7
+    assert _top(store, vectors[9]) == ["c9"]
+    store._db.close()
+
+
+@pytest.mark.parametrize(
+    "index_type, options",
+    [
+        ("hnsw", {}),
+        ("ivf_flat", {"faiss_ivf_nlist": 4, "faiss_nprobe": 4}),
+    ],
+)
+def test_ann_base_is_rebuilt_and_reopened(tmp_path, index_type, options):
+    vectors = _vectors(60)
+    settings = {"faiss_index_type": index_type, "faiss_ann_min_vectors": 40, **options}
+    store = _store(tmp_path, **settings)
+    _add(store, vectors[:30], 0)
+    assert store._base is None
+
+    _add(store, vectors[30:], 30)
+    assert store._segment_count == 0
+    assert store._base.ntotal == 60
+    assert _top(store, vectors[42]) == ["c42"]
+    store._db.close()
+
+    reopened = _store(tmp_path, **settings)
+    assert type(reopened._base) is type(store._base)
+    assert _top(reopened, vectors[7]) == ["c7"]
+    reopened._db.close()
+
+
+def _iter_chunks(store: FaissStore) -> list[list[tuple[str, str]]]:
+    async def collect():
+        return [batch async for batch in store.iter_chunks(4)]
+
+    return asyncio.run(collect())
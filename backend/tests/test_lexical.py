@@ -0,0 +1,36 @@
+import asyncio
+import sqlite3
+
+from app.core.config.settings import Settings
+from app.rag.lexical import LexicalIndex
+
+
+def _index(tmp_path) -> LexicalIndex:
+    index = LexicalIndex(Settings(_env_file=None, vector_store_path=str(tmp_path)))
+    # Older SQLite builds allow only 999 bound variables per statement.
+    index._db.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    return index
+
+
+def test_large_batches_stay_under_the_variable_limit(tmp_path):
+    index = _index(tmp_path)
+    ids = [f"chunk-{number}" for number in range(2500)]
+    texts = [f"document {number} mentions term{number}" for number in range(2500)]
+
+    asyncio.run(index.add(ids, texts))
+    asyncio.run(index.add(ids, texts))
+    query = " ".join(f"term{number}" for number in range(0, 2500, 2))
+
+    assert index._doc_count == 2500
+    assert asyncio.run(index.search("term1234", 3))[0][0] == "chunk-1234"
+    assert len(asyncio.run(index.search(query, 5))) == 5
+    index.close()
+
+
+def test_backfill_state_persists(tmp_path):
+    index = _index(tmp_path)
+    assert not index.backfilled
+    index.mark_backfilled()
+    index.close()
+
+    assert LexicalIndex(Settings(_env_file=None, vector_store_path=str(tmp_path))).backfilled
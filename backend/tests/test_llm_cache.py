@@ -0,0 +1,89 @@
+import asyncio
+
+import numpy as np
+
+from app.core.config.settings import Settings
+from app.llm.cache import ResponseCache
+from app.llm.client import LLMResult
+
+
+class FakeEmbeddings:
+    """Maps each known query to a fixed unit vector."""
+
+    def __init__(self, vectors: dict[str, list[float]]) -> None:
+        self.vectors = vectors
+
+    async def embed_query(self, text: str) -> list[float]:
+        vector = np.asarray(self.vectors[text], dtype=np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+def _payload(text: str, temperature: float = 0, **extra) -> dict:
+    return {
+        "model": "m",
+        "messages": [{"role": "system", "content": "sys"}, {"role": "user", "content": text}],
+        "temperature": temperature,
+        "max_tokens": 64,
+        **extra,
+    }
+
+
+def _roundtrip(cache: ResponseCache, stored: dict, result: LLMResult, query: dict, opt_in=None):
+    async def run():
+        cache.store(await cache.lookup(stored, opt_in), result)
+        return (await cache.lookup(query, opt_in)).result
+
+    return asyncio.run(run())
+
+
+def _semantic_cache() -> ResponseCache:
+    settings = Settings(_env_file=None, llm_cache_semantic_enabled=True, llm_cache_semantic_threshold=0.9)
+    vectors = {
+        "read a.txt": [1.0, 0.0],
+        "please read a.txt": [1.0, 0.1],
+        "read b.txt": [1.0, 0.05],
+        "what is the capital of France?": [0.0, 1.0],
+        "capital of France?": [0.05, 1.0],
+    }
+    return ResponseCache(settings, FakeEmbeddings(vectors))
+
+
+def test_exact_tier_serves_identical_deterministic_requests():
+    cache = ResponseCache(Settings(_env_file=None))
+    answer = LLMResult(content="Paris", tool_calls=[])
+
+    assert _roundtrip(cache, _payload("q"), answer, _payload("q")) == answer
+    assert _roundtrip(cache, _payload("q"), answer, _payload("other")) is None
+
+
+def test_exact_tier_skips_sampled_requests_unless_opted_in():
+    cache = ResponseCache(Settings(_env_file=None))
+    answer = LLMResult(content="Paris", tool_calls=[])
+
+    assert _roundtrip(cache, _payload("q", 0.7), answer, _payload("q", 0.7)) is None
+    assert _roundtrip(cache, _payload("q", 0.7), answer, _payload("q", 0.7), opt_in=True) == answer
+    assert _roundtrip(cache, _payload("q"), answer, _payload("q"), opt_in=False) is None
+
+
+def test_semantic_tier_serves_similar_plain_text_questions():
+    cache = _semantic_cache()
+    answer = LLMResult(content="Paris.", tool_calls=[])
+
+    query = _payload("capital of France?")
+    assert _roundtrip(cache, _payload("what is the capital of France?"), answer, query) == answer
+    assert cache.stats()["semantic"]["hits"] == 1
+
+
+def test_semantic_tier_never_replays_tool_decisions():
+    cache = _semantic_cache()
+    tools = [{"type": "function", "function": {"name": "read_file"}}]
+    call = LLMResult(content="", tool_calls=[{"function": {"name": "read_file", "arguments": '{"path": "a.txt"}'}}])
+    decision = LLMResult(content='{"action": "tool", "tool_name": "read_file", "tool_args": {"path": "a.txt"}}', tool_calls=[])
+
+    # Native tool calls: the request carries tools.
+    assert _roundtrip(cache, _payload("read a.txt", tools=tools), call, _payload("read b.txt", tools=tools)) is None
+    # JSON-mode decisions: no tools in the payload, but the reply is JSON.
+    assert _roundtrip(cache, _payload("read a.txt"), decision, _payload("read b.txt")) is None
+    assert _roundtrip(cache, _payload("read a.txt"), call, _payload("please read a.txt")) is None
+    # The exact tier still serves the identical request.
+    assert _roundtrip(cache, _payload("read a.txt"), decision, _payload("read a.txt")) == decision
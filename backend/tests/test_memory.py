@@ -0,0 +1,64 @@
+import asyncio
+
+from app.core.config.settings import Settings
+from app.memory.short_term.conversation import ConversationMemory
+from app.models.chat import ChatMessage
+
+
+class FakeCollection:
+    """Records ``insert_many`` batches; the first ``failures`` calls raise."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.inserted: list[dict] = []
+
+    async def insert_many(self, docs, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("mongo unavailable")
+        self.inserted.extend(docs)
+
+
+def _memory(collection: FakeCollection) -> ConversationMemory:
+    # A long interval keeps the flusher idle, so only aclose() can write the queue.
+    settings = Settings(_env_file=None, memory_flush_interval_seconds=60, memory_flush_max_retries=2)
+    memory = ConversationMemory(settings)
+    memory._collection = collection
+    return memory
+
+
+def _turn(text: str) -> list[ChatMessage]:
+    return [ChatMessage(role="user", content=text), ChatMessage(role="assistant", content=f"re: {text}")]
+
+
+def test_queued_writes_are_flushed_on_close():
+    collection = FakeCollection()
+
+    async def run():
+        memory = _memory(collection)
+        await memory.append_messages("s1", _turn("hello"))
+        await memory.append_messages("s2", _turn("hi"))
+        assert collection.inserted == []
+        await memory.aclose()
+
+    asyncio.run(run())
+
+    assert [(doc["session_id"], doc["content"]) for doc in collection.inserted] == [
+        ("s1", "hello"),
+        ("s1", "re: hello"),
+        ("s2", "hi"),
+        ("s2", "re: hi"),
+    ]
+
+
+def test_flush_retries_failed_writes():
+    collection = FakeCollection(failures=2)
+
+    async def run():
+        memory = _memory(collection)
+        await memory.append_messages("s1", _turn("hello"))
+        await memory.aclose()
+
+    asyncio.run(run())
+
+    assert len(collection.inserted) == 2
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+from app.agents.planning.planner import PlanningAgent
+from app.core.config.settings import Settings
+from app.llm.client import LLMResult
+from app.models.planning import PlanRequest, PlanRun
+
+STEP_SECONDS = 0.05
+
+
+class FakeLLM:
+    """Plans ``plan`` and runs each step by title; steps listed in ``failing`` fail."""
+
+    def __init__(self, plan: list[dict], failing: set[str] = frozenset()) -> None:
+        self.plan = plan
+        self.failing = set(failing)
+        self.calls: list[dict] = []
+
+    async def chat(self, messages, tools=None, model=None, temperature=None, cache=None, accept=None):
+        system, user = messages[0]["content"], messages[-1]["content"]
+        if system.startswith("You are a planner"):
+            return LLMResult(content=json.dumps({"steps": self.plan}), tool_calls=[])
+        if system.startswith("Summarize"):
+            return LLMResult(content="summary", tool_calls=[])
+
+        title = user.split("\nStep: ", 1)[1].split("\n", 1)[0]
+        call = {"title": title, "input": user, "cache": cache, "started": time.monotonic()}
+        self.calls.append(call)
+        await asyncio.sleep(STEP_SECONDS)
+        call["finished"] = time.monotonic()
+        if title in self.failing:
+            return LLMResult(content=json.dumps({"status": "failed", "error": "boom"}), tool_calls=[])
+        return LLMResult(content=json.dumps({"status": "completed", "output": f"out:{title}"}), tool_calls=[])
+
+
+class FakeRunStore:
+    """In-memory ``PlanRunStore`` whose checkpoint writes take ``delay`` seconds."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.runs: dict[str, dict] = {}
+        self.results_at_finish: dict[str, int] = {}
+
+    async def create(self, request, steps):
+        run_id = f"run-{len(self.runs) + 1}"
+        self.runs[run_id] = {"request": request, "steps": steps, "results": {}, "status": "running"}
+        return run_id
+
+    async def get(self, run_id):
+        run = self.runs[run_id]
+        now = datetime.now(timezone.utc)
+        return PlanRun(
+            run_id=run_id,
+            goal=run["request"].goal,
+            request=run["request"],
+            status=run["status"],
+            steps=run["steps"],
+            results=list(run["results"].values()),
+            created_at=now,
+            updated_at=now,
+        )
+
+    async def checkpoint(self, run_id, result):
+        await asyncio.sleep(self.delay)
+        self.runs[run_id]["results"][result.id] = result
+
+    async def mark_running(self, run_id):
+        self.runs[run_id]["status"] = "running"
+
+    async def finish(self, run_id, summary, success):
+        self.results_at_finish[run_id] = len(self.runs[run_id]["results"])
+        self.runs[run_id]["status"] = "completed" if success else "failed"
+
+
+def _agent(llm: FakeLLM, runs: FakeRunStore | None = None) -> PlanningAgent:
+    settings = Settings(_env_file=None, planning_max_concurrency=3, planning_max_steps=10)
+    return PlanningAgent(llm, settings, runs)
+
+
+def _step(title: str, depends_on: list[int]) -> dict:
+    return {"title": title, "description": "", "depends_on": depends_on}
+
+
+def test_steps_run_as_a_dependency_graph():
+    llm = FakeLLM(
+        [
+            _step("fetch a", []),
+            _step("fetch b", []),
+            _step("combine", [1, 2]),
+            _step("flaky", []),
+            _step("after flaky", [4]),
+        ],
+        failing={"flaky"},
+    )
+    response = asyncio.run(_agent(llm).run(PlanRequest(goal="goal")))
+    calls = {call["title"]: call for call in llm.calls}
+    statuses = {step.title: step.status for step in response.steps}
+
+    # Independent steps overlap; a dependent starts after its inputs and receives their outputs.
+    assert calls["fetch b"]["started"] < calls["fetch a"]["finished"]
+    assert calls["combine"]["started"] >= max(calls["fetch a"]["finished"], calls["fetch b"]["finished"])
+    assert "out:fetch a" in calls["combine"]["input"] and "out:fetch b" in calls["combine"]["input"]
+    assert statuses == {
+        "fetch a": "completed",
+        "fetch b": "completed",
+        "combine": "completed",
+        "flaky": "failed",
+        "after flaky": "skipped",
+    }
+    assert "after flaky" not in calls
+    assert response.success is False
+
+
+def test_checkpoints_do_not_delay_dependents():
+    llm = FakeLLM([_step("one", []), _step("two", [1]), _step("three", [2])])
+    runs = FakeRunStore(delay=0.3)
+
+    started = time.monotonic()
+    response = asyncio.run(_agent(llm, runs).run(PlanRequest(goal="goal")))
+    elapsed = time.monotonic() - started
+
+    # Serial checkpoints would add 3 x 0.3s to the critical path.
+    assert elapsed < 3 * STEP_SECONDS + 0.3 + 0.25
+    # Every checkpoint has landed before the run is finished.
+    assert runs.results_at_finish[response.run_id] == 3
+
+
+def test_resume_reruns_only_unfinished_steps():
+    llm = FakeLLM([_step("one", []), _step("two", [1]), _step("three", [2])], failing={"two"})
+    runs = FakeRunStore()
+    agent = _agent(llm, runs)
+    first = asyncio.run(agent.run(PlanRequest(goal="goal")))
+    assert [step.status for step in first.steps] == ["completed", "failed", "skipped"]
+
+    llm.failing.clear()
+    llm.calls.clear()
+    resumed = asyncio.run(agent.resume(first.run_id))
+
+    assert [call["title"] for call in llm.calls] == ["two", "three"]
+    # Retries bypass the response cache and still get the reused step's output.
+    assert all(call["cache"] is False for call in llm.calls)
+    assert "out:one" in llm.calls[0]["input"]
+    assert [step.status for step in resumed.steps] == ["completed"] * 3
+    assert resumed.success is True
@@ -0,0 +1,43 @@
+import sqlite3
+
+from app.core.config.settings import Settings
+from app.rag import cache as rag_cache
+from app.rag.cache import RetrievalCache
+
+
+def _rows(path, table: str) -> int:
+    with sqlite3.connect(path) as db:
+        return db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_disk_tier_is_pruned_while_running(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_cache, "_PRUNE_EVERY", 10)
+    path = tmp_path / "cache.db"
+    cache = RetrievalCache(
+        Settings(_env_file=None, rag_cache_path=str(path), rag_cache_disk_max_entries=25)
+    )
+
+    for index in range(100):
+        cache.set_embedding(f"query {index}", [0.1, 0.2])
+    for index in range(30):
+        cache.set_hits(f"query {index}", 4, 1, [{"id": str(index)}])
+    for index in range(10):
+        cache.set_hits(f"query {index}", 4, 2, [{"id": str(index)}])
+    cache.close()
+
+    assert _rows(path, "embeddings") <= 25
+    # Hit lists of generation 1 are gone once generation 2 writes trigger a prune.
+    assert _rows(path, "hits") == 10
+    assert RetrievalCache(Settings(_env_file=None, rag_cache_path=str(path))).get_embedding("query 99") == [0.1, 0.2]
+
+
+def test_disk_tier_upgrades_files_without_generations(tmp_path):
+    path = tmp_path / "cache.db"
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE hits (key TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL)")
+
+    cache = RetrievalCache(Settings(_env_file=None, rag_cache_path=str(path)))
+    cache.set_hits("query", 4, 3, [{"id": "a"}])
+    cache._hits.clear()
+
+    assert cache.get_hits("query", 4, 3) == [{"id": "a"}]
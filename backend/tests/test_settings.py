@@ -0,0 +1,17 @@
+from app.core.config.settings import Settings
+
+
+def test_legacy_chunk_settings_are_converted_to_tokens(monkeypatch):
+    monkeypatch.setenv("CHUNK_SIZE", "1000")
+    monkeypatch.setenv("CHUNK_OVERLAP", "200")
+
+    settings = Settings(_env_file=None)
+
+    assert (settings.chunk_size_tokens, settings.chunk_overlap_tokens) == (250, 50)
+
+
+def test_token_chunk_settings_win_over_legacy(monkeypatch):
+    monkeypatch.setenv("CHUNK_SIZE", "1000")
+    monkeypatch.setenv("CHUNK_SIZE_TOKENS", "300")
+
+    assert Settings(_env_file=None).chunk_size_tokens == 300
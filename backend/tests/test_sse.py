@@ -0,0 +1,24 @@
+import asyncio
+
+from app.utils.sse import with_heartbeat
+
+
+async def _slow_events():
+    for item in ("a", "b"):
+        await asyncio.sleep(0.05)
+        yield item
+
+
+async def _collect(interval: float) -> list:
+    return [item async for item in with_heartbeat(_slow_events(), interval)]
+
+
+def test_heartbeat_fills_idle_gaps():
+    items = asyncio.run(_collect(0.01))
+
+    assert [item for item in items if item is not None] == ["a", "b"]
+    assert None in items
+
+
+def test_non_positive_interval_disables_heartbeats():
+    assert asyncio.run(asyncio.wait_for(_collect(0), 1)) == ["a", "b"]